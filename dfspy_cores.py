@@ -4,7 +4,7 @@ DFSPy 核心功能模块
 本模块从原 GUI 子模块提取出以下功能，供脚本/Notebook 直接调用：
 - 数据读取：txt 数组读取、ObsPy Stream 读取
 - 绘图：二维数组诸道绘图、ObsPy Stream 诸道绘图
-- 格式转换：txt <-> SAC/MSEED/SEGY（当前实现 txt->SAC/MSEED 以及 SAC/MSEED 互转；SEGY 预留）
+- 格式转换：txt <-> SAC/MSEED/SEGY（当前实现 txt->SAC/MSEED 以及 SAC/MSEED 互转；SEGY 预留），可选导出二进制 npy
 - 降噪：带通滤波（bandpass）
 - 参量转换：应变 -> 速度（按原程序约定）
 - 压缩/解压：
@@ -19,7 +19,9 @@ DFSPy 核心功能模块
    本模块提供 read_headfile() 解析工具，并在 txt -> SAC/MSEED 转换时使用。
 3) 函数均提供中文文档与参数说明，并在常见错误时抛出带中文信息的异常。
 
-依赖：numpy、matplotlib、obspy、pywt（可选，仅 FWT 压缩需要）
+依赖：numpy、matplotlib、obspy、pywt（可选，仅 FWT 压缩需要）、pandas（可选，加速 txt 读取）、
+      zstandard（可选，FWT 系数文件压缩，缺失时使用 gzip）、numba（可选，JIT 加速数值内核）、
+      isal（可选，加速 gzip 解压）
 
 
 **************************************************************************************
@@ -47,38 +49,100 @@ from __future__ import annotations
 import os
 import re
 import gzip
+import hashlib
+import importlib
+import io
 import json
 import math
 import pickle
+import functools
 import shutil
+import struct
+import tempfile
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple, Union, Iterable
+from typing import Dict, List, Optional, Tuple, Union, Iterable
 
 import numpy as np
 
-# 可选依赖：绘图与地震数据格式处理
-try:
-    import matplotlib.pyplot as plt
-except Exception as _:
-    plt = None  # 允许在无 matplotlib 环境下导入
-
+# 可选依赖：地震数据格式处理
 try:
     from obspy import read as obspy_read
     from obspy import Stream, Trace, UTCDateTime
+    from obspy.core import Stats
 except Exception as _:
     obspy_read = None
     Stream = None
     Trace = None
     UTCDateTime = None
+    Stats = None
 
 try:
     import pywt
 except Exception as _:
     pywt = None  # 仅 FWT 压缩需要
 
+# 其余可选依赖（matplotlib.pyplot、pandas、numba、zstandard、isal）导入开销大或仅个别函数需要，
+# 在首次使用时经 _optional_import 按需加载，模块导入时不加载
+_LAZY_MODULES = {
+    'plt': 'matplotlib.pyplot',  # 绘图
+    'pd': 'pandas',              # 加速大规模 txt 矩阵读取
+    'numba': 'numba',            # JIT 加速相关性降噪等数值内核
+    'zstd': 'zstandard',         # FWT 系数 .dfz（zstd 压缩的 npz）及旧版 zstd 压缩 pkl
+    'igzip': 'isal.igzip',       # ISA-L 加速的 gzip 解压（格式与标准库 gzip 完全兼容）
+    'cp': 'cupy',                # 有 NVIDIA GPU 时在显存中完成 Haar 重构
+}
+
+prange = range  # numba 内核中的并行循环；模块中始终为 range，编译内核时只在内核副本的全局字典中换成 numba.prange
+
+
+@functools.lru_cache(maxsize=None)
+def _optional_import(module_name: str):
+    """按需导入可选依赖并缓存结果，未安装时返回 None。"""
+    try:
+        module = importlib.import_module(module_name)
+    except Exception as _:
+        return None
+    if module_name == 'numba' and 'NUMBA_THREADING_LAYER' not in os.environ:
+        # 并行内核会在 GUI 工作线程（非主线程）中调用：tbb 线程层在此情形下解释器退出时会挂起，
+        # 未显式指定时优先使用 omp
+        module.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+    return module
+
+
+def __getattr__(name: str):
+    """PEP 562：保留 dfspy_cores.plt / pd / numba 等模块属性，访问时才导入。"""
+    if name in _LAZY_MODULES:
+        return _optional_import(_LAZY_MODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# numba 并行内核内部已多线程，且默认 workqueue 线程层不支持多个 Python 线程并发调用，需串行进入
+_numba_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _parallel_kernel(fn):
+    """
+    首次调用时以 numba njit(parallel=True) 编译数值内核并缓存；未安装 numba 时返回 None。
+    编译的是 fn 的副本，其全局字典中 prange 指向 numba.prange，不改动本模块的全局变量。
+    """
+    numba = _optional_import('numba')
+    if numba is None:
+        return None
+    kernel = types.FunctionType(fn.__code__, {**fn.__globals__, 'prange': numba.prange}, fn.__name__,
+                                fn.__defaults__, fn.__closure__)
+    kernel.__module__, kernel.__qualname__, kernel.__doc__ = fn.__module__, fn.__qualname__, fn.__doc__
+    return numba.njit(parallel=True, cache=True, fastmath=True)(kernel)
+
 
 # ----------------------------- 基础设施与工具函数 -----------------------------
 
+_DFS_OUT_RE = re.compile(r'^DFSPy_.*_outputs$')
+
+
 def _ensure_output_dir(input_path: str, task_name: str) -> str:
     """
     基于输入路径创建/获取任务专属输出目录，避免层层嵌套。
@@ -101,12 +165,8 @@ def _ensure_output_dir(input_path: str, task_name: str) -> str:
     base_dir = abs_in if os.path.isdir(abs_in) else os.path.dirname(abs_in)
 
     # 若当前位于 DFSPy_*_outputs 中，则回溯到其上一层，避免嵌套
-    def is_dfs_outputs(dirname: str) -> bool:
-        name = os.path.basename(dirname)
-        return bool(re.match(r'^DFSPy_.*_outputs$', name))
-
     parent = base_dir
-    while parent and is_dfs_outputs(parent):
+    while parent and _DFS_OUT_RE.match(os.path.basename(parent)):
         parent = os.path.dirname(parent)
     if not parent:
         parent = base_dir  # 兜底，理论上不会发生
@@ -116,6 +176,12 @@ def _ensure_output_dir(input_path: str, task_name: str) -> str:
     return out_dir
 
 
+@functools.lru_cache(maxsize=None)
+def _get_wavelet(name: str):
+    """按名称缓存 pywt.Wavelet 对象，避免每次变换重复解析小波名与构造滤波器系数。"""
+    return pywt.Wavelet(name)
+
+
 def read_headfile(headfile_path: str) -> Dict[str, str]:
     """
     读取头文件（key: value 逐行），返回字典。
@@ -132,6 +198,16 @@ def read_headfile(headfile_path: str) -> Dict[str, str]:
     """
     if not os.path.isfile(headfile_path):
         raise FileNotFoundError(f"未找到头文件: {headfile_path}")
+    st = os.stat(headfile_path)
+    return dict(_read_headfile_items(os.path.abspath(headfile_path), st.st_mtime_ns, st.st_size))
+
+
+@functools.lru_cache(maxsize=16)
+def _read_headfile_items(headfile_path: str, mtime_ns: int, size: int) -> Tuple[Tuple[str, str], ...]:
+    """
+    解析头文件为 (键, 值) 元组（不可变，可安全缓存）。按 (路径, 修改时间, 大小) 缓存：
+    批量转换时同一进程处理的多个 txt 共用一个头文件，只读取解析一次；文件被修改后自动重新解析。
+    """
     data: Dict[str, str] = {}
     with open(headfile_path, 'r', encoding='utf-8') as f:
         for line in f:
@@ -152,18 +228,60 @@ def read_headfile(headfile_path: str) -> Dict[str, str]:
             data[k.strip()] = v.strip()
     if not data:
         raise ValueError(f"头文件为空或格式不正确: {headfile_path}")
-    return data
+    return tuple(data.items())
+
+
+def _txt_cache_path(txt_path: str, dtype) -> Tuple[str, str]:
+    """
+    txt 解析缓存（.npy）路径：位于 DFSPy_cache_outputs，文件名含源路径哈希、源文件的 st_size 与 st_mtime_ns 及 dtype。
+    源文件内容或大小变化（含保留时间戳的替换，只要大小不同）即对应另一个缓存文件，不会误用旧缓存。
+    返回 (缓存路径, 同一源文件与 dtype 的缓存文件名前缀)，前缀用于清理旧版本缓存。
+    """
+    abs_in = os.path.abspath(txt_path)
+    st = os.stat(abs_in)
+    key = hashlib.md5(abs_in.encode('utf-8')).hexdigest()[:8]
+    out_dir = _ensure_output_dir(abs_in, 'cache')
+    prefix = f"{os.path.basename(abs_in)}.{key}.{np.dtype(dtype).name}."
+    return os.path.join(out_dir, f"{prefix}{st.st_size:x}-{st.st_mtime_ns:x}.npy"), prefix
+
+
+def read_array_mmap(npy_path: str) -> np.ndarray:
+    """
+    读取二进制二维数组（samples x traces）。.npy 以只读内存映射打开，仅访问到的部分才从磁盘读入；
+    .npz 读取键 'data'（decompress_fwt_to_txt 的 npz 输出），没有则取第一个数组。一维数据视为单道。
+    """
+    if not os.path.isfile(npy_path):
+        raise FileNotFoundError(f"未找到数据文件: {npy_path}")
+    if npy_path.lower().endswith('.npz'):
+        with np.load(npy_path, allow_pickle=False) as z:
+            if not z.files:
+                raise ValueError(f"npz 文件为空: {npy_path}")
+            arr = z['data'] if 'data' in z.files else z[z.files[0]]
+    else:
+        arr = np.load(npy_path, mmap_mode='r', allow_pickle=False)
+    if arr.ndim == 1:
+        arr = arr[:, None]
+    if arr.ndim != 2 or arr.size == 0:
+        raise ValueError("数据需为非空二维矩阵 (samples x traces)")
+    return arr
 
 
-def read_txt_array(txt_path: str) -> np.ndarray:
+def read_txt_array(txt_path: str, dtype=np.float64, use_cache: bool = False) -> np.ndarray:
     """
     读取 txt 文本中的二维数据为 ndarray。
 
     要求：
     - 每列代表一条道（trace），每行代表一个采样点（与原 GUI 一致）。
+    - 若安装了 pandas，则使用其 C 解析器读取（大文件显著快于 np.loadtxt），否则回退到 np.loadtxt。
+    - 可选解析缓存（use_cache=True，默认关闭，缓存为整个数组的二进制副本，占用与数据相当的磁盘空间）：
+      首次解析后在 DFSPy_cache_outputs 下保存 .npy，之后源文件的大小与修改时间（st_size、st_mtime_ns）
+      均未变化时直接以内存映射（写时复制，修改不会回写缓存）方式打开，免去重复解析。
+    - 传入 .npy/.npz（如格式转换或重构导出的二进制结果）时不做文本解析，交由 read_array_mmap 读取。
 
     参数
     - txt_path: 文本数据路径
+    - dtype: 输出数据类型（默认 float64；压缩等场景可传 np.float32 以减半内存）
+    - use_cache: 是否使用/生成解析缓存（默认 False；目录不可写时自动跳过）
 
     返回
     - ndarray，形状为 (n_samples, n_traces)
@@ -174,20 +292,81 @@ def read_txt_array(txt_path: str) -> np.ndarray:
     """
     if not os.path.isfile(txt_path):
         raise FileNotFoundError(f"未找到数据文件: {txt_path}")
-    arr = np.loadtxt(txt_path)
+    if os.path.splitext(txt_path)[1].lower() in ('.npy', '.npz'):
+        arr = read_array_mmap(txt_path)
+        return arr if arr.dtype == dtype else arr.astype(dtype)
+    cache_path = None
+    if use_cache:
+        try:
+            cache_path, cache_prefix = _txt_cache_path(txt_path, dtype)
+            if os.path.isfile(cache_path):
+                return np.load(cache_path, mmap_mode='c')
+        except (OSError, ValueError):
+            cache_path = None  # 缓存目录不可写或缓存损坏：直接解析
+
+    arr = None
+    pd = _optional_import('pandas')
+    if pd is not None:
+        try:
+            arr = pd.read_csv(txt_path, sep=r'\s+', header=None, dtype=dtype,
+                              engine='c', comment='#').to_numpy()
+        except Exception:
+            arr = None  # 解析失败（如空文件、非常规分隔）时回退到 np.loadtxt
+        if arr is not None and np.isnan(arr).any():
+            # read_csv 会把缺列的短行补成 NaN：交由 np.loadtxt 重新解析，损坏的数据照旧报 ValueError
+            # （文件中确有 nan 字面量时由 loadtxt 原样读出）
+            arr = None
+        elif arr is not None and arr.shape[0] == 1:
+            # 单行文件：np.loadtxt 返回一维数组并视为单道 (n_samples, 1)，保持该形状，不按 (1, n_traces) 返回
+            arr = arr.reshape(-1, 1)
+    if arr is None:
+        arr = np.loadtxt(txt_path, dtype=dtype)
     if arr.ndim == 1:
         arr = arr[:, None]
     if arr.ndim != 2:
         raise ValueError("txt 数据必须是二维矩阵 (samples x traces)")
+    if cache_path is not None:
+        # 先写同目录下唯一命名的临时文件再原子替换：并发读取同一文件的进程/线程各写各的临时文件，
+        # 不会读到不完整的缓存；缓存写入失败不影响本次读取，直接返回已解析的数组
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(suffix='.npy', dir=os.path.dirname(cache_path))
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, arr)
+            os.replace(tmp_path, cache_path)
+            tmp_path = None
+            # 同一源文件的旧版本缓存不再可用，顺带删除，避免磁盘占用累积
+            cache_dir, cache_name = os.path.split(cache_path)
+            for entry in os.scandir(cache_dir):
+                if entry.name != cache_name and entry.name.startswith(cache_prefix) and entry.name.endswith('.npy'):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+            return np.load(cache_path, mmap_mode='c')
+        except (OSError, ValueError):
+            pass
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
     return arr
 
 
-def read_stream(file_path: str):
+# 扩展名可确定格式时直接指定 format 并跳过压缩包探测（ObsPy 对 MSEED 本身即以 np.memmap 映射文件）
+_STREAM_FORMATS = {'.mseed': 'MSEED', '.miniseed': 'MSEED', '.msd': 'MSEED', '.sac': 'SAC'}
+
+
+def read_stream(file_path: str, starttime=None, endtime=None, dtype=None):
     """
     使用 ObsPy 读取地震格式文件，返回 Stream。
 
     参数
     - file_path: 输入文件路径（SAC/MSEED/SEED/SEGY 等）
+    - starttime, endtime: 可选，obspy.UTCDateTime；只读取该时间范围（MSEED 仅解压相关记录）
+    - dtype: 可选，各道数据转换为该类型（如 np.float32）；默认保留文件中的原始类型
 
     返回
     - obspy.Stream 对象
@@ -201,7 +380,36 @@ def read_stream(file_path: str):
         raise ImportError("需要安装 obspy 才能读取地震数据格式。pip install obspy")
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"未找到数据文件: {file_path}")
-    return obspy_read(file_path)
+    fmt = _STREAM_FORMATS.get(os.path.splitext(file_path)[1].lower())
+    if fmt is not None:
+        try:
+            return obspy_read(file_path, format=fmt, check_compression=False,
+                              starttime=starttime, endtime=endtime, dtype=dtype)
+        except Exception:
+            pass  # 扩展名与实际格式不符：回退到 ObsPy 自动识别
+    return obspy_read(file_path, starttime=starttime, endtime=endtime, dtype=dtype)
+
+
+def read_stream_headers(file_path: str):
+    """
+    只读取地震格式文件的头信息（obspy.read(headonly=True)），返回各道 data 为空的 Stream。
+    用于查询采样率、样点数、道数等元数据，不解压样点数据。
+
+    可能异常同 read_stream。
+    """
+    if obspy_read is None:
+        raise ImportError("需要安装 obspy 才能读取地震数据格式。pip install obspy")
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"未找到数据文件: {file_path}")
+    return obspy_read(file_path, headonly=True)
+
+
+def _shallow_stream_clone(st):
+    """
+    浅复制 Stream：仅复制各道头信息（Stats），数据缓冲区与原 Stream 共享。
+    适用于随后以新数组整体替换 tr.data 的处理流程（不得对 tr.data 原地修改），省去 Stream.copy() 的数据深拷贝。
+    """
+    return Stream([Trace(data=tr.data, header=tr.stats.copy()) for tr in st])
 
 
 def array_to_stream_from_head(data: np.ndarray, head: Dict[str, str]):
@@ -254,33 +462,102 @@ def array_to_stream_from_head(data: np.ndarray, head: Dict[str, str]):
     station = head.get('station', '')
 
     n_samples, n_traces = data.shape
+    # 一次性转置为 (traces, samples) 的连续 float32 内存，每道取行视图，避免逐列拷贝
+    data32 = np.ascontiguousarray(data.T, dtype=np.float32)
+
+    # 公共头信息只构造一次，逐道复制模板
+    base = Stats()
+    if start_time is not None:
+        base.starttime = start_time
+    if delta is not None:
+        base.delta = float(delta)
+    if network:
+        base.network = network
+    if station:
+        base.station = station
+    base.npts = n_samples
+
     for i in range(n_traces):
-        tr = Trace()
-        tr.data = data[:, i].astype(np.float32, copy=False)
-        if start_time is not None:
-            tr.stats.starttime = start_time
-        if delta is not None:
-            tr.stats.delta = float(delta)
-        if network:
-            tr.stats.network = network
-        if station:
-            tr.stats.station = station
+        tr = Trace(data=data32[i])
+        tr.stats = base.copy()
         tr.stats.channel = f"{i + 1:02d}"
-        tr.stats.npts = n_samples
-        st += tr
+        st.append(tr)
     return st
 
 
 # ----------------------------- 绘图 -----------------------------
 
-def plot_array(data: np.ndarray, title: str = None, ax=None):
+_TRACE_COLLECTION_GID = 'dfspy_traces'
+
+
+def _draw_trace_lines(ax, segments, title: str = None):
+    """
+    将诸道折线段一次性以 LineCollection 绘制（替代逐道 ax.plot），并设置坐标轴样式。
+    ax 上已有本函数绘制的 LineCollection 时只替换其折线数据并重设数据范围，不清空重建坐标轴。
+
+    参数
+    - ax: matplotlib Axes
+    - segments: (n_traces, n_samples, 2) 数组，或长度不一的 (n_i, 2) 数组列表；最后一维为 (x, y)
+    - title: 图标题
+    """
+    import matplotlib
+    from matplotlib.collections import LineCollection
+
+    # 沿用 ax.plot 的默认颜色循环，保持与逐道绘制一致的外观
+    cycle = matplotlib.rcParams['axes.prop_cycle'].by_key().get('color') or ['C0']
+    colors = [cycle[i % len(cycle)] for i in range(len(segments))]
+    lc = trace_collection(ax)
+    if lc is None:
+        ax.cla()
+        lc = LineCollection(segments, linewidths=0.8, colors=colors)
+        lc.set_gid(_TRACE_COLLECTION_GID)
+        ax.add_collection(lc)
+        ax.set_xlabel('Trace')
+        ax.set_ylabel('Samples')
+        ax.invert_yaxis()
+    else:
+        lc.set_segments(segments)
+        lc.set_color(colors)
+        ax.ignore_existing_data_limits = True
+        ax.update_datalim(lc.get_datalim(ax.transData).get_points())
+        ax.set_autoscale_on(True)
+    ax.autoscale_view()
+    ax.set_title(title or '')
+    return ax
+
+
+def _minmax_envelope(data: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    沿采样轴把 (n_samples, n_traces) 数据分成 n_buckets 段，每段取最小/最大值交错输出，
+    返回 (envelope, sample_positions)，envelope 形状 (2 * 段数, n_traces)。极值保留，像素级外观不变。
+    """
+    n_samples = data.shape[0]
+    b = n_samples // n_buckets
+    n_full = n_samples // b * b
+    blocks = data[:n_full].reshape(-1, b, data.shape[1])
+    lo, hi = np.minimum.reduce(blocks, axis=1), np.maximum.reduce(blocks, axis=1)
+    starts = np.arange(0, n_full, b)
+    if n_full < n_samples:
+        tail = data[n_full:]
+        lo = np.vstack((lo, tail.min(axis=0)))
+        hi = np.vstack((hi, tail.max(axis=0)))
+        starts = np.append(starts, n_full)
+    env = np.empty((2 * len(lo), data.shape[1]), dtype=lo.dtype)
+    env[0::2], env[1::2] = lo, hi
+    pos = np.repeat(starts, 2).astype(np.float64)
+    pos[1::2] += (np.diff(np.append(starts, n_samples)) - 1)
+    return env, pos
+
+
+def plot_array(data: np.ndarray, title: str = None, ax=None, max_points: Optional[int] = None):
     """
     诸道二维数组绘图（按原 GUI 习惯：列为道，行为采样），x 轴为道序，y 轴为样点并倒轴。
 
     参数
     - data: ndarray，形状 (n_samples, n_traces)
     - title: 图标题
-    - ax: 可选，matplotlib Axes
+    - ax: 可选，matplotlib Axes；重复传入同一 ax 时复用已有折线集合，仅更新数据
+    - max_points: 可选，采样轴方向的像素数；样点数超过其 4 倍时按最小/最大包络抽稀为 2 * max_points 点再绘制
 
     返回
     - ax 对象（便于在 Notebook 中继续美化）
@@ -289,29 +566,97 @@ def plot_array(data: np.ndarray, title: str = None, ax=None):
     - ImportError: 未安装 matplotlib
     - ValueError: 维度不符
     """
+    plt = _optional_import('matplotlib.pyplot')
     if plt is None:
         raise ImportError("需要安装 matplotlib 以使用绘图。pip install matplotlib")
     if data.ndim != 2:
         raise ValueError("data 必须是二维 (samples x traces)")
     if ax is None:
         fig, ax = plt.subplots(figsize=(6, 6))
-    ax.cla()
-    n_samples, n_traces = data.shape
-    for i in range(n_traces):
-        y = data[:, i]
-        denom = np.max(np.abs(y)) or 1.0
-        y = y / denom + i + 1
-        x = np.arange(len(y))
-        ax.plot(y, x, lw=0.8)
-    ax.set_xlabel('Trace')
-    ax.set_ylabel('Samples')
-    ax.invert_yaxis()
-    if title:
-        ax.set_title(title)
-    return ax
+    segments = _trace_segments(data, _trace_scale(data), max_points)
+    return _draw_trace_lines(ax, segments, title)
+
+
+def _trace_scale(data: np.ndarray) -> np.ndarray:
+    """各道归一化峰值（形状 (n_traces,)，零道记为 1）；取 max/-min 两次归约，不生成 |data| 整阵临时数组。"""
+    denom = np.maximum(data.max(axis=0), -data.min(axis=0)).astype(np.float64)
+    denom[denom == 0] = 1.0
+    return denom
 
 
-def plot_stream(st, title: str = None, ax=None):
+def _trace_segments(data: np.ndarray, denom: np.ndarray, max_points: Optional[int] = None,
+                    start: int = 0) -> np.ndarray:
+    """
+    由 (n_samples, n_traces) 数组生成 (n_traces, n_points, 2) 折线段：各道除以 denom 后按道序平移，
+    样点坐标从 start 起算（供缩放时对可见片段重新抽稀）；样点数超过 4 * max_points 时做最小/最大包络抽稀。
+    """
+    n_traces = data.shape[1]
+    if max_points and data.shape[0] > 4 * max_points:
+        data, pos = _minmax_envelope(data, max_points)
+        pos = pos + start
+    else:
+        pos = np.arange(start, start + data.shape[0])
+    # 直接写入线段数组的 x 分量，省去除法与平移的两个整阵中间结果
+    segments = np.empty((n_traces, data.shape[0], 2))
+    xs = segments[..., 0]
+    np.divide(data.T, denom[:, None], out=xs)
+    xs += np.arange(1, n_traces + 1)[:, None]
+    segments[..., 1] = pos
+    return segments
+
+
+def _stream_traces(st) -> list:
+    """按通道号 01, 02, ... 排序取道（缺失时按位置）；一次建立通道索引，避免逐道 select 的 O(N^2) 扫描。"""
+    by_channel = {}
+    for tr in st:
+        by_channel.setdefault(tr.stats.channel, tr)
+    return [by_channel.get(f"{i + 1:02d}", st[i]) for i in range(len(st))]
+
+
+def trace_segments(source, max_points: Optional[int] = None, start: int = 0, stop: Optional[int] = None,
+                   scale: Optional[np.ndarray] = None) -> Tuple[Union[np.ndarray, list], np.ndarray]:
+    """
+    生成与 plot_array/plot_stream 相同的道折线段（x 为归一化后按道序平移的振幅，y 为样点序号），
+    供 GUI 在缩放/平移时只对可见样点 [start, stop) 重新抽稀，或交给其他绘图库（如 pyqtgraph）绘制。
+
+    参数
+    - source: ndarray（形状 (n_samples, n_traces)）或 obspy.Stream（道按通道号 01, 02, ... 排序）
+    - max_points: 可选，采样轴方向的像素数；可见样点数超过其 4 倍时按最小/最大包络抽稀
+    - start, stop: 可见样点范围（切片语义，超出数据长度时自动截断）
+    - scale: 各道归一化峰值（形状 (n_traces,)）；None 时按全部样点计算。缩放时传入首次返回的 scale，
+      使可见片段与全图保持同一振幅比例，且不必每次遍历全部数据
+
+    返回
+    - (segments, scale)：等长数据的 segments 为 (n_traces, n_points, 2) 数组，不等长道的 Stream 为 (n_i, 2) 数组列表
+    """
+    if isinstance(source, np.ndarray):
+        if source.ndim != 2:
+            raise ValueError("data 必须是二维 (samples x traces)")
+        if scale is None:
+            scale = _trace_scale(source)
+        return _trace_segments(source[start:stop], scale, max_points, start), scale
+    traces = _stream_traces(source)
+    if scale is None:
+        scale = np.array([max(tr.data.max(), -tr.data.min()) for tr in traces], dtype=np.float64)
+        scale[scale == 0] = 1.0
+    if traces and len({len(tr.data) for tr in traces}) == 1:
+        # 等长道：只堆叠可见片段，之后与数组同样向量化处理
+        data = np.column_stack([tr.data[start:stop] for tr in traces])
+        return _trace_segments(data, scale, max_points, start), scale
+    segments = []
+    for i, tr in enumerate(traces):
+        seg = _trace_segments(tr.data[start:stop, None], scale[i:i + 1], max_points, start)[0]
+        seg[:, 0] += i
+        segments.append(seg)
+    return segments, scale
+
+
+def trace_collection(ax):
+    """返回 ax 上由 plot_array/plot_stream 绘制的道折线集合（matplotlib LineCollection），尚未绘制时为 None。"""
+    return next((c for c in ax.collections if c.get_gid() == _TRACE_COLLECTION_GID), None)
+
+
+def plot_stream(st, title: str = None, ax=None, max_points: Optional[int] = None):
     """
     诸道 ObsPy Stream 绘图（与 GUI 一致：x 为道序，y 为样点并倒轴）。
 
@@ -319,10 +664,12 @@ def plot_stream(st, title: str = None, ax=None):
     - st: obspy.Stream 或兼容对象（包含若干 Trace）
     - title: 图标题
     - ax: 可选，matplotlib Axes
+    - max_points: 可选，同 plot_array
 
     返回
     - ax 对象
     """
+    plt = _optional_import('matplotlib.pyplot')
     if plt is None:
         raise ImportError("需要安装 matplotlib 以使用绘图。pip install matplotlib")
     if Stream is None:
@@ -331,33 +678,48 @@ def plot_stream(st, title: str = None, ax=None):
         raise TypeError("st 必须是 obspy.Stream")
     if ax is None:
         fig, ax = plt.subplots(figsize=(6, 6))
-    ax.cla()
-    for i in range(len(st)):
-        tr = st.select(channel=f"{i + 1:02d}")[0] if st.select(channel=f"{i + 1:02d}") else st[i]
+    traces = _stream_traces(st)
+    if traces and len({len(tr.data) for tr in traces}) == 1:
+        # 等长道：堆叠后与 plot_array 同样向量化处理
+        return plot_array(np.column_stack([tr.data for tr in traces]), title, ax, max_points)
+    segments = []
+    for i, tr in enumerate(traces):
         y = tr.data
         denom = np.max(np.abs(y)) or 1.0
-        y = y / denom + i + 1
-        x = np.arange(len(y))
-        ax.plot(y, x, lw=0.8)
-    ax.set_xlabel('Trace')
-    ax.set_ylabel('Samples')
-    ax.invert_yaxis()
-    if title:
-        ax.set_title(title)
-    return ax
+        if max_points and len(y) > 4 * max_points:
+            env, pos = _minmax_envelope(y[:, None], max_points)
+            segments.append(np.column_stack((env[:, 0] / denom + i + 1, pos)))
+        else:
+            segments.append(np.column_stack((y / denom + i + 1, np.arange(len(y)))))
+    return _draw_trace_lines(ax, segments, title)
 
 
 # ----------------------------- 格式转换 -----------------------------
 
+def _save_txt_matrix(out_path: str, data: np.ndarray, fmt: str = '%.7e', rows_per_block: int = 8192) -> None:
+    """
+    以空格分隔的文本写出二维矩阵，输出与 np.savetxt(out_path, data, fmt=fmt) 逐字节一致。
+    按行块整体格式化（一次 % 运算处理整块），减少 np.savetxt 逐行格式化与写入的 Python 开销。
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, None]
+    row_fmt = ' '.join([fmt] * data.shape[1]) + '\n'
+    with open(out_path, 'w', encoding='utf-8', newline='\n') as f:
+        for i in range(0, data.shape[0], rows_per_block):
+            block = data[i:i + rows_per_block]
+            f.write((row_fmt * len(block)) % tuple(block.ravel().tolist()))
+
+
 def convert_format(input_path: str, output_format: str, headfile_path: Optional[str] = None) -> str:
     """
     通用格式转换：
     - txt -> SAC/MSEED：需要头文件以构造时间与采样信息
-    - SAC/MSEED -> 互转 或 -> txt
+    - SAC/MSEED -> 互转 或 -> txt / npy（npy 为二进制矩阵，适合无需文本的场景，读写远快于 txt）
 
     参数
     - input_path: 输入文件
-    - output_format: 目标格式（不区分大小写，支持 'SAC'/'MSEED'/'TXT'）
+    - output_format: 目标格式（不区分大小写，支持 'SAC'/'MSEED'/'TXT'/'NPY'）
     - headfile_path: 当输入为 txt 且目标为 SAC/MSEED 时必需
 
     返回
@@ -369,8 +731,8 @@ def convert_format(input_path: str, output_format: str, headfile_path: Optional[
     if output_format is None:
         raise ValueError("缺少目标格式 output_format")
     output_format = output_format.strip().upper()
-    if output_format not in {"SAC", "MSEED", "TXT"}:
-        raise ValueError("当前仅支持输出为 SAC/MSEED/TXT")
+    if output_format not in {"SAC", "MSEED", "TXT", "NPY"}:
+        raise ValueError("当前仅支持输出为 SAC/MSEED/TXT/NPY")
 
     ext = os.path.splitext(input_path)[1].lower()
     out_dir = _ensure_output_dir(input_path, 'format')
@@ -378,6 +740,12 @@ def convert_format(input_path: str, output_format: str, headfile_path: Optional[
     if ext == '.txt':
         if output_format == 'TXT':
             raise ValueError("输入已是 TXT，无需转换")
+        if output_format == 'NPY':
+            data = read_txt_array(input_path)
+            base = os.path.splitext(os.path.basename(input_path))[0]
+            out_path = os.path.join(out_dir, f"{base}.npy")
+            np.save(out_path, data)
+            return out_path
         if headfile_path is None:
             raise ValueError("txt 转为 SAC/MSEED 时需要提供 headfile_path")
         head = read_headfile(headfile_path)
@@ -394,13 +762,17 @@ def convert_format(input_path: str, output_format: str, headfile_path: Optional[
     st = read_stream(input_path)
 
     base = os.path.splitext(os.path.basename(input_path))[0]
-    if output_format == 'TXT':
-        # 导出为 txt（按列为道）
+    if output_format in {'TXT', 'NPY'}:
+        # 导出为 txt / npy（按列为道）
         # 将各道长度对齐（取最短长度）
         min_len = min(int(tr.stats.npts) for tr in st)
-        data = np.column_stack([tr.data[:min_len] for tr in st]).astype(np.float32)
+        data = np.stack([tr.data[:min_len] for tr in st], axis=1).astype(np.float32, copy=False)
+        if output_format == 'NPY':
+            out_path = os.path.join(out_dir, f"{base}.npy")
+            np.save(out_path, data)
+            return out_path
         out_path = os.path.join(out_dir, f"{base}.txt")
-        np.savetxt(out_path, data, fmt='%.7e')
+        _save_txt_matrix(out_path, data, fmt='%.7e')
         return out_path
 
     # SAC <-> MSEED 等互转
@@ -411,13 +783,115 @@ def convert_format(input_path: str, output_format: str, headfile_path: Optional[
 
 # ----------------------------- 降噪 -----------------------------
 
-def bandpass_denoise(input_path_or_stream: Union[str, object], freqmin: float, freqmax: float) -> str:
+@functools.lru_cache(maxsize=64)
+def _butter_sos(mode: str, fmin: float, fmax: Optional[float], order: int, fs: float):
+    """
+    按 ObsPy 相同的方式设计 Butterworth 滤波器 SOS 系数（iirfilter, output='sos'）。
+    频率超出 ObsPy 常规分支（如角频率达到/超过 Nyquist）时返回 None，由调用方回退到 ObsPy。
+    按 (mode, fmin, fmax, order, fs) 缓存：批量处理同参数文件时只设计一次；返回数组为各调用方共享，不可原地修改
+    （scipy 的 sosfilt 不接受只读数组，故未设为只读）。
+    """
+    from scipy.signal import iirfilter
+    fe = 0.5 * fs
+    if mode in {"bandpass", "bandstop"}:
+        low, high = fmin / fe, fmax / fe
+        if high - 1.0 > -1e-6 or low > 1:
+            return None
+        btype = 'band' if mode == 'bandpass' else 'bandstop'
+        sos = iirfilter(int(order), [low, high], btype=btype, ftype='butter', output='sos')
+    else:
+        f = fmin / fe
+        if f >= 1:
+            return None
+        sos = iirfilter(int(order), f, btype=mode, ftype='butter', output='sos')
+    return sos
+
+
+def _filter_stream_inplace(st, mode: str, fmin: float, fmax: Optional[float], order: int, zerophase: bool):
+    """
+    对 Stream 各道执行 Butterworth 滤波（原地替换 tr.data）。
+
+    所有道采样率一致时只设计一次 SOS，等长道堆叠为矩阵后沿样点轴一次 sosfilt；
+    零相位与 ObsPy 一致（正向 + 反向各一次，不做边界延拓），float64 下结果与 Stream.filter 相同。
+    其余情况回退到 Stream.filter。
+    """
+    from scipy.signal import sosfilt
+    rates = {float(tr.stats.sampling_rate) for tr in st}
+    sos = _butter_sos(mode, fmin, fmax, order, rates.pop()) if len(rates) == 1 else None
+    if sos is None:
+        if mode in {"bandpass", "bandstop"}:
+            st.filter(mode, freqmin=fmin, freqmax=fmax, corners=int(order), zerophase=zerophase)
+        else:
+            st.filter(mode, freq=fmin, corners=int(order), zerophase=zerophase)
+        return st
+
+    # 非 float64 输入（MSEED 常见的整型/float32）在角频率不过低时以 float32 滤波，带宽减半；
+    # 极点贴近单位圆（归一化角频率 < 0.01）时单精度递推误差可达千分之几，仍用 float64
+    fe = 0.5 * float(st[0].stats.sampling_rate)
+    low = min(f for f in (fmin, fmax) if f is not None) / fe
+    dtype = np.float32 if low >= 0.01 and all(tr.data.dtype != np.float64 for tr in st) else np.float64
+    sos = sos.astype(dtype, copy=False)
+
+    def _apply(X):
+        Y = sosfilt(sos, X, axis=-1)
+        if zerophase:
+            Y = np.flip(sosfilt(sos, np.flip(Y, axis=-1), axis=-1), axis=-1)
+        return np.ascontiguousarray(Y)
+
+    if len({len(tr.data) for tr in st}) == 1:
+        Y = _apply(np.asarray([tr.data for tr in st], dtype=dtype))
+        for tr, y in zip(st, Y):
+            tr.data = y
+    else:
+        for tr in st:
+            tr.data = _apply(tr.data.astype(dtype))
+    return st
+
+
+# method='auto' 时的长信号阈值（秒）与 FIR 抽头数，参照 MNE 的长度启发式
+_LONG_SIGNAL_SECONDS = 60.0
+_FIR_NUMTAPS = 101
+
+
+def _zerophase_bandpass_inplace(st, fmin: float, fmax: float):
+    """
+    零相位带通（原地替换 tr.data）：短于 _LONG_SIGNAL_SECONDS 的道用 Butterworth sosfiltfilt；
+    更长的道用线性相位 FIR（firwin）经 oaconvolve 做重叠相加卷积，mode='same' 抵消群延迟。
+    等长、同采样率的道堆叠为矩阵后一次处理。
+    """
+    from scipy.signal import firwin, oaconvolve, sosfiltfilt
+
+    def _apply(X, fs):
+        if X.shape[-1] / fs < _LONG_SIGNAL_SECONDS:
+            sos = _butter_sos('bandpass', fmin, fmax, 4, fs)
+            if sos is not None and X.shape[-1] > 3 * (2 * len(sos) + 1):
+                return np.ascontiguousarray(sosfiltfilt(sos, X, axis=-1))
+        taps = firwin(_FIR_NUMTAPS, [fmin, fmax], fs=fs, pass_zero=False).astype(X.dtype)
+        return oaconvolve(X, taps.reshape((1,) * (X.ndim - 1) + (-1,)), mode='same', axes=-1)
+
+    groups = {}
+    for tr in st:
+        groups.setdefault((float(tr.stats.sampling_rate), len(tr.data)), []).append(tr)
+    for (fs, _), trs in groups.items():
+        # FIR 卷积无递推误差累积，非 float64 输入直接以 float32 处理（sosfiltfilt 分支按 SOS 精度提升为 float64）
+        dtype = np.float64 if any(tr.data.dtype == np.float64 for tr in trs) else np.float32
+        Y = _apply(np.asarray([tr.data for tr in trs], dtype=dtype), fs)
+        for tr, y in zip(trs, Y):
+            tr.data = y
+    return st
+
+
+def bandpass_denoise(input_path_or_stream: Union[str, object], freqmin: float, freqmax: float,
+                     inplace: bool = False, method: str = 'iir') -> str:
     """
     带通滤波降噪（对 ObsPy Stream）：
 
     参数
     - input_path_or_stream: 输入文件路径（SAC/MSEED 等）或 Stream
     - freqmin, freqmax: 带通频带（Hz）
+    - inplace: 为 True 时直接修改传入的 Stream（省去复制）；默认 False，仅复制头信息，传入的 Stream 保持不变
+    - method: 'iir'（默认，4 阶 Butterworth 单向滤波，与 ObsPy 一致）|
+      'auto'（零相位：短信号 sosfiltfilt，长于 60 s 的信号改用 FIR + oaconvolve 重叠相加）
 
     返回
     - 输出文件路径（与输入同目录的 DFSPy_denoise_outputs 子目录）
@@ -429,6 +903,9 @@ def bandpass_denoise(input_path_or_stream: Union[str, object], freqmin: float, f
         raise ImportError("需要安装 obspy 才能进行滤波。pip install obspy")
     if not (freqmin > 0 and freqmax > 0 and freqmax > freqmin):
         raise ValueError("freqmin/freqmax 必须为正，且 freqmax > freqmin")
+    method = (method or 'iir').lower()
+    if method not in {'iir', 'auto'}:
+        raise ValueError(f"不支持的带通方法 method: {method}")
 
     if isinstance(input_path_or_stream, str):
         st = read_stream(input_path_or_stream)
@@ -439,8 +916,11 @@ def bandpass_denoise(input_path_or_stream: Union[str, object], freqmin: float, f
     else:
         raise TypeError("input_path_or_stream 必须是 str 或 Stream")
 
-    st_f = st.copy()
-    st_f.filter('bandpass', freqmin=freqmin, freqmax=freqmax)
+    st_f = st if (inplace or isinstance(input_path_or_stream, str)) else _shallow_stream_clone(st)
+    if method == 'auto':
+        _zerophase_bandpass_inplace(st_f, freqmin, freqmax)
+    else:
+        _filter_stream_inplace(st_f, 'bandpass', freqmin, freqmax, order=4, zerophase=False)
 
     out_dir = _ensure_output_dir(in_path, 'denoise')
     # 继承原扩展名
@@ -465,16 +945,18 @@ def filter_stream(
     freqs: Optional[Tuple[float, float]] = None,
     order: int = 4,
     zerophase: bool = True,
+    inplace: bool = False,
 ) -> str:
     """
     通用滤波器封装，支持：
     - mode: 'bandpass' | 'lowpass' | 'highpass' | 'bandstop'
-    - kind: 'butterworth'（当前走 ObsPy 内置 SciPy IIR）| 'cheby1'（占位，后续扩展）
+    - kind: 'butterworth'（SciPy IIR，与 ObsPy 内置滤波等价）| 'cheby1'（占位，后续扩展）
     - freqs: 频率参数（Hz）。
         - bandpass/bandstop: (fmin, fmax)
         - lowpass/highpass: (fcut, None)
     - order: 滤波器阶次
     - zerophase: 是否零相位滤波（filtfilt）
+    - inplace: 为 True 时直接修改传入的 Stream（省去复制）
 
     返回输出文件路径，位于非嵌套的 DFSPy_denoise_outputs 目录。
     """
@@ -513,16 +995,9 @@ def filter_stream(
         if not (fmin > 0):
             raise ValueError("截止频率必须为正")
 
-    st_f = st.copy()
-    # ObsPy 的 filter 支持 type='butterworth', 'cheby1' 等（取决于 SciPy）。
-    if mode == 'bandpass':
-        st_f.filter('bandpass', freqmin=fmin, freqmax=fmax, corners=int(order), zerophase=zerophase)
-    elif mode == 'bandstop':
-        st_f.filter('bandstop', freqmin=fmin, freqmax=fmax, corners=int(order), zerophase=zerophase)
-    elif mode == 'lowpass':
-        st_f.filter('lowpass', freq=fmin, corners=int(order), zerophase=zerophase)
-    elif mode == 'highpass':
-        st_f.filter('highpass', freq=fmin, corners=int(order), zerophase=zerophase)
+    st_f = st if (inplace or isinstance(input_path_or_stream, str)) else _shallow_stream_clone(st)
+    # 与 ObsPy Stream.filter 等价的 Butterworth 滤波：SOS 只设计一次，全部道一次处理
+    _filter_stream_inplace(st_f, mode, fmin, fmax, order, zerophase)
 
     out_dir = _ensure_output_dir(in_path, 'denoise')
     base, ext = os.path.splitext(os.path.basename(in_path))
@@ -537,6 +1012,77 @@ def filter_stream(
     return out_path
 
 
+def _threshold_inplace(x: np.ndarray, t, mode: str) -> np.ndarray:
+    """
+    原地阈值处理（t 可为标量或可广播数组）。soft/hard 以无分支的逐元素运算实现，
+    避免 pywt.threshold 的中间数组；其他模式交由 pywt.threshold。
+    """
+    if mode == 'soft':
+        mag = np.abs(x)
+        np.subtract(mag, t, out=mag)
+        np.maximum(mag, 0, out=mag)
+        return np.copysign(mag, x, out=x)
+    if mode == 'hard':
+        # 乘以 0/1 掩码：单次连续步长的 ufunc，比 copyto(where=) 的掩码写入快约 4 倍
+        return np.multiply(x, np.abs(x) >= t, out=x)
+    return pywt.threshold(x, t, mode=mode)
+
+
+def _soft_threshold_rows(c, thr):
+    """
+    逐行软阈值内核（供 numba 编译，原地修改二维 c）：第 r 行阈值为 thr[r]，
+    单次遍历完成 sign(x)*max(|x|-t, 0)，与 _threshold_inplace 的 'soft' 一致且无中间数组。
+    """
+    n_rows, m = c.shape
+    for r in prange(n_rows):
+        t = thr[r]
+        z = t - t  # 与 c 同精度的 0，避免 float32 行内提升为 float64 而失去向量化
+        row = c[r]
+        for i in range(m):
+            x = row[i]
+            row[i] = x - t if x > t else (x + t if x < -t else z)
+
+
+def _wavelet_denoise_block(
+    X: np.ndarray,
+    wavelet: str,
+    level: Optional[int],
+    threshold: Optional[float],
+    thr_mode: str,
+) -> np.ndarray:
+    """
+    对一组等长道 X（形状 (n_traces, n_samples)）沿最后一维整体做小波阈值降噪，
+    返回 float32 重构结果（float32 输入全程单精度计算）。阈值按道独立估计，供 advanced_denoise 分块并行调用。
+    """
+    n = X.shape[-1]
+    wavelet = _get_wavelet(wavelet)
+    max_level = pywt.dwt_max_level(n, wavelet.dec_len)
+    L = level if (level is not None and level > 0) else max_level
+    coeffs = pywt.wavedec(X, wavelet, level=L, axis=-1)
+    # 估计噪声 sigma via MAD of detail coeff at highest level（逐道）
+    detail = coeffs[1] if len(coeffs) > 1 else coeffs[0]
+    if detail.shape[-1]:
+        med = np.median(detail, axis=-1, keepdims=True)
+        sigma = np.median(np.abs(detail - med), axis=-1, keepdims=True) / 0.6745
+    else:
+        sigma = np.zeros(X.shape[:-1] + (1,), dtype=X.dtype)
+    thr = threshold if (threshold is not None) else sigma * math.sqrt(2 * math.log(n + 1))
+    kernel = _parallel_kernel(_soft_threshold_rows) if thr_mode == 'soft' and X.ndim == 2 else None
+    if kernel is not None:
+        # 软阈值走 numba 内核：各层细节系数原地单次遍历，阈值展开为逐行数组
+        thr_rows = np.broadcast_to(np.asarray(thr, dtype=X.dtype).reshape(-1), (X.shape[0],))
+        thr_rows = np.ascontiguousarray(thr_rows)
+        coeffs_thr = [coeffs[0]] + [np.ascontiguousarray(c) for c in coeffs[1:]]
+        with _numba_lock:
+            for c in coeffs_thr[1:]:
+                kernel(c, thr_rows)
+    else:
+        coeffs_thr = [coeffs[0]] + [_threshold_inplace(c, thr, thr_mode) for c in coeffs[1:]]
+    X_rec = pywt.waverec(coeffs_thr, wavelet, axis=-1)
+    # 对齐长度
+    return X_rec[..., :min(X_rec.shape[-1], n)].astype(np.float32, copy=False)
+
+
 def advanced_denoise(
     input_path_or_stream: Union[str, object],
     method: str = 'wavelet',
@@ -544,6 +1090,8 @@ def advanced_denoise(
     level: Optional[int] = None,
     threshold: Optional[float] = None,
     thr_mode: str = 'soft',
+    inplace: bool = False,
+    n_workers: Optional[int] = None,
 ) -> str:
     """
     高级降噪：默认采用小波阈值（逐道处理）。
@@ -554,6 +1102,9 @@ def advanced_denoise(
     - level: 分解层数（None 则由 pywt 依据数据长度与小波决定最大可行层）
     - threshold: 阈值（None 则采用 VisuShrink: sigma*sqrt(2*log(n))，sigma 由 MAD 估算）
     - thr_mode: 'soft' 或 'hard'
+    - inplace: 为 True 时直接修改传入的 Stream（省去复制）；默认 False，仅复制头信息，传入的 Stream 保持不变
+    - n_workers: 内部线程数上限（None 为 CPU 核数）；调用方已按文件并行时（如 GUI）传 1，
+      在当前线程内串行处理，避免线程数相乘造成超额订阅
 
     返回
     - 输出文件路径，位于 DFSPy_denoise_outputs
@@ -574,21 +1125,24 @@ def advanced_denoise(
     else:
         raise TypeError("input_path_or_stream 必须是 str 或 Stream")
 
-    st_out = st.copy()
-    for tr in st_out:
-        x = tr.data.astype(np.float64)
-        # 估计噪声 sigma via MAD of detail coeff at highest level
-        max_level = pywt.dwt_max_level(len(x), pywt.Wavelet(wavelet).dec_len)
-        L = level if (level is not None and level > 0) else max_level
-        coeffs = pywt.wavedec(x, wavelet, level=L)
-        detail = coeffs[1] if len(coeffs) > 1 else coeffs[0]
-        sigma = np.median(np.abs(detail - np.median(detail))) / 0.6745 if detail.size else 0.0
-        thr = threshold if (threshold is not None) else sigma * math.sqrt(2 * math.log(len(x) + 1))
-        coeffs_thr = [coeffs[0]] + [pywt.threshold(c, thr, mode=thr_mode) for c in coeffs[1:]]
-        x_rec = pywt.waverec(coeffs_thr, wavelet)
-        # 对齐长度
-        n = min(len(x_rec), len(x))
-        tr.data = x_rec[:n].astype(np.float32)
+    st_out = st if (inplace or isinstance(input_path_or_stream, str)) else _shallow_stream_clone(st)
+    # 等长道堆叠为矩阵，沿样点轴整体分解（减少逐道 Python 调度）；不等长时逐道成块。
+    # 各块相互独立，pywt 的 C 实现会释放 GIL，故用线程池并行处理。
+    n_workers = max(1, n_workers or os.cpu_count() or 1)
+    # 全程 float32 处理：输出本就以 float32 存储，小波阈值降噪的误差远大于单精度舍入
+    if len(st_out) and len({len(tr.data) for tr in st_out}) == 1:
+        X = np.asarray([tr.data for tr in st_out], dtype=np.float32)
+        blocks = np.array_split(X, min(n_workers, len(X)))
+    else:
+        blocks = [tr.data.astype(np.float32)[None, :] for tr in st_out]
+    if n_workers == 1:
+        results = [_wavelet_denoise_block(B, wavelet, level, threshold, thr_mode) for B in blocks]
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as ex:
+            results = list(ex.map(lambda B: _wavelet_denoise_block(B, wavelet, level, threshold, thr_mode), blocks))
+    rows = [row for block in results for row in block]
+    for tr, x_rec in zip(st_out, rows):
+        tr.data = x_rec
 
     out_dir = _ensure_output_dir(in_path, 'denoise')
     base, ext = os.path.splitext(os.path.basename(in_path))
@@ -597,6 +1151,194 @@ def advanced_denoise(
     st_out.write(out_path, format=fmt)
     return out_path
 
+def _corr_denoise_blockgram(data: np.ndarray, window_size: int, step_size: int, corr_threshold: float) -> np.ndarray:
+    """
+    相关性降噪的分块 Gram 实现，要求 window_size 为 step_size 的整数倍（r = window/step > 1）。
+
+    每个窗口恰由 r 个相邻的步长块组成：各块的 Gram 矩阵 X_b X_b^T 与行和只计算一次，
+    窗口统计量由 r 个块累加得到，去均值相关矩阵为 G - S S^T / W。
+    由此每个窗口的相关计算从 O(C^2 W) 降为 O(r C^2)，结果与逐窗口计算一致（浮点舍入内）。
+    """
+    n_channels, n_samples = data.shape
+    r = window_size // step_size
+    n_windows = (n_samples - window_size) // step_size + 1
+    deno = np.zeros_like(data)
+    kernel = _parallel_kernel(_corr_suppress_window)
+
+    grams, sums = [], []  # 仅保留当前窗口所需的 r 个块
+    for i in range(n_windows):
+        start = i * step_size
+        end = start + window_size
+        while len(grams) < r:
+            b = start + len(grams) * step_size
+            blk = data[:, b:b + step_size]
+            grams.append(blk @ blk.T)
+            sums.append(blk.sum(axis=1))
+        G = np.sum(grams, axis=0)
+        S = np.sum(sums, axis=0)
+        grams.pop(0)
+        sums.pop(0)
+
+        win = data[:, start:end]
+        # 去均值相关矩阵；方差做非负截断以吸收舍入误差
+        Gc = G - np.outer(S, S) / window_size
+        w_norm = np.sqrt(np.maximum(np.diag(Gc), 0.0))
+        denom = np.outer(w_norm, w_norm)
+        corr = np.divide(Gc, denom, out=np.zeros_like(denom), where=denom > 0)
+        signal_mask = np.mean(np.abs(corr), axis=0) >= corr_threshold
+
+        # 重叠部分由后一个窗口覆盖，故每个窗口只需写入 [start, start + step)（最后一个窗口写满整窗）
+        own = window_size if i == n_windows - 1 else step_size
+        if not np.any(signal_mask):
+            deno[:, start:start + own] = win[:, :own]
+        elif kernel is not None:
+            with _numba_lock:
+                kernel(win, signal_mask, w_norm, deno[:, start:start + own])
+        else:
+            model = np.mean(win[signal_mask, :], axis=0)
+            # model_c 均值为零，故 win @ model_c 即等于去均值窗口与 model_c 的内积
+            model_c = model - model.mean()
+            denom = w_norm * np.linalg.norm(model_c)
+            ch_corr = np.divide(win @ model_c, denom, out=np.zeros_like(denom), where=denom > 0)
+            w = win[:, :own]
+            deno[:, start:start + own] = w - (1 - np.abs(ch_corr))[:, None] * (w - model[:own])
+    return deno
+
+
+def _corr_suppress_window(win, mask, w_norm, out):
+    """
+    相关性抑制内核（供 numba 编译）：信号道均值为 model，各道按与 model 的相关系数 r 抑制，
+    out[c, k] = x - (1 - |r|)(x - model[k])，只写 out 覆盖的前 out.shape[1] 列。
+    model 累加与逐道内积、输出各为一次遍历，不生成整窗临时数组；道间并行。
+    """
+    n_channels, window = win.shape
+    n_out = out.shape[1]
+    model = np.zeros(window)
+    n_sig = 0
+    for c in range(n_channels):
+        if mask[c]:
+            n_sig += 1
+            for k in range(window):
+                model[k] += win[c, k]
+    model /= n_sig
+    model_c = model - model.mean()
+    m_norm = np.sqrt(np.dot(model_c, model_c))
+    for c in prange(n_channels):
+        acc = 0.0
+        for k in range(window):
+            acc += win[c, k] * model_c[k]
+        den = w_norm[c] * m_norm
+        keep = 1.0 - abs(acc / den) if den > 0 else 1.0
+        for k in range(n_out):
+            x = win[c, k]
+            out[c, k] = x - keep * (x - model[k])
+
+
+def _corr_denoise_numpy(data: np.ndarray, window_size: int, step_size: int, corr_threshold: float) -> np.ndarray:
+    """相关性降噪的 NumPy 实现（逐窗口向量化）。data 形状 (n_channels, n_samples)，返回降噪结果。"""
+    n_channels, n_samples = data.shape
+    if step_size < window_size and window_size % step_size == 0:
+        return _corr_denoise_blockgram(data, window_size, step_size, corr_threshold)
+    deno = np.zeros_like(data)
+    n_windows = (n_samples - window_size) // step_size + 1
+    # 各窗口只写入 [start, 下一窗口 start)（最后一个窗口写满整窗），与逐窗口覆盖写入的结果一致
+    own = min(step_size, window_size)
+    if window_size < 2:
+        for i in range(n_windows):
+            start = i * step_size
+            deno[:, start:start + window_size] = data[:, start:start + window_size]
+        return deno
+
+    # 滑动窗口视图 (n_windows, n_channels, window)，按批处理以限制去均值副本的内存
+    views = np.lib.stride_tricks.sliding_window_view(data, window_size, axis=1)[:, ::step_size].transpose(1, 0, 2)
+    batch = max(1, (1 << 24) // max(1, n_channels * window_size))
+    for b0 in range(0, n_windows, batch):
+        win = views[b0:b0 + batch]
+        # 去均值后以批量矩阵乘得到通道间相关系数（等价于 np.corrcoef，零方差道相关记为 0）
+        win_c = win - win.mean(axis=2, keepdims=True)
+        w_norm = np.sqrt(np.einsum('wck,wck->wc', win_c, win_c))
+        denom = w_norm[:, :, None] * w_norm[:, None, :]
+        corr = np.divide(win_c @ win_c.transpose(0, 2, 1), denom, out=np.zeros_like(denom), where=denom > 0)
+        signal_mask = np.mean(np.abs(corr), axis=1) >= corr_threshold
+        n_sig = signal_mask.sum(axis=1)
+
+        # 信号道均值作为 model；各道与 model 的相关性一次算出，按相关性整体抑制
+        model = np.einsum('wc,wck->wk', signal_mask.astype(data.dtype), win) / np.maximum(n_sig, 1)[:, None]
+        model_c = model - model.mean(axis=1, keepdims=True)
+        denom = w_norm * np.linalg.norm(model_c, axis=1)[:, None]
+        ch_corr = np.divide(np.einsum('wck,wk->wc', win_c, model_c), denom, out=np.zeros_like(denom), where=denom > 0)
+        keep = np.where(n_sig[:, None] >= 1, 1 - np.abs(ch_corr), 0.0)
+        res = win - keep[:, :, None] * (win - model[:, None, :])
+        for j in range(win.shape[0]):
+            i = b0 + j
+            start = i * step_size
+            width = window_size if i == n_windows - 1 else own
+            deno[:, start:start + width] = res[j, :, :width]
+    return deno
+
+
+def _corr_denoise_windows(data, out, window, step, thr):
+    """
+    相关性降噪的逐窗口内核（供 numba 编译，与 _corr_denoise_numpy 结果一致）。
+
+    窗口间并行：重叠区域以后一个窗口的结果为准，故每个窗口只写入
+    [start, 下一窗口 start) 区间（最后一个窗口写满整窗），写入互不重叠。
+    """
+    n_channels, n_samples = data.shape
+    n_windows = (n_samples - window) // step + 1
+    for w in prange(n_windows):
+        start = w * step
+        end = start + window
+        own_end = end if w == n_windows - 1 else min(start + step, end)
+        win = data[:, start:end]
+        if window < 2:
+            out[:, start:own_end] = data[:, start:own_end]
+            continue
+
+        # 去均值窗口与各道范数；相关矩阵走 BLAS
+        win_c = np.empty((n_channels, window))
+        norm = np.empty(n_channels)
+        for c in range(n_channels):
+            m = win[c].mean()
+            acc = 0.0
+            for k in range(window):
+                d = win[c, k] - m
+                win_c[c, k] = d
+                acc += d * d
+            norm[c] = np.sqrt(acc)
+        gram = np.dot(win_c, win_c.T)
+
+        n_sig = 0
+        model = np.zeros(window)
+        for c in range(n_channels):
+            acc = 0.0
+            for c2 in range(n_channels):
+                den = norm[c] * norm[c2]
+                if den > 0:
+                    acc += abs(gram[c, c2] / den)
+            if acc / n_channels >= thr:
+                n_sig += 1
+                model += win[c]
+        if n_sig == 0:
+            out[:, start:own_end] = data[:, start:own_end]
+            continue
+        model /= n_sig
+
+        # 各道按与 model 的相关性进行抑制
+        model_c = model - model.mean()
+        m_norm = np.sqrt(np.dot(model_c, model_c))
+        proj = np.dot(win_c, model_c)
+        for c in range(n_channels):
+            den = norm[c] * m_norm
+            r = proj[c] / den if den > 0 else 0.0
+            keep = 1.0 - abs(r)
+            for k in range(start, own_end):
+                x = data[c, k]
+                out[c, k] = x - keep * (x - model[k - start])
+
+
+
+
 def correlation_denoise(
     input_path_or_stream: Union[str, object],
     window_size: int = 1024,
@@ -654,41 +1396,20 @@ def correlation_denoise(
     if not (0 <= corr_threshold <= 1):
         raise ValueError("corr_threshold 应位于 [0,1] 区间")
 
-    # 数据堆叠与去趋势
-    data = np.vstack([tr.data for tr in st_in]).astype(np.float64)  # (n_channels, n_samples)
+    # 数据堆叠与去趋势：一次分配 (n_channels, n_samples) 矩阵，沿样点轴整体线性去趋势
+    data = np.asarray([tr.data for tr in st_in], dtype=np.float64)
     from scipy.signal import detrend as _detrend
-    data = np.vstack([_detrend(ch) for ch in data])
+    data = _detrend(data, axis=1, type='linear', overwrite_data=True)
     n_channels, n_samples = data.shape
 
-    deno = np.zeros_like(data)
-    n_windows = (n_samples - window_size) // step_size + 1
-    for i in range(n_windows):
-        start = i * step_size
-        end = start + window_size
-        if end > n_samples:
-            end = n_samples
-            start = end - window_size
-
-        win = data[:, start:end]
-        # 相关性矩阵与平均相关性
-        if win.shape[1] < 2:
-            deno[:, start:end] = win
-            continue
-        corr = np.corrcoef(win)
-        mean_corr = np.mean(np.abs(corr), axis=0)
-        signal_mask = mean_corr >= corr_threshold
-        n_sig = int(np.sum(signal_mask))
-
-        if n_sig >= 1:
-            model = np.mean(win[signal_mask, :], axis=0)
-            # 遍历各道，按与 model 的相关性进行抑制
-            for ch in range(n_channels):
-                ch_corr = np.corrcoef(win[ch, :], model)[0, 1]
-                ch_corr = 0.0 if np.isnan(ch_corr) else ch_corr
-                deno_win = win[ch, :] - (1 - abs(ch_corr)) * (win[ch, :] - model)
-                deno[ch, start:end] = deno_win
-        else:
-            deno[:, start:end] = win
+    # 窗口为步长整数倍时分块 Gram 累加的计算量远小于逐窗口相关，优先使用；否则用 numba 内核（若可用）
+    blockgram = step_size < window_size and window_size % step_size == 0
+    kernel = None if blockgram else _parallel_kernel(_corr_denoise_windows)
+    if kernel is not None:
+        deno = np.zeros_like(data)
+        kernel(np.ascontiguousarray(data), deno, window_size, step_size, float(corr_threshold))
+    else:
+        deno = _corr_denoise_numpy(data, window_size, step_size, corr_threshold)
 
     # 组装输出 Stream
     st_out = Stream()
@@ -704,6 +1425,88 @@ def correlation_denoise(
     st_out.write(out_path, format=fmt)
     return out_path
 
+def _spectral_subtract_block(X, fs, frame_length, hop_length, window, noise_frames, alpha, beta) -> np.ndarray:
+    """
+    对等长、同采样率的一组道 X（形状 (n_traces, n_samples)）沿最后一维做谱减，返回同形状结果。
+    噪声谱按道独立估计；分帧用 sliding_window_view 视图，整块一次 scipy.fft.rfft/irfft（沿用调用方设置的
+    workers），重叠相加按 ceil(nperseg/hop) 个块向量化累加。数值与 scipy.signal.stft/istft
+    （boundary='zeros', padded=True）一致。
+    """
+    from scipy.fft import rfft as _rfft, irfft as _irfft
+    from scipy.signal import get_window as _get_window
+    n_samples = X.shape[-1]
+    if n_samples == 0:
+        return X
+
+    nperseg = int(max(2, min(frame_length, n_samples)))
+    noverlap = int(max(0, min(nperseg - 1, nperseg - hop_length)))
+    nstep = nperseg - noverlap
+    try:
+        win = _get_window(window, nperseg, fftbins=True)
+    except Exception:
+        win = _get_window('hann', nperseg, fftbins=True)
+    win = win.astype(X.dtype, copy=False)
+    scale = win.sum()
+
+    # 边界补零（各 nperseg//2）并补齐到整帧，分帧 (n_traces, n_frames, nperseg)
+    half = nperseg // 2
+    n_pad = half + n_samples + half
+    n_pad += (-(n_pad - nperseg) % nstep) % nperseg
+    xp = np.zeros(X.shape[:-1] + (n_pad,), dtype=X.dtype)
+    xp[..., half:half + n_samples] = X
+    frames = np.lib.stride_tricks.sliding_window_view(xp, nperseg, axis=-1)[..., ::nstep, :]
+    n_frames = frames.shape[-2]
+
+    # STFT，Zxx 形状 (n_traces, n_frames, n_freqs)
+    Zxx = _rfft(frames * win, axis=-1)
+    Zxx *= 1.0 / scale
+    mag = np.abs(Zxx)
+
+    # 噪声谱估计
+    if noise_frames is not None and noise_frames > 0 and n_frames >= 1:
+        nf = int(min(noise_frames, n_frames))
+        noise_mag = np.mean(mag[..., :nf, :], axis=-2, keepdims=True)
+    else:
+        # 退化：使用每个频点的最小幅度作为噪声估计
+        noise_mag = np.min(mag, axis=-2, keepdims=True)
+
+    # 避免除零
+    eps = 1e-12
+    noise_mag = np.maximum(noise_mag, eps)
+
+    # 谱减（向量化）：|Y| = max(|X| - alpha*|N|, beta*|N|) 且保持相位，
+    # 等价于对复谱原地乘以实数增益 max(1 - alpha*|N|/|X|, beta*|N|/|X|)，免去求相位与复指数
+    ratio = np.divide(noise_mag, np.maximum(mag, eps, out=mag), out=mag)
+    Zxx *= np.maximum(1.0 - alpha * ratio, beta * ratio)
+
+    # iSTFT：逐帧加窗后重叠相加，再除以窗平方和
+    seg = _irfft(Zxx, n=nperseg, axis=-1)
+    seg *= scale * win
+    k = -(-nperseg // nstep)
+    if k * nstep != nperseg:
+        seg = np.concatenate([seg, np.zeros(seg.shape[:-1] + (k * nstep - nperseg,), dtype=seg.dtype)], axis=-1)
+    seg = seg.reshape(seg.shape[:-1] + (k, nstep))
+    out = np.zeros(X.shape[:-1] + (n_frames - 1 + k, nstep), dtype=seg.dtype)
+    for j in range(k):
+        out[..., j:j + n_frames, :] += seg[..., j, :]
+    wsq = np.zeros(k * nstep, dtype=win.dtype)
+    wsq[:nperseg] = win * win
+    norm = np.zeros((n_frames - 1 + k, nstep), dtype=win.dtype)
+    for j in range(k):
+        norm[j:j + n_frames] += wsq[j * nstep:(j + 1) * nstep]
+    out_len = nperseg + (n_frames - 1) * nstep
+    y = out.reshape(X.shape[:-1] + (-1,))[..., half:out_len - half]
+    norm = norm.reshape(-1)[half:out_len - half]
+    y = y / np.where(norm > 1e-10, norm, 1.0)
+
+    # 对齐长度
+    if y.shape[-1] < n_samples:
+        y = np.pad(y, [(0, 0)] * (y.ndim - 1) + [(0, n_samples - y.shape[-1])])
+    elif y.shape[-1] > n_samples:
+        y = y[..., :n_samples]
+    return y
+
+
 def spectral_subtraction_denoise(
     input_path_or_stream: Union[str, object],
     frame_length: int = 1024,
@@ -712,6 +1515,7 @@ def spectral_subtraction_denoise(
     noise_frames: int = 10,
     alpha: float = 1.0,
     beta: float = 0.02,
+    n_workers: Optional[int] = None,
 ) -> str:
     """
     谱减法降噪（逐道 STFT / ISTFT）：
@@ -728,6 +1532,7 @@ def spectral_subtraction_denoise(
     - noise_frames: 用于估计噪声的前置帧数，若不足则退化为全局最小值估计
     - alpha: 谱减系数（>0）
     - beta: 地板系数（>=0），避免音乐噪声
+    - n_workers: FFT 线程数（None 为全部 CPU 核）；调用方已按文件并行时（如 GUI）传 1
 
     返回
     - 输出文件路径（DFSPy_denoise_outputs 下）
@@ -735,7 +1540,7 @@ def spectral_subtraction_denoise(
     if obspy_read is None or Stream is None or Trace is None:
         raise ImportError("需要安装 obspy 才能处理地震数据。pip install obspy")
     try:
-        from scipy.signal import stft as _stft, istft as _istft, get_window as _get_window
+        from scipy.fft import set_workers as _set_fft_workers
     except Exception:
         raise ImportError("需要安装 scipy 才能使用谱减法。pip install scipy")
 
@@ -751,59 +1556,25 @@ def spectral_subtraction_denoise(
     if len(st_in) == 0:
         raise ValueError("输入 Stream 为空")
 
-    # 输出容器
-    st_out = Stream()
-
-    for tr in st_in:
-        x = tr.data.astype(np.float64, copy=False)
-        n_samples = len(x)
-        if n_samples == 0:
-            new_tr = Trace(data=x.astype(np.float32))
-            new_tr.stats = tr.stats.copy()
-            st_out.append(new_tr)
-            continue
-
-        nperseg = int(max(2, min(frame_length, n_samples)))
-        noverlap = int(max(0, min(nperseg - 1, nperseg - hop_length)))
-        try:
-            win = _get_window(window, nperseg, fftbins=True)
-        except Exception:
-            win = _get_window('hann', nperseg, fftbins=True)
-
-        fs = float(getattr(tr.stats, 'sampling_rate', 1.0) or 1.0)
-
-        # STFT
-        f, t, Zxx = _stft(x, fs=fs, window=win, nperseg=nperseg, noverlap=noverlap, boundary='zeros', padded=True, return_onesided=True)
-        mag = np.abs(Zxx)
-        phase = np.angle(Zxx)
-
-        # 噪声谱估计
-        if noise_frames is not None and noise_frames > 0 and mag.shape[1] >= 1:
-            nf = int(min(noise_frames, mag.shape[1]))
-            noise_mag = np.mean(mag[:, :nf], axis=1)
-        else:
-            # 退化：使用每个频点的最小幅度作为噪声估计
-            noise_mag = np.min(mag, axis=1) if mag.size else np.array([], dtype=np.float64)
-
-        # 避免除零
-        eps = 1e-12
-        noise_mag = np.maximum(noise_mag, eps)
-
-        # 谱减（向量化）
-        floor = beta * noise_mag[:, None]
-        mag_hat = np.maximum(mag - alpha * noise_mag[:, None], floor)
-
-        # 重构复谱并 iSTFT
-        Y = mag_hat * np.exp(1j * phase)
-        _, y = _istft(Y, fs=fs, window=win, nperseg=nperseg, noverlap=noverlap, input_onesided=True, boundary=True)
+    # 等长且同采样率时堆叠为矩阵，沿样点轴一次 STFT（共享 FFT 计划，多线程 FFT）；否则逐道成块
+    rates = {float(getattr(tr.stats, 'sampling_rate', 1.0) or 1.0) for tr in st_in}
+    # 单精度输入使 STFT 走 complex64，带宽与内存减半（输出本就以 float32 存储）
+    if len(rates) == 1 and len({len(tr.data) for tr in st_in}) == 1:
+        blocks = [(np.asarray([tr.data for tr in st_in], dtype=np.float32), rates.pop())]
+    else:
+        blocks = [(tr.data.astype(np.float32)[None, :], float(getattr(tr.stats, 'sampling_rate', 1.0) or 1.0))
+                  for tr in st_in]
 
-        # 对齐长度
-        if len(y) < n_samples:
-            y = np.pad(y, (0, n_samples - len(y)))
-        elif len(y) > n_samples:
-            y = y[:n_samples]
+    rows = []
+    with _set_fft_workers(n_workers or -1):
+        for X, fs in blocks:
+            Y = _spectral_subtract_block(X, fs, frame_length, hop_length, window, noise_frames, alpha, beta)
+            rows.extend(Y)
 
-        new_tr = Trace(data=y.astype(np.float32))
+    # 输出容器
+    st_out = Stream()
+    for tr, y in zip(st_in, rows):
+        new_tr = Trace(data=y.astype(np.float32, copy=False))
         new_tr.stats = tr.stats.copy()
         st_out.append(new_tr)
 
@@ -815,7 +1586,24 @@ def spectral_subtraction_denoise(
     st_out.write(out_path, format=fmt)
     return out_path
 
-def strain_to_velocity(input_path_or_stream: Union[str, object], apparent_velocity: float, normalize_divisor: float = 5000.0) -> str:
+def _scale_flat(a, k):
+    """一维连续数组原地乘以常数的内核（供 numba 编译）：多线程分段，适合大数据量的逐样点换算。"""
+    for i in prange(a.shape[0]):
+        a[i] *= k
+
+
+def _scale_inplace(a: np.ndarray, k) -> None:
+    """a *= k（原地）。C 连续时使用 numba 并行内核，否则（或未安装 numba）回退到 np.multiply。"""
+    kernel = _parallel_kernel(_scale_flat)
+    if kernel is not None and a.flags.c_contiguous and a.size:
+        with _numba_lock:
+            kernel(a.reshape(-1), a.dtype.type(k))
+    else:
+        np.multiply(a, k, out=a)
+
+
+def strain_to_velocity(input_path_or_stream: Union[str, object], apparent_velocity: float,
+                       normalize_divisor: float = 5000.0, inplace: bool = False) -> str:
     """
     应变 -> 速度 的简单转换（按原程序约定）：
     - 先除以 normalize_divisor（默认 5000，用于从工程量换算到“标准应变”）
@@ -825,19 +1613,41 @@ def strain_to_velocity(input_path_or_stream: Union[str, object], apparent_veloci
     - input_path_or_stream: 输入文件路径（SAC/MSEED 等）或 Stream
     - apparent_velocity: 视速度 (m/s)，必须为正
     - normalize_divisor: 规范化除数，>0
+    - inplace: 为 True 时直接修改传入的 Stream（省去复制）；默认 False，仅复制头信息，传入的 Stream 保持不变
 
     返回
     - 输出文件路径（与输入同目录的 DFSPy_paraconv_outputs 子目录）
     """
-    if obspy_read is None:
-        raise ImportError("需要安装 obspy 才能进行参量转换。pip install obspy")
     if not (apparent_velocity and apparent_velocity > 0):
         raise ValueError("apparent_velocity 必须为正值 (m/s)")
     if not (normalize_divisor and normalize_divisor > 0):
         raise ValueError("normalize_divisor 必须为正值")
+    return strain_to_velocity_scale(input_path_or_stream, apparent_velocity / normalize_divisor, inplace)
+
+
+def strain_to_velocity_scale(input_path_or_stream: Union[str, object], scale: float, inplace: bool = False,
+                             return_stream: bool = False) -> Union[str, Tuple[str, object]]:
+    """
+    以合并后的比例系数完成应变 -> 速度换算：velocity = strain * scale，
+    其中 scale = apparent_velocity / normalize_divisor（由调用方预先算好，逐样点只做一次乘法）。
+
+    参数
+    - input_path_or_stream: 输入文件路径（SAC/MSEED 等）或 Stream
+    - scale: 比例系数，必须为正
+    - inplace: 同 strain_to_velocity
+    - return_stream: 为 True 时同时返回换算后的 Stream，调用方（如 GUI 绘图）无需再读回刚写出的文件
+
+    返回
+    - 输出文件路径（与输入同目录的 DFSPy_paraconv_outputs 子目录）；return_stream=True 时为 (输出文件路径, Stream)
+    """
+    if obspy_read is None:
+        raise ImportError("需要安装 obspy 才能进行参量转换。pip install obspy")
+    if not (scale and scale > 0):
+        raise ValueError("scale 必须为正值")
 
     if isinstance(input_path_or_stream, str):
-        st = read_stream(input_path_or_stream)
+        # 读取时即转为 float32，随后原地换算
+        st = read_stream(input_path_or_stream, dtype=np.float32)
         in_path = input_path_or_stream
     elif isinstance(input_path_or_stream, Stream):
         st = input_path_or_stream
@@ -845,10 +1655,31 @@ def strain_to_velocity(input_path_or_stream: Union[str, object], apparent_veloci
     else:
         raise TypeError("input_path_or_stream 必须是 str 或 Stream")
 
-    st_v = st.copy()
-    for tr in st_v:
-        tr.data = (tr.data.astype(np.float64) / normalize_divisor) * apparent_velocity
-        tr.data = tr.data.astype(np.float32)
+    owned = inplace or isinstance(input_path_or_stream, str)
+    st_v = st if owned else _shallow_stream_clone(st)
+    # 单次 float32 乘法完成换算
+    k = np.float32(scale)
+    equal_len = len(st_v) > 0 and len({len(tr.data) for tr in st_v}) == 1
+    if owned and all(tr.data.dtype == np.float32 and tr.data.flags.writeable and tr.data.flags.c_contiguous
+                     for tr in st_v):
+        # 数据缓冲区归本函数/调用方所有：原地相乘，无额外分配
+        for tr in st_v:
+            _scale_inplace(tr.data, k)
+    elif equal_len:
+        # 需要复制时（类型不符/只读/不得修改原数据），等长道一次堆叠为 (道, 样点) 连续 float32 矩阵，
+        # 单次内核遍历全部样点，各道取行视图
+        X = np.asarray([tr.data for tr in st_v], dtype=np.float32)
+        _scale_inplace(X, k)
+        for tr, x in zip(st_v, X):
+            tr.data = x
+    elif owned:
+        for tr in st_v:
+            if not (tr.data.dtype == np.float32 and tr.data.flags.writeable and tr.data.flags.c_contiguous):
+                tr.data = np.array(tr.data, dtype=np.float32)
+            _scale_inplace(tr.data, k)
+    else:
+        for tr in st_v:
+            tr.data = np.multiply(tr.data, k, dtype=np.float32)
 
     out_dir = _ensure_output_dir(in_path, 'paraconv')
     in_base = os.path.basename(in_path)
@@ -856,68 +1687,387 @@ def strain_to_velocity(input_path_or_stream: Union[str, object], apparent_veloci
     ext = ext or '.mseed'
     out_path = os.path.join(out_dir, f"{base}_velocity{ext}")
     fmt = ext[1:].upper()
-    st_v.write(out_path, format=fmt)
-    return out_path
+    if fmt == 'MSEED':
+        # 换算结果均为 float32（约 7 位有效数字），显式按 FLOAT32 编码写出，不沿用输入的编码设置
+        st_v.write(out_path, format=fmt, encoding='FLOAT32')
+    else:
+        st_v.write(out_path, format=fmt)
+    return (out_path, st_v) if return_stream else out_path
 
 
 # ----------------------------- 压缩 / 解压 -----------------------------
 
-def compress_fwt_txt(txt_path: str, wavelet: str = 'haar') -> Tuple[str, float]:
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+_OOB_MAGIC = b'DFSPKL5\x00'
+
+
+def _dump_oob_pickle(obj, out_path: str) -> None:
+    """
+    以 pickle 协议 5 带外缓冲写出：ndarray 数据不拷贝进 pickle 字节流，而是在其后直接写出原始缓冲区。
+    文件结构：魔数 | 头长度、缓冲区个数 | 各缓冲区长度 | pickle 头 | 各缓冲区数据。
     """
-    使用离散小波（FWT）对 txt 矩阵数据进行系数压缩，并保存为 .pkl。
+    buffers: List[pickle.PickleBuffer] = []
+    head = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    views = [b.raw() for b in buffers]
+    with open(out_path, 'wb') as f:
+        f.write(_OOB_MAGIC)
+        f.write(struct.pack('<QI', len(head), len(views)))
+        f.write(struct.pack(f'<{len(views)}Q', *(v.nbytes for v in views)))
+        f.write(head)
+        for v in views:
+            f.write(v)
+
+
+def _load_oob_pickle(f):
+    """读取 _dump_oob_pickle 写出的数据流（已越过魔数），缓冲区直接读入可写 bytearray。"""
+    head_len, n_buf = struct.unpack('<QI', f.read(12))
+    sizes = struct.unpack(f'<{n_buf}Q', f.read(8 * n_buf))
+    head = f.read(head_len)
+    bufs = []
+    for n in sizes:
+        b = bytearray(n)
+        f.readinto(b)
+        bufs.append(b)
+    return pickle.loads(head, buffers=bufs)
+
+
+def _load_compressed_pickle(path: str):
+    """读取 pickle 系数文件；按文件头识别带外缓冲格式与 zstd/gzip 压缩，兼容未压缩的旧 .pkl。"""
+    with open(path, 'rb') as raw:
+        magic = raw.read(len(_OOB_MAGIC))
+        if magic == _OOB_MAGIC:
+            return _load_oob_pickle(raw)
+        raw.seek(0)
+        if magic.startswith(_ZSTD_MAGIC):
+            zstd = _optional_import('zstandard')
+            if zstd is None:
+                raise ImportError("该文件使用 zstd 压缩，需要安装 zstandard。pip install zstandard")
+            with zstd.ZstdDecompressor().stream_reader(raw) as f:
+                return pickle.load(f)
+        if magic.startswith(_GZIP_MAGIC):
+            with gzip.GzipFile(fileobj=raw, mode='rb') as f:
+                return pickle.load(f)
+        return pickle.load(raw)
+
+
+def compress_fwt_txt(txt_path: str, wavelet: str = 'haar', quantize: bool = False,
+                     hard_threshold: float = 0.0) -> Tuple[str, float]:
+    """
+    使用离散小波（FWT）对 txt 矩阵数据进行系数压缩并保存。已安装 zstandard 时输出 .dfz
+    （np.savez 归档再经多线程 zstd 压缩，阈值化后的大量零系数压缩更充分、读取更快），
+    否则输出 .npz（np.savez_compressed）。各层系数为 (level_len, n_traces) 的二维数组，
+    键名 c0..cN（c0 为近似系数）。非零元素不超过一半的细节层改为稀疏存储：g{i} 为按行展开后
+    相邻非零元素下标的差（uint16/32/64），v{i} 为非零值，z{i} 为该层形状（不再写 c{i}）。
 
     参数
     - txt_path: 输入 txt 数据文件（samples x traces）
     - wavelet: 小波基名称（默认 'haar'）
+    - quantize: 为 True 时细节系数按道量化为 int16（scale=max|c|/32767，另存 s{i}），
+      近似系数保持 float32；文件更小，重构误差不超过各道 scale/2
+    - hard_threshold: 细节系数硬阈值（绝对值，与数据同单位），|c| 低于该值置零以提高压缩率；默认 0 不做阈值（无损）
 
     返回
-    - (输出 .pkl 路径, 压缩比百分数)，压缩比=压缩文件大小/原文件大小*100
+    - (输出 .dfz/.npz 路径, 压缩比百分数)，压缩比=压缩文件大小/原文件大小*100
 
     可能异常
     - ImportError: 未安装 pywt
     - FileNotFoundError/ValueError
     """
-    if pywt is None:
-        raise ImportError("需要安装 pywt 才能进行 FWT 压缩。pip install PyWavelets")
-    data = read_txt_array(txt_path)
-    out_dir = _ensure_output_dir(txt_path, 'compress')
+    return compress_fwt_txt_batch([txt_path], wavelet, quantize, hard_threshold)[0]
+
+
+def _hard_threshold_flat(a, thr):
+    """一维连续数组原地硬阈值内核（供 numba 编译）：|x| < thr 置零，与 _threshold_inplace 的 'hard' 一致。"""
+    for i in prange(a.shape[0]):
+        if abs(a[i]) < thr:
+            a[i] = 0.0
+
 
+def _haar_dec_level(a, ca, cd):
+    """Haar 单层分解内核（供 numba 编译）：沿 axis=0 成对求和/差并乘 1/sqrt(2)，奇数长度末样点对称延拓（同 pywt 'symmetric'）。"""
+    n = a.shape[0]
+    for i in prange(cd.shape[0]):
+        i0 = 2 * i
+        i1 = min(i0 + 1, n - 1)
+        for j in range(a.shape[1]):
+            e = a[i0, j]
+            o = a[i1, j]
+            ca[i, j] = (e + o) * 0.7071067811865476
+            cd[i, j] = (e - o) * 0.7071067811865476
+
+
+def _haar_dec_2level(a, ca2, cd2, cd1):
+    """
+    Haar 两层融合分解内核（供 numba 编译）：每 4 个样点一次算出第 1 层细节与第 2 层近似/细节，
+    第 1 层近似只留在寄存器中不写回内存，访存量约为逐层调用 _haar_dec_level 两次的一半。
+    """
+    n = a.shape[0]
+    l1 = cd1.shape[0]
+    for i in prange(cd2.shape[0]):
+        j0 = 2 * i
+        j1 = min(j0 + 1, l1 - 1)  # 第 1 层近似为奇数长度时末项对称延拓（j1 == j0，重复写入相同值）
+        r0 = 2 * j0
+        r0b = min(r0 + 1, n - 1)
+        r1 = 2 * j1
+        r1b = min(r1 + 1, n - 1)
+        for k in range(a.shape[1]):
+            x0 = a[r0, k]
+            x1 = a[r0b, k]
+            x2 = a[r1, k]
+            x3 = a[r1b, k]
+            cd1[j0, k] = (x0 - x1) * 0.7071067811865476
+            cd1[j1, k] = (x2 - x3) * 0.7071067811865476
+            s0 = (x0 + x1) * 0.7071067811865476
+            s1 = (x2 + x3) * 0.7071067811865476
+            ca2[i, k] = (s0 + s1) * 0.7071067811865476
+            cd2[i, k] = (s0 - s1) * 0.7071067811865476
+
+
+def _haar_rec_level(ca, cd, out):
+    """Haar 单层重构内核（供 numba 编译）：_haar_dec_level 的逆，out 长度为 2 * len(cd)。"""
+    for i in prange(cd.shape[0]):
+        for j in range(cd.shape[1]):
+            a = ca[i, j]
+            d = cd[i, j]
+            out[2 * i, j] = (a + d) * 0.7071067811865476
+            out[2 * i + 1, j] = (a - d) * 0.7071067811865476
+
+
+def _haar_coeff_lens(n: int) -> List[int]:
+    """多层 Haar 分解（dwt_max_level 层，'symmetric'）各系数的长度，顺序同 wavedec：[cA_n, cD_n, ..., cD_1]。"""
+    lens = []
+    for _ in range(pywt.dwt_max_level(n, 2)):
+        n = (n + 1) // 2
+        lens.append(n)
+    return lens[-1:] + lens[::-1]
+
+
+def _haar_wavedec(x: np.ndarray) -> List[np.ndarray]:
+    """
+    与 pywt.wavedec(x, 'haar', axis=0) 等价的多层 Haar 分解（层数取 dwt_max_level，边界 'symmetric'）。
+    每层只做一次成对加减，已安装 numba 时按行并行；返回 [cA_n, cD_n, ..., cD_1]。
+
+    各层系数按 _haar_coeff_lens 预先算出长度，全部写入同一块 (sum(lens), n_traces) 缓冲区，返回的是其上
+    的连续行切片；中间各层近似系数在两块暂存区间交替，不再逐层分配输出数组。
+    有 numba 时每两层用 _haar_dec_2level 融合为一次遍历，层数为奇数时最后一层单独处理。
+    """
+    a = np.ascontiguousarray(x)
+    lens = _haar_coeff_lens(a.shape[0])
+    if not lens:  # 不足 2 个样点，不分解
+        return [a]
+    bounds = np.cumsum([0] + lens)
+    out = np.empty((bounds[-1], a.shape[1]), dtype=a.dtype)
+    coeffs = [out[bounds[i]:bounds[i + 1]] for i in range(len(lens))]
+    n_levels = len(lens) - 1
+    scratch = [np.empty((lens[-1], a.shape[1]), dtype=a.dtype),
+               np.empty((lens[-2], a.shape[1]), dtype=a.dtype)]
+    kernel = _parallel_kernel(_haar_dec_level)
+    kernel2 = _parallel_kernel(_haar_dec_2level)
+    r = a.dtype.type(np.sqrt(0.5))
+    k = 0
+    slot = 0
+    while k < n_levels:
+        step = 2 if kernel2 is not None and n_levels - k >= 2 else 1
+        cd = coeffs[-1 - k]
+        n_ca = coeffs[-k - step].shape[0]
+        ca = coeffs[0] if k + step == n_levels else scratch[slot][:n_ca]
+        slot ^= 1
+        k += step
+        if step == 2:
+            with _numba_lock:
+                kernel2(a, ca, coeffs[-k], cd)
+        elif kernel is not None:
+            with _numba_lock:
+                kernel(a, ca, cd)
+        else:
+            e, o = a[0::2], a[1::2]
+            m = o.shape[0]
+            np.add(e[:m], o, out=ca[:m])
+            np.subtract(e[:m], o, out=cd[:m])
+            if m < cd.shape[0]:  # 奇数长度：末样点对称延拓，和为 2e、差为 0
+                np.add(e[m:], e[m:], out=ca[m:])
+                cd[m:] = 0
+            ca *= r
+            cd *= r
+        a = ca
+    return coeffs
+
+
+def _array_module(use_gpu: Optional[bool] = None):
+    """
+    返回数组模块：use_gpu=None 时已安装 CuPy 且有可用 GPU 则为 cupy，否则为 numpy；
+    use_gpu=False 强制 numpy；use_gpu=True 要求 GPU，不可用时抛 ImportError。
+    """
+    if use_gpu is False:
+        return np
+    cp = _optional_import('cupy')
+    try:
+        available = cp is not None and cp.cuda.is_available()
+    except Exception:
+        available = False
+    if available:
+        return cp
+    if use_gpu:
+        raise ImportError("需要安装 cupy 并有可用的 CUDA GPU。pip install cupy-cuda12x")
+    return np
+
+
+def _haar_waverec(coeffs: List[np.ndarray], xp=np):
+    """
+    _haar_wavedec 的逆变换（与 pywt.waverec(coeffs, 'haar', axis=0) 一致），各层为二维 (level_len, n_traces)。
+    xp 为 cupy 时系数上传显存并在 GPU 上逐层重构，返回 cupy 数组。
+    """
+    dtype = np.result_type(*(c.dtype for c in coeffs))
+    r = dtype.type(np.sqrt(0.5))
+    a = xp.ascontiguousarray(xp.asarray(coeffs[0], dtype=dtype))
+    kernel = _parallel_kernel(_haar_rec_level) if xp is np else None
+    for d in coeffs[1:]:
+        d = xp.ascontiguousarray(xp.asarray(d, dtype=dtype))
+        a = a[:d.shape[0]]  # 上一层重构结果可能比本层细节系数多一个样点
+        out = xp.empty((2 * d.shape[0], d.shape[1]), dtype=dtype)
+        if kernel is not None:
+            with _numba_lock:
+                kernel(a, d, out)
+        else:
+            out[0::2] = (a + d) * r
+            out[1::2] = (a - d) * r
+        a = out
+    return a
+
+
+def _write_fwt_npz(txt_path: str, coeffs: List[np.ndarray], wavelet: str, shape: Tuple[int, ...],
+                   quantize: bool) -> Tuple[str, float]:
+    """将一个 txt 文件的各层二维系数写为 .dfz 或 .npz（格式见 compress_fwt_txt），返回 (输出路径, 压缩比%)。"""
+    out_dir = _ensure_output_dir(txt_path, 'compress')
     size_src = os.path.getsize(txt_path)
-    coeffs: Dict[str, object] = {}
-    for i in range(data.shape[1]):
-        coeffs[f'coefficients_{i}'] = pywt.wavedec(data[:, i], wavelet)
 
+    arrays = {}
+    for i, c in enumerate(coeffs):
+        c = c.astype(np.float32, copy=False)
+        if quantize and i > 0:
+            scale = np.abs(c).max(axis=0, keepdims=True) / np.float32(32767)
+            scale[scale == 0] = 1
+            c = np.rint(c / scale).astype(np.int16)
+            arrays[f's{i}'] = scale
+        if i > 0:
+            flat = c.reshape(-1)
+            idx = np.flatnonzero(flat)
+            if idx.size <= flat.size // 2:
+                # 阈值化后大部分为零：只存非零值与下标差分（差分多为小整数，比原下标或稠密零串压缩得更好）
+                gaps = np.diff(idx, prepend=0)
+                top = int(gaps.max()) if gaps.size else 0
+                gap_dtype = np.uint16 if top < 2 ** 16 else np.uint32 if top < 2 ** 32 else np.uint64
+                arrays[f'g{i}'] = gaps.astype(gap_dtype)
+                arrays[f'v{i}'] = flat[idx]
+                arrays[f'z{i}'] = np.array(c.shape)
+                continue
+        arrays[f'c{i}'] = c
+
+    meta = dict(wavelet=np.array(wavelet), shape=np.array(shape), n_levels=np.array(len(coeffs)))
     base = os.path.splitext(os.path.basename(txt_path))[0]
-    out_pkl = os.path.join(out_dir, f"{base}-coefficients.pkl")
-    with open(out_pkl, 'wb') as f:
-        pickle.dump({
-            'wavelet': wavelet,
-            'shape': data.shape,
-            'coeffs': coeffs,
-        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    zstd = _optional_import('zstandard')
+    if zstd is not None:
+        # zipfile 写入需要可定位的文件，先在内存中生成未压缩 npz，再整体 zstd 压缩（threads=-1 使用全部核）
+        buf = io.BytesIO()
+        np.savez(buf, **meta, **arrays)
+        out_path = os.path.join(out_dir, f"{base}-coefficients.dfz")
+        with open(out_path, 'wb') as f:
+            f.write(zstd.ZstdCompressor(level=3, threads=-1).compress(buf.getbuffer()))
+    else:
+        out_path = os.path.join(out_dir, f"{base}-coefficients.npz")
+        np.savez_compressed(out_path, **meta, **arrays)
 
-    size_cmp = os.path.getsize(out_pkl)
+    size_cmp = os.path.getsize(out_path)
     ratio = (size_cmp / size_src * 100.0) if size_src > 0 else math.nan
-    return out_pkl, ratio
+    return out_path, ratio
 
 
-#----------------
+def compress_fwt_txt_batch(txt_paths: Iterable[str], wavelet: str = 'haar', quantize: bool = False,
+                           hard_threshold: float = 0.0) -> List[Tuple[str, float]]:
+    """
+    批量 FWT 压缩多个 txt 文件，每个输入各自输出一个 .dfz/.npz（与 compress_fwt_txt 格式相同）。
 
+    样点数相同的文件沿道方向拼接后只调用一次 wavedec(axis=0)，再按列切回各文件，
+    省去逐文件的分解调用开销；各道独立分解，结果与逐个调用 compress_fwt_txt 一致。
 
-import os
-import math
-import pickle
-from typing import Tuple, Dict, List
-import numpy as np
-import pywt
-from scipy.fftpack import fft
-# from sklearn.cluster import KMeans
+    参数
+    - txt_paths: 输入 txt 文件列表（samples x traces）
+    - wavelet / quantize / hard_threshold: 同 compress_fwt_txt
+
+    返回
+    - 与输入顺序对应的 [(输出 .npz 路径, 压缩比百分数), ...]
+    """
+    if pywt is None:
+        raise ImportError("需要安装 pywt 才能进行 FWT 压缩。pip install PyWavelets")
+    txt_paths = list(txt_paths)
+    arrays = [read_txt_array(p, dtype=np.float32) for p in txt_paths]
+
+    by_len: Dict[int, List[int]] = {}
+    for i, arr in enumerate(arrays):
+        by_len.setdefault(arr.shape[0], []).append(i)
+
+    results: List[Optional[Tuple[str, float]]] = [None] * len(txt_paths)
+    for idx in by_len.values():
+        # 沿样点轴（axis=0）对全部道一次分解，得到每层一个 (level_len, n_traces) 的二维系数
+        stacked = arrays[idx[0]] if len(idx) == 1 else np.concatenate([arrays[i] for i in idx], axis=1)
+        if wavelet == 'haar':
+            coeffs = _haar_wavedec(stacked)
+        else:
+            coeffs = pywt.wavedec(stacked, _get_wavelet(wavelet), axis=0)
+        if hard_threshold > 0:
+            kernel = _parallel_kernel(_hard_threshold_flat)
+            for c in coeffs[1:]:
+                if kernel is not None and c.flags.c_contiguous:
+                    with _numba_lock:
+                        kernel(c.reshape(-1), c.dtype.type(hard_threshold))
+                else:
+                    _threshold_inplace(c, hard_threshold, 'hard')
+        start = 0
+        for i in idx:
+            stop = start + arrays[i].shape[1]
+            results[i] = _write_fwt_npz(txt_paths[i], [c[:, start:stop] for c in coeffs],
+                                        wavelet, arrays[i].shape, quantize)
+            start = stop
+    return results
+
+
+def _load_fwt_npz(npz_path: str) -> Tuple[str, Tuple[int, ...], List[np.ndarray]]:
+    """读取 compress_fwt_txt 写出的 .dfz/.npz，返回 (wavelet, shape, 各层二维系数)；int16 量化层按 s{i} 还原。"""
+    src = npz_path
+    if npz_path.lower().endswith('.dfz'):
+        zstd = _optional_import('zstandard')
+        if zstd is None:
+            raise ImportError("该文件使用 zstd 压缩，需要安装 zstandard。pip install zstandard")
+        with open(npz_path, 'rb') as f, zstd.ZstdDecompressor().stream_reader(f) as r:
+            src = io.BytesIO(r.read())
+    with np.load(src, allow_pickle=False) as z:
+        wavelet = str(z['wavelet'])
+        shape = tuple(int(v) for v in z['shape'])
+        coeffs = []
+        for i in range(int(z['n_levels'])):
+            if f'g{i}' in z.files:
+                v = z[f'v{i}']
+                c = np.zeros(tuple(int(n) for n in z[f'z{i}']), dtype=v.dtype)
+                c.reshape(-1)[np.cumsum(z[f'g{i}'], dtype=np.int64)] = v
+            else:
+                c = z[f'c{i}']
+            if f's{i}' in z.files:
+                c = c.astype(np.float32) * z[f's{i}']
+            coeffs.append(c)
+    return wavelet, shape, coeffs
+
+
+# ----------------------------- 改进的 FWT 压缩 -----------------------------
 
 def _estimate_signal_features(signal: np.ndarray) -> Dict:
     """估算一维信号的特征（用于自适应小波选择）"""
-    # 计算频谱特征
-    freq = np.abs(fft(signal))[:len(signal)//2]
-    dominant_freq = np.argmax(freq) / len(signal)  # 主导频率归一化
+    # 计算频谱特征（实信号只需正频率半谱，rfft 不计算负频率部分；argmax 对单调变换不变，用幅值平方免开方）
+    F = np.fft.rfft(signal)[:len(signal)//2]
+    power = F.real * F.real + F.imag * F.imag
+    dominant_freq = np.argmax(power) / len(signal)  # 主导频率归一化
     # 计算信号突变程度（一阶差分的方差）
     diff_var = np.var(np.diff(signal))
     return {
@@ -944,145 +2094,315 @@ def _select_optimal_wavelet(features: Dict) -> Tuple[str, int]:
     max_level = 3 if features["diff_var"] < 1e-4 else 5
     return selected_wavelet, max_level
 
-# def _2d_sparse_compress(coeffs_matrix: np.ndarray, threshold_ratio: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
-#     """对系数矩阵进行二维稀疏压缩（利用列间相关性），返回压缩后的矩阵和聚类标签"""
-#     # 对系数矩阵进行K-means聚类，相似列合并压缩
-#     k = max(2, coeffs_matrix.shape[1] // 10)  # 聚类数（每10列聚为一类）
-#     kmeans = KMeans(n_clusters=k, random_state=42).fit(coeffs_matrix.T)
-#     compressed = []
-#     for cluster_id in range(k):
-#         cluster_cols = coeffs_matrix[:, kmeans.labels_ == cluster_id]
-#         # 对聚类内的列取均值作为代表，保留关键信息
-#         cluster_mean = np.mean(cluster_cols, axis=1)
-#         # 阈值过滤：保留能量前(1-threshold_ratio)的系数
-#         energy = np.sum(cluster_mean **2)
-#         sorted_coeffs = np.sort(np.abs(cluster_mean))[::-1]
-#         cumulative_energy = np.cumsum(sorted_coeffs** 2) / energy
-#         threshold_idx = np.argmax(cumulative_energy >= (1 - threshold_ratio))
-#         cluster_mean[np.abs(cluster_mean) < sorted_coeffs[threshold_idx]] = 0
-#         compressed.append(cluster_mean)
-#     return np.column_stack(compressed), kmeans.labels_  # 返回压缩矩阵和标签
-
-# def improved_compress_fwt(txt_path: str) -> Tuple[str, float, float]:
-#     """
-#     改进的FWT压缩算法：自适应小波选择+二维稀疏压缩+去噪一体化
-    
-#     返回：(输出.pkl路径, 压缩比%, 信号信噪比SNR)
-#     """
-#     try:
-#         import pywt
-#     except ImportError:
-#         raise ImportError("需要安装 pywt：pip install PyWavelets")
-    
-#     # 读取原始数据（samples x traces 二维矩阵）
-#     data = np.loadtxt(txt_path)  # 假设txt为空格分隔的矩阵
-#     if len(data.shape) != 2:
-#         raise ValueError("输入数据必须是二维矩阵（samples x traces）")
-#     size_src = os.path.getsize(txt_path)
-#     out_dir = os.path.join(os.path.dirname(txt_path), "compressed_improved")
-#     os.makedirs(out_dir, exist_ok=True)
-    
-#     # 逐列进行自适应小波分解
-#     all_coeffs = []
-#     wavelet_info = []  # 记录每列使用的小波基和层数
-#     for i in range(data.shape[1]):
-#         signal = data[:, i]
-#         # 1. 特征估算与小波自适应选择
-#         features = _estimate_signal_features(signal)
-#         wavelet, level = _select_optimal_wavelet(features)
-#         wavelet_info.append({"wavelet": wavelet, "level": level})
-#         # 2. 小波分解与去噪（贝叶斯阈值）
-#         coeffs = pywt.wavedec(signal, wavelet, level=level)
-#         # 对细节系数进行去噪（保留近似系数，对高频细节施加阈值）
-#         denoised_coeffs = [coeffs[0]]  # 近似系数保留
-#         for cD in coeffs[1:]:
-#             # 贝叶斯阈值计算（基于噪声估计）
-#             sigma = np.median(np.abs(cD)) / 0.6745  # 噪声标准差估计
-#             threshold = sigma * np.sqrt(2 * np.log(len(cD)))
-#             denoised_coeffs.append(pywt.threshold(cD, threshold, mode="soft"))
-#         all_coeffs.append(denoised_coeffs)
-    
-#     # 3. 二维稀疏压缩（利用列间相关性）
-#     # 将系数展平为矩阵（便于二维处理）
-#     max_len = max(len(np.concatenate(coeffs)) for coeffs in all_coeffs)
-#     coeffs_matrix = np.zeros((max_len, data.shape[1]))
-#     for i, coeffs in enumerate(all_coeffs):
-#         flat_coeffs = np.concatenate(coeffs)
-#         coeffs_matrix[:len(flat_coeffs), i] = flat_coeffs
-#     # 二维稀疏压缩（获取压缩矩阵和聚类标签）
-#     compressed_coeffs, cluster_labels = _2d_sparse_compress(coeffs_matrix)
-    
-#     # 保存压缩结果
-#     base = os.path.splitext(os.path.basename(txt_path))[0]
-#     out_pkl = os.path.join(out_dir, f"{base}-improved-coeffs.pkl")
-#     with open(out_pkl, 'wb') as f:
-#         pickle.dump({
-#             "wavelet_info": wavelet_info,
-#             "original_shape": data.shape,
-#             "compressed_coeffs": compressed_coeffs,
-#             "cluster_labels": cluster_labels  # 使用从函数返回的聚类标签
-#         }, f, protocol=pickle.HIGHEST_PROTOCOL)
-    
-#     # 计算压缩比和信噪比（SNR）
-#     size_cmp = os.path.getsize(out_pkl)
-#     ratio = (size_cmp / size_src * 100.0) if size_src > 0 else math.nan
-#     # 估算信噪比（假设去噪后的信号能量/噪声能量）
-#     signal_energy = np.sum(data **2)
-#     noise_energy = signal_energy - np.sum(compressed_coeffs** 2)
-#     snr = 10 * np.log10(signal_energy / noise_energy) if noise_energy > 0 else math.inf
-    
-#     return out_pkl, ratio, snr
-    
+# 主导频率分段边界与对应小波基（与 _select_optimal_wavelet 的候选区间一致，区间外为 haar）
+_WAVELET_EDGES = np.array([0.1, 0.3, 0.6, 1.0])
+_WAVELET_TABLE = np.array(["haar", "db4", "sym5", "coif3", "haar"])
+
+def _estimate_features_batch(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """对 (samples, traces) 矩阵逐列估算特征，一次批量 FFT，返回 (dominant_freq, diff_var) 两个长度为 traces 的数组"""
+    n = data.shape[0]
+    F = np.fft.rfft(data, axis=0)[:n // 2]
+    power = F.real * F.real + F.imag * F.imag  # 幅值平方，argmax 结果与 |F| 相同
+    dominant_freq = np.argmax(power, axis=0) / n
+    diff_var = np.var(np.diff(data, axis=0), axis=0)
+    return dominant_freq, diff_var
+
+def _select_wavelets_batch(dominant_freq: np.ndarray, diff_var: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """_select_optimal_wavelet 的向量化版本：返回每道的小波基名称数组与分解层数数组"""
+    idx = np.searchsorted(_WAVELET_EDGES, dominant_freq, side='right')
+    return _WAVELET_TABLE[idx], np.where(diff_var < 1e-4, 3, 5)
+
+def _bayes_soft_threshold_cols(cD, const):
+    """
+    逐列贝叶斯软阈值内核（供 numba 编译，原地修改 cD）：
+    阈值 = median(|cD[:, t]|)/0.6745 * const，单次遍历完成软阈值，无中间数组。
+    """
+    n, m = cD.shape
+    for t in prange(m):
+        col = cD[:, t]
+        thr = np.median(np.abs(col)) / 0.6745 * const
+        for i in range(n):
+            x = col[i]
+            if x > thr:
+                col[i] = x - thr
+            elif x < -thr:
+                col[i] = x + thr
+            else:
+                col[i] = 0.0
+
+
+@functools.lru_cache(maxsize=None)
+def _universal_threshold_consts(n_samples: int, wavelet: str, level: int) -> Tuple[float, ...]:
+    """
+    通用阈值常数 sqrt(2*ln(len(cD)))，按 wavedec 细节系数顺序（cD_level ... cD_1）返回。
+    各层长度仅由 (样点数, 小波基, 层数) 决定，由 pywt.dwt_coeff_len 逐层推得，无需实际分解。
+    """
+    filter_len = _get_wavelet(wavelet).dec_len
+    lens = []
+    n = n_samples
+    for _ in range(level):
+        n = pywt.dwt_coeff_len(n, filter_len, 'symmetric')
+        lens.append(n)
+    return tuple(float(c) for c in np.sqrt(2 * np.log(lens[::-1])))
+
+
+def _truncated_svd(a: np.ndarray, k: int, oversample: int = 10, n_iter: int = 2,
+                   seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    前 k 个奇异三元组 (U[:, :k], s[:k], Vt[:k])：随机化值域估计（Halko 等，固定种子保证结果可复现），
+    只对 (k + oversample) 维投影做小规模 SVD，免去对整个矩阵做完整分解；
+    k + oversample 不小于矩阵较短边时随机投影无收益，直接做完整 SVD。
+    """
+    m, n = a.shape
+    r = k + oversample
+    if r >= min(m, n):
+        U, sv, Vt = np.linalg.svd(a, full_matrices=False)
+        return U[:, :k], sv[:k], Vt[:k]
+    rng = np.random.default_rng(seed)
+    Q, _ = np.linalg.qr(a @ rng.standard_normal((n, r)).astype(a.dtype, copy=False))
+    for _ in range(n_iter):
+        # 幂迭代（每步重新正交化）使谱快速衰减，提高前 k 个分量的精度
+        Q, _ = np.linalg.qr(a.T @ Q)
+        Q, _ = np.linalg.qr(a @ Q)
+    Ub, sv, Vt = np.linalg.svd(Q.T @ a, full_matrices=False)
+    return (Q @ Ub)[:, :k], sv[:k], Vt[:k]
+
+
+def _2d_sparse_compress(coeffs_matrix: np.ndarray, threshold_ratio: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    对系数矩阵进行二维稀疏压缩（利用列间相关性）：截断 SVD 保留前 k 个分量，
+    返回 (压缩矩阵 U[:, :k]*s[:k], 基矩阵 Vt[:k])，重构为 压缩矩阵 @ 基矩阵。
+    """
+    k = max(2, coeffs_matrix.shape[1] // 10)  # 保留分量数（每10列一个分量）
+    k = min(k, *coeffs_matrix.shape)
+    U, sv, Vt = _truncated_svd(coeffs_matrix, k)
+    compressed = U * sv
+    for j in range(k):
+        comp = compressed[:, j]
+        # 阈值过滤：保留能量前(1-threshold_ratio)的系数
+        abs_c = np.abs(comp)
+        target = (1 - threshold_ratio) * (abs_c @ abs_c)
+        # 用 np.partition 取最大的 K 个（K 倍增直至能量达标），仅对这 K 个排序，避免整列排序
+        n = len(abs_c)
+        K = min(64, n)
+        while True:
+            top = np.partition(abs_c, n - K)[n - K:]
+            if K == n or top @ top >= target:
+                break
+            K = min(2 * K, n)
+        sorted_top = np.sort(top)[::-1]
+        threshold_idx = np.argmax(np.cumsum(sorted_top ** 2) >= target)
+        np.multiply(comp, abs_c >= sorted_top[threshold_idx], out=comp)
+    return compressed, Vt[:k]  # 返回压缩矩阵和基矩阵
+
+def _improved_compress_fwt(txt_path: str) -> Tuple[str, float, float]:
+    """
+    改进的FWT压缩算法：自适应小波选择+二维稀疏压缩+去噪一体化
+
+    各道按特征选定 (小波基, 层数) 后分组，每组沿样点轴一次 wavedec(axis=0) 批量分解。
+    全流程以 float32 计算与存储（DAS 数据信噪比远低于单精度舍入误差），内存与文件体积减半。
+
+    实验性接口（不在 __all__ 中）：输出为 _dump_oob_pickle 格式的 .dfp 文件，本库尚无对应的重构函数，
+    decompress_fwt_to_txt 不能读取。
+
+    返回：(输出.dfp路径, 压缩比%, 信号信噪比SNR)
+    """
+    if pywt is None:
+        raise ImportError("需要安装 pywt：pip install PyWavelets")
+
+    # 读取原始数据（samples x traces 二维矩阵）
+    # 假设txt为空格分隔的矩阵；read_txt_array 优先使用 pandas C 解析器并缓存为 npy
+    data = np.ascontiguousarray(read_txt_array(txt_path, dtype=np.float32))
+    if len(data.shape) != 2:
+        raise ValueError("输入数据必须是二维矩阵（samples x traces）")
+    size_src = os.path.getsize(txt_path)
+    out_dir = _ensure_output_dir(txt_path, 'compress')
+
+    # 1. 特征估算与小波自适应选择（全部道一次完成）
+    wavelets, levels = _select_wavelets_batch(*_estimate_features_batch(data))
+    keys, inverse = np.unique(np.char.add(np.char.add(wavelets, ':'), levels.astype(str)), return_inverse=True)
+    # 一次性反射延拓到 2**最大层数 的整数倍，各层长度均为偶数，避免逐层奇数长度补齐；重构后按 pad 截去
+    pad = (-data.shape[0]) % (2 ** int(levels.max())) if data.size else 0
+    padded = np.pad(data, ((0, pad), (0, 0)), mode='reflect') if pad else data
+
+    # 2. 按 (小波基, 层数) 分组批量分解与去噪（贝叶斯阈值）
+    threshold_kernel = _parallel_kernel(_bayes_soft_threshold_cols)
+
+    def _transform_group(cols: np.ndarray, wavelet: str, level: int) -> np.ndarray:
+        coeffs = pywt.wavedec(padded[:, cols], _get_wavelet(wavelet), level=level, axis=0)
+        consts = _universal_threshold_consts(padded.shape[0], wavelet, level)
+        # 对细节系数进行去噪（保留近似系数，对高频细节施加阈值）
+        denoised_coeffs = [coeffs[0]]  # 近似系数保留
+        for cD, const in zip(coeffs[1:], consts):
+            if threshold_kernel is not None:
+                with _numba_lock:
+                    threshold_kernel(cD, const)
+                denoised_coeffs.append(cD)
+                continue
+            # 贝叶斯阈值计算（基于噪声估计），各列独立，一次完成
+            absd = np.abs(cD)
+            sigma = np.median(absd, axis=0) / 0.6745  # 噪声标准差估计
+            threshold = sigma * const
+            # 软阈值 sign(x)*max(|x|-t, 0)，复用 absd 缓冲区并写回 cD（wavedec 的新数组）
+            np.subtract(absd, threshold, out=absd)
+            np.maximum(absd, 0, out=absd)
+            np.multiply(absd, np.sign(cD), out=cD)
+            denoised_coeffs.append(cD)
+        # 各列按层展平（与逐道 np.concatenate(coeffs) 等价）
+        return np.concatenate(denoised_coeffs, axis=0)
+
+    groups = []
+    for k, key in enumerate(keys):
+        wavelet, level = str(key).split(':')
+        groups.append({"wavelet": wavelet, "level": int(level), "columns": np.flatnonzero(inverse == k)})
+    # 各组、组内各道相互独立：大组按列再切块，使任务数约等于 CPU 数；pywt/numpy 在 C 层释放 GIL，线程并行即可
+    n_workers = os.cpu_count() or 1
+    tasks = []
+    for g in groups:
+        n_chunks = max(1, min(len(g["columns"]), round(n_workers * len(g["columns"]) / data.shape[1])))
+        tasks.extend((cols, g["wavelet"], g["level"]) for cols in np.array_split(g["columns"], n_chunks))
+    with ThreadPoolExecutor(max_workers=min(len(tasks), n_workers)) as ex:
+        flats = list(ex.map(lambda t: _transform_group(*t), tasks))
+
+    # 3. 二维稀疏压缩（利用列间相关性）
+    # 同组各列系数等长：按块整块写入系数矩阵（短于 max_len 的组尾部补零）
+    max_len = max(flat.shape[0] for flat in flats)
+    coeffs_matrix = np.zeros((max_len, data.shape[1]), dtype=np.float32)
+    for (cols, _, _), flat in zip(tasks, flats):
+        coeffs_matrix[:flat.shape[0], cols] = flat
+    # 二维稀疏压缩（获取压缩矩阵和 SVD 基矩阵）
+    compressed_coeffs, basis = _2d_sparse_compress(coeffs_matrix)
+
+    # 保存压缩结果
+    base = os.path.splitext(os.path.basename(txt_path))[0]
+    out_pkl = os.path.join(out_dir, f"{base}-improved-coeffs.dfp")
+    # 协议 5 带外缓冲写出，系数矩阵不在内存中额外拷贝一份字节串；用 _load_compressed_pickle 读取
+    _dump_oob_pickle({
+        "groups": groups,  # 每组的小波基、层数与所含列索引
+        "original_shape": data.shape,
+        "pad": pad,  # 样点轴尾部反射延拓的长度
+        "compressed_coeffs": compressed_coeffs,
+        "basis": basis  # 系数矩阵 ≈ compressed_coeffs @ basis
+    }, out_pkl)
+
+    # 计算压缩比和信噪比（SNR）
+    size_cmp = os.path.getsize(out_pkl)
+    ratio = (size_cmp / size_src * 100.0) if size_src > 0 else math.nan
+    # 估算信噪比（假设去噪后的信号能量/噪声能量）
+    signal_energy = np.sum(np.square(data, dtype=np.float64))
+    noise_energy = signal_energy - np.sum(np.square(compressed_coeffs, dtype=np.float64))
+    snr = 10 * np.log10(signal_energy / noise_energy) if noise_energy > 0 else math.inf
+
+    return out_pkl, ratio, snr
+
+
 # ------------------
 
 
-def decompress_fwt_to_txt(pkl_path: str, out_txt_name: Optional[str] = None) -> str:
+def decompress_fwt_to_txt(pkl_path: str, out_txt_name: Optional[str] = None, output_format: str = 'txt',
+                          use_gpu: Optional[bool] = None,
+                          return_data: bool = False) -> Union[str, Tuple[str, np.ndarray]]:
     """
-    从 FWT 系数 .pkl 重构数据并导出为 txt。
+    从 FWT 系数文件重构数据并导出（默认 txt）。
 
     参数
-    - pkl_path: 压缩得到的 .pkl
-    - out_txt_name: 可选，输出 txt 文件名（不含路径）
+    - pkl_path: 压缩得到的 .dfz/.npz（兼容旧版 .pkl）
+    - out_txt_name: 可选，输出文件名（不含路径）
+    - output_format: 'txt'（默认，文本格式化开销大、文件约为二进制的 2-3 倍）、
+      'npy'（np.save）或 'npz'（np.savez_compressed，键名 data），均为 float32
+    - use_gpu: Haar 二维系数重构是否使用 CuPy（GPU）。None 为自动（有 cupy 且 GPU 可用时使用），
+      False 强制 CPU，True 要求 GPU
+    - return_data: 为 True 时同时返回重构矩阵，调用方（如 GUI 绘图）无需再读回刚写出的文件
 
     返回
-    - 输出 txt 路径
+    - 输出文件路径；return_data=True 时为 (输出文件路径, (n_samples, n_traces) float32 矩阵)
     """
+    output_format = output_format.lower()
+    if output_format not in ('txt', 'npy', 'npz'):
+        raise ValueError("output_format 仅支持 'txt'、'npy'、'npz'")
     if pywt is None:
         raise ImportError("需要安装 pywt 才能进行 FWT 解压。pip install PyWavelets")
     if not os.path.isfile(pkl_path):
-        raise FileNotFoundError(f"未找到 pkl 文件: {pkl_path}")
+        raise FileNotFoundError(f"未找到系数文件: {pkl_path}")
 
     with open(pkl_path, 'rb') as f:
-        payload = pickle.load(f)
-    wavelet = payload.get('wavelet', 'haar')
-    shape = tuple(payload.get('shape', ()))
-    coeffs: Dict[str, object] = payload['coeffs']
+        is_npz = f.read(2) == b'PK' or pkl_path.lower().endswith('.dfz')
+    if is_npz:
+        wavelet, shape, coeffs = _load_fwt_npz(pkl_path)
+        coeffs_axis = 0
+    else:
+        payload = _load_compressed_pickle(pkl_path)
+        if not isinstance(payload, dict) or 'coeffs' not in payload:
+            raise ValueError(f"不是可重构的 FWT 系数文件: {pkl_path}")
+        wavelet = payload.get('wavelet', 'haar')
+        shape = tuple(payload.get('shape', ()))
+        coeffs = payload['coeffs']
+        coeffs_axis = payload.get('coeffs_axis')
     if not shape or len(shape) != 2:
-        raise ValueError("pkl 中缺少有效的原始形状信息")
+        raise ValueError("系数文件中缺少有效的原始形状信息")
 
     n_samples, n_traces = shape
+    wavelet = _get_wavelet(wavelet)
     data = np.zeros((n_samples, n_traces), dtype=np.float32)
-    for i in range(n_traces):
-        c = coeffs.get(f'coefficients_{i}')
-        if c is None:
-            raise ValueError(f"pkl 不包含 coefficients_{i}")
-        rec = pywt.waverec(c, wavelet)
-        # 对齐长度
-        L = min(len(rec), n_samples)
-        data[:L, i] = rec[:L]
+    if coeffs_axis is not None:
+        # 各层为二维系数，整体重构
+        if wavelet.name == 'haar' and coeffs_axis == 0 and all(np.ndim(c) == 2 for c in coeffs):
+            xp = _array_module(use_gpu)
+            rec = _haar_waverec(coeffs, xp)
+            if xp is not np:
+                rec = xp.asnumpy(rec)
+        else:
+            rec = pywt.waverec(coeffs, wavelet, axis=coeffs_axis)
+        L = min(rec.shape[0], n_samples)
+        data[:L, :] = rec[:L, :n_traces]
+    else:
+        # 旧格式：逐道 coefficients_{i}
+        missing = [i for i in range(n_traces) if f'coefficients_{i}' not in coeffs]
+        if missing:
+            raise ValueError(f"pkl 不包含 coefficients_{missing[0]}")
+
+        per_trace = [coeffs[f'coefficients_{i}'] for i in range(n_traces)]
+        layout = {tuple(len(c) for c in cs) for cs in per_trace}
+        if n_traces and len(layout) == 1:
+            # 各道分解结构一致：按层堆叠为 (level_len, n_traces) 后一次整体重构
+            stacked = [np.stack([cs[lv] for cs in per_trace], axis=1) for lv in range(len(per_trace[0]))]
+            rec = pywt.waverec(stacked, wavelet, axis=0)
+            L = min(rec.shape[0], n_samples)
+            data[:L, :] = rec[:L]
+        else:
+            def _rec_trace(i: int) -> None:
+                rec = pywt.waverec(per_trace[i], wavelet)
+                # 对齐长度
+                L = min(len(rec), n_samples)
+                data[:L, i] = rec[:L]
+
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as ex:
+                list(ex.map(_rec_trace, range(n_traces)))
 
     out_dir = _ensure_output_dir(pkl_path, 'decompress')
     base = os.path.splitext(os.path.basename(pkl_path))[0]
-    out_name = out_txt_name or f"{base}-reconstructed.txt"
+    out_name = out_txt_name or f"{base}-reconstructed.{output_format}"
     out_path = os.path.join(out_dir, out_name)
-    np.savetxt(out_path, data, fmt='%.7e')
-    return out_path
+    if output_format == 'npy':
+        np.save(out_path, data)
+    elif output_format == 'npz':
+        np.savez_compressed(out_path, data=data)
+    else:
+        _save_txt_matrix(out_path, data)
+    return (out_path, data) if return_data else out_path
 
 
-def gzip_compress(file_path: str) -> str:
+_GZIP_BUFSIZE = 4 * 1024 * 1024  # 流式拷贝块大小，避免默认 16 KiB 小块导致的大量 zlib 调用
+
+
+def gzip_compress(file_path: str, level: int = 6) -> str:
     """
     使用 gzip 对任意单个文件进行压缩，输出 .gz。
 
+    参数
+    - file_path: 输入文件
+    - level: 压缩级别 1-9（默认 6；9 压缩率略高但明显更慢）
+
     返回输出 .gz 路径。
     """
     if not os.path.isfile(file_path):
@@ -1090,8 +2410,10 @@ def gzip_compress(file_path: str) -> str:
     out_dir = _ensure_output_dir(file_path, 'compress')
     base = os.path.basename(file_path)
     out_path = os.path.join(out_dir, f"{base}.gz")
-    with open(file_path, 'rb') as fin, gzip.open(out_path, 'wb') as fout:
-        shutil.copyfileobj(fin, fout)
+    # mtime=0：相同输入得到相同输出
+    with open(file_path, 'rb') as fin, open(out_path, 'wb') as raw, \
+            gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=level, mtime=0) as fout:
+        shutil.copyfileobj(fin, fout, length=_GZIP_BUFSIZE)
     return out_path
 
 
@@ -1113,8 +2435,9 @@ def gzip_decompress(gz_path: str, out_name: Optional[str] = None) -> str:
     if base.lower().endswith('.gz'):
         base = base[:-3]
     out_path = os.path.join(out_dir, out_name or base)
-    with gzip.open(gz_path, 'rb') as fin, open(out_path, 'wb') as fout:
-        shutil.copyfileobj(fin, fout)
+    gz = _optional_import('isal.igzip') or gzip
+    with gz.open(gz_path, 'rb') as fin, open(out_path, 'wb') as fout:
+        shutil.copyfileobj(fin, fout, length=_GZIP_BUFSIZE)
     return out_path
 
 
@@ -1123,26 +2446,31 @@ def gzip_decompress(gz_path: str, out_name: Optional[str] = None) -> str:
 def _self_check_dependencies() -> Dict[str, bool]:
     """返回依赖可用性，便于在 Notebook 中快速诊断。"""
     return {
-        'matplotlib': plt is not None,
+        'matplotlib': _optional_import('matplotlib.pyplot') is not None,
         'obspy': obspy_read is not None and Stream is not None,
         'pywt': pywt is not None,
+        'pandas': _optional_import('pandas') is not None,
+        'zstandard': _optional_import('zstandard') is not None,
+        'isal': _optional_import('isal.igzip') is not None,
+        'numba': _optional_import('numba') is not None,
+        'cupy': _optional_import('cupy') is not None,
         'numpy': True,
     }
 
 
 __all__ = [
     # IO
-    'read_headfile', 'read_txt_array', 'read_stream', 'array_to_stream_from_head',
+    'read_headfile', 'read_txt_array', 'read_array_mmap', 'read_stream', 'read_stream_headers', 'array_to_stream_from_head',
     # plotting
-    'plot_array', 'plot_stream',
+    'plot_array', 'plot_stream', 'trace_segments', 'trace_collection',
     # convert
     'convert_format',
     # denoise
     'bandpass_denoise', 'filter_stream', 'advanced_denoise', 'correlation_denoise', 'spectral_subtraction_denoise',
     # parameter conversion
-    'strain_to_velocity',
+    'strain_to_velocity', 'strain_to_velocity_scale',
     # compression
-    'compress_fwt_txt', 'decompress_fwt_to_txt', 'gzip_compress', 'gzip_decompress',
+    'compress_fwt_txt', 'compress_fwt_txt_batch', 'decompress_fwt_to_txt', 'gzip_compress', 'gzip_decompress',
     # misc
     '_self_check_dependencies',
 ]
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+DFSPy GUI 子窗口公用模块
+
+各子窗口共用的核心模块加载器、进程池，以及缓存的 QIcon/QFont 构造函数。
+本模块在顶层不导入 PyQt5/matplotlib（Qt 只在图标、字体函数内按需导入）：进程池的 spawn 子进程
+经 initializer 导入本模块时不会连带加载 GUI 依赖。
+"""
+
+import functools
+import importlib.util
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_CORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dfspy_cores.py')
+
+
+def load_cores():
+    """
+    按文件路径加载核心模块并登记为 sys.modules['dfspy_cores']（已加载则直接复用），不改动 sys.path。
+    也作为进程池子进程的 initializer，使任务中的 dfspy_cores 函数可按模块名反序列化。
+    """
+    mod = sys.modules.get('dfspy_cores')
+    if mod is None:
+        spec = importlib.util.spec_from_file_location('dfspy_cores', _CORE_PATH)
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules['dfspy_cores'] = mod
+        try:
+            spec.loader.exec_module(mod)
+        except BaseException:
+            del sys.modules['dfspy_cores']
+            raise
+    return mod
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def process_pool():
+    """
+    返回各子窗口共用的进程池，首次调用（首次提交任务）时才创建，打开窗口或导入模块时不启动任何进程。
+    以 spawn 启动：GUI 进程中已运行过 numba（GNU OpenMP 线程层）或 Qt 线程时 fork 不安全，子进程会被直接终止。
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=load_cores)
+        return _pool
+
+
+def shutdown_process_pool():
+    """关闭共用进程池（程序退出时调用）：取消尚未开始的任务并等待工作进程退出；未创建过则什么也不做"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+@functools.lru_cache(maxsize=None)
+def icon(path):
+    """按资源路径缓存 QIcon：PNG 只解码一次，重复打开子窗口时直接复用（需在 QApplication 创建后调用）"""
+    from PyQt5 import QtGui
+
+    qicon = QtGui.QIcon()
+    qicon.addPixmap(QtGui.QPixmap(path), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+    return qicon
+
+
+@functools.lru_cache(maxsize=None)
+def font(family, size, bold=False):
+    """按 (字体, 字号, 粗体) 缓存 QFont（family 为 None 时沿用默认字体）：setupUi 中只有少数几种组合"""
+    from PyQt5 import QtGui
+
+    qfont = QtGui.QFont()
+    if family:
+        qfont.setFamily(family)
+    qfont.setPointSize(size)
+    if bold:
+        qfont.setBold(True)
+        qfont.setWeight(75)
+    return qfont
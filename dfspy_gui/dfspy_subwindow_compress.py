@@ -8,67 +8,113 @@ DFSPy GUI 数据压缩子窗口模块
 """
 
 import os
+from concurrent.futures import as_completed
+
 import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QMainWindow, QMessageBox, QFileDialog
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 
 # 绘图需要
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FC
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar
 
+# 子窗口公用的核心模块加载器与缓存图标/字体
+from dfspy_common import font as _font, icon as _icon, load_cores, process_pool
+
 plt.rcParams['font.sans-serif'] = ['Times New Roman']
 
+dfspy_cores = load_cores()
+
+
+class CompressSignals(QObject):
+    """压缩任务信号（QRunnable 不是 QObject，信号由该对象承载，跨线程以队列连接送回 GUI 线程）"""
+    finished = pyqtSignal(str, float)  # 单个文件压缩完成信号 (output_path, compression_ratio)
+    error = pyqtSignal(str)  # 错误信号
+    all_done = pyqtSignal()  # 全部文件处理结束信号
+
 
-class CompressWorker(QThread):
-    """压缩工作线程"""
-    finished = pyqtSignal(str, float)  # 压缩完成信号 (output_path, compression_ratio)
+class DecompressSignals(QObject):
+    """解压任务信号"""
+    finished = pyqtSignal(str)  # 单个文件解压完成信号 (output_path)
+    preview = pyqtSignal(str, object)  # 绘图预览：输入顺序中最后一个文件的 (output_path, 重构矩阵)
     error = pyqtSignal(str)  # 错误信号
-    
-    def __init__(self, txt_path, method='fwt'):
+    all_done = pyqtSignal()  # 全部文件处理结束信号
+
+
+class CompressWorker(QRunnable):
+    """压缩任务：在全局 QThreadPool 的常驻线程上运行，将各文件提交到进程池，按完成顺序回报结果"""
+
+    def __init__(self, txt_paths, method='fwt', quantize=False):
         super().__init__()
-        self.txt_path = txt_path
+        self.setAutoDelete(False)  # 生命周期由窗口的 self.worker 引用管理，避免 Qt 删除后信号对象悬空
+        self.signals = CompressSignals()
+        self.txt_paths = list(txt_paths)
         self.method = method
-    
+        self.quantize = quantize
+
     def run(self):
         """执行压缩"""
         try:
-            # 导入核心模块
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-            
-            if self.method == 'fwt':
-                output_path, compression_ratio = dfspy_cores.compress_fwt_txt(self.txt_path)
-                self.finished.emit(output_path, compression_ratio)
-            else:
-                self.error.emit("Unsupported compression method")
+            if self.method != 'fwt':
+                self.signals.error.emit("Unsupported compression method")
+                return
+            # 文件列表按进程数分批，每批一次 compress_fwt_txt_batch（同长度文件合并为一次小波分解）；
+            # 默认以 float32 存储系数（无损）；quantize 时细节系数量化为 int16（有损），文件约为 float32 的一半
+            n_batches = min(len(self.txt_paths), os.cpu_count() or 1)
+            batches = [self.txt_paths[i::n_batches] for i in range(n_batches)]
+            # FWT 压缩为 CPU 密集型任务，各批分发到共用进程池的各核并行处理
+            pool = process_pool()
+            futs = {pool.submit(dfspy_cores.compress_fwt_txt_batch, b, 'haar', self.quantize): b for b in batches}
+            for fut in as_completed(futs):
+                try:
+                    for output_path, compression_ratio in fut.result():
+                        self.signals.finished.emit(output_path, compression_ratio)
+                except Exception as e:
+                    names = ', '.join(os.path.basename(p) for p in futs[fut])
+                    self.signals.error.emit(f"Compression failed ({names}): {str(e)}")
         except Exception as e:
-            self.error.emit(f"Compression failed: {str(e)}")
+            self.signals.error.emit(f"Compression failed: {str(e)}")
+        finally:
+            self.signals.all_done.emit()
 
 
-class DecompressWorker(QThread):
-    """解压工作线程"""
-    finished = pyqtSignal(str)  # 解压完成信号
-    error = pyqtSignal(str)  # 错误信号
-    
-    def __init__(self, pkl_path):
+class DecompressWorker(QRunnable):
+    """解压任务：在全局 QThreadPool 上运行，将各系数文件提交到进程池，按完成顺序回报结果"""
+
+    def __init__(self, pkl_paths):
         super().__init__()
-        self.pkl_path = pkl_path
-    
+        self.setAutoDelete(False)  # 生命周期由窗口的 self.worker 引用管理，避免 Qt 删除后信号对象悬空
+        self.signals = DecompressSignals()
+        self.pkl_paths = list(pkl_paths)
+
     def run(self):
         """执行解压"""
         try:
-            # 导入核心模块
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-            
-            output_path = dfspy_cores.decompress_fwt_to_txt(self.pkl_path)
-            self.finished.emit(output_path)
+            # 工作进程只回传输出路径；仅输入顺序中最后一个文件随结果返回重构矩阵用于绘图，
+            # 既不把每个文件的整个矩阵序列化传回，也不必再解析刚写出的 txt
+            pool = process_pool()
+            last = len(self.pkl_paths) - 1
+            futs = {pool.submit(dfspy_cores.decompress_fwt_to_txt, p, return_data=(i == last)): i
+                    for i, p in enumerate(self.pkl_paths)}
+            for fut in as_completed(futs):
+                i = futs[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    self.signals.error.emit(f"Decompression failed ({os.path.basename(self.pkl_paths[i])}): {str(e)}")
+                    continue
+                if i == last:
+                    output_path, data = result
+                    self.signals.finished.emit(output_path)
+                    self.signals.preview.emit(output_path, data)
+                else:
+                    self.signals.finished.emit(result)
         except Exception as e:
-            self.error.emit(f"Decompression failed: {str(e)}")
+            self.signals.error.emit(f"Decompression failed: {str(e)}")
+        finally:
+            self.signals.all_done.emit()
 
 
 class Ui_SubCompress(QMainWindow):
@@ -76,6 +122,7 @@ class Ui_SubCompress(QMainWindow):
 
     def __init__(self):
         super(Ui_SubCompress, self).__init__()
+        self._log_buf = []  # 待写入参数列表的消息，由 _flush_log 合并为一次 addItems
         self.setupUi(self)
 
     def setupUi(self, SubCompress):
@@ -87,10 +134,7 @@ class Ui_SubCompress(QMainWindow):
         # 操作标签
         self.label_head_oper = QtWidgets.QLabel(SubCompress)
         self.label_head_oper.setGeometry(QtCore.QRect(0, 0, 591, 51))
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(16)
-        self.label_head_oper.setFont(font)
+        self.label_head_oper.setFont(_font("等线 Light", 16))
         self.label_head_oper.setStyleSheet("background-color: rgb(211, 211, 211);")
         self.label_head_oper.setAlignment(QtCore.Qt.AlignCenter)
         self.label_head_oper.setObjectName("label_head_oper")
@@ -99,10 +143,7 @@ class Ui_SubCompress(QMainWindow):
         self.groupBox_open = QtWidgets.QGroupBox(SubCompress)
         self.groupBox_open.setGeometry(QtCore.QRect(10, 70, 571, 331))
         self.groupBox_open.setStyleSheet("background-color: rgb(240, 240, 240);")
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(12)
-        self.groupBox_open.setFont(font)
+        self.groupBox_open.setFont(_font("等线 Light", 12))
         self.groupBox_open.setObjectName("groupBox_open")
         
         # 按钮样式
@@ -123,38 +164,25 @@ QPushButton:pressed
         # 数据导入按钮
         self.pushButton_data_in = QtWidgets.QPushButton(self.groupBox_open)
         self.pushButton_data_in.setGeometry(QtCore.QRect(20, 50, 180, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.pushButton_data_in.setFont(font)
+        self.pushButton_data_in.setFont(_font("等线", 14))
         self.pushButton_data_in.setStyleSheet(button_style)
-        icon = QtGui.QIcon()
-        icon.addPixmap(QtGui.QPixmap(":/mainwindow/image/open.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.pushButton_data_in.setIcon(icon)
+        self.pushButton_data_in.setIcon(_icon(":/mainwindow/image/open.png"))
         self.pushButton_data_in.setIconSize(QtCore.QSize(32, 32))
         self.pushButton_data_in.setObjectName("pushButton_data_in")
         
         # 波形显示按钮
         self.pushButton_plot_before = QtWidgets.QPushButton(self.groupBox_open)
         self.pushButton_plot_before.setGeometry(QtCore.QRect(380, 50, 170, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.pushButton_plot_before.setFont(font)
+        self.pushButton_plot_before.setFont(_font("等线", 14))
         self.pushButton_plot_before.setStyleSheet(button_style)
-        icon_plot = QtGui.QIcon()
-        icon_plot.addPixmap(QtGui.QPixmap(":/mainwindow/image/plot.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.pushButton_plot_before.setIcon(icon_plot)
+        self.pushButton_plot_before.setIcon(_icon(":/mainwindow/image/plot.png"))
         self.pushButton_plot_before.setIconSize(QtCore.QSize(32, 32))
         self.pushButton_plot_before.setObjectName("pushButton_plot_before")
         
         # 文件路径列表
         self.listWidget_datafile_path = QtWidgets.QListWidget(self.groupBox_open)
         self.listWidget_datafile_path.setGeometry(QtCore.QRect(20, 110, 531, 201))
-        font = QtGui.QFont()
-        font.setFamily("Microsoft YaHei UI")
-        font.setPointSize(9)
-        self.listWidget_datafile_path.setFont(font)
+        self.listWidget_datafile_path.setFont(_font("Microsoft YaHei UI", 9))
         self.listWidget_datafile_path.setStyleSheet(
             "background-color: rgb(255, 255, 255);"
             "border-radius: 5px;"
@@ -166,28 +194,19 @@ QPushButton:pressed
         self.groupBox_opera = QtWidgets.QGroupBox(SubCompress)
         self.groupBox_opera.setGeometry(QtCore.QRect(10, 420, 571, 341))
         self.groupBox_opera.setStyleSheet("background-color: rgb(240, 240, 240);")
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(12)
-        self.groupBox_opera.setFont(font)
+        self.groupBox_opera.setFont(_font("等线 Light", 12))
         self.groupBox_opera.setObjectName("groupBox_opera")
         
         # 算法选择标签
         self.label_select_algorithm = QtWidgets.QLabel(self.groupBox_opera)
         self.label_select_algorithm.setGeometry(QtCore.QRect(20, 40, 261, 51))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.label_select_algorithm.setFont(font)
+        self.label_select_algorithm.setFont(_font("等线", 14))
         self.label_select_algorithm.setObjectName("label_select_algorithm")
         
         # 算法选择下拉框
         self.comboBox_algorithm = QtWidgets.QComboBox(self.groupBox_opera)
         self.comboBox_algorithm.setGeometry(QtCore.QRect(270, 40, 281, 51))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.comboBox_algorithm.setFont(font)
+        self.comboBox_algorithm.setFont(_font("等线", 14))
         self.comboBox_algorithm.setStyleSheet(
             "border: 0.5px groove gray;"
             "border-style: outset;"
@@ -195,16 +214,14 @@ QPushButton:pressed
         )
         self.comboBox_algorithm.addItem("")
         self.comboBox_algorithm.addItem("FWT Compression")
+        self.comboBox_algorithm.addItem("FWT Compression (int16, lossy)")
         self.comboBox_algorithm.addItem("FWT Reconstruction")
         self.comboBox_algorithm.setObjectName("comboBox_algorithm")
         
         # 算法参数列表
         self.listWidget_algorithm_para = QtWidgets.QListWidget(self.groupBox_opera)
         self.listWidget_algorithm_para.setGeometry(QtCore.QRect(20, 100, 531, 161))
-        font = QtGui.QFont()
-        font.setFamily("Microsoft YaHei UI")
-        font.setPointSize(9)
-        self.listWidget_algorithm_para.setFont(font)
+        self.listWidget_algorithm_para.setFont(_font("Microsoft YaHei UI", 9))
         self.listWidget_algorithm_para.setStyleSheet(
             "background-color: rgb(255, 255, 255);"
             "border-radius: 5px;"
@@ -215,24 +232,16 @@ QPushButton:pressed
         # 开始压缩按钮
         self.pushButton_begin = QtWidgets.QPushButton(self.groupBox_opera)
         self.pushButton_begin.setGeometry(QtCore.QRect(20, 270, 170, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.pushButton_begin.setFont(font)
+        self.pushButton_begin.setFont(_font("等线", 14))
         self.pushButton_begin.setStyleSheet(button_style)
-        icon2 = QtGui.QIcon()
-        icon2.addPixmap(QtGui.QPixmap(":/mainwindow/image/图片1.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.pushButton_begin.setIcon(icon2)
+        self.pushButton_begin.setIcon(_icon(":/mainwindow/image/图片1.png"))
         self.pushButton_begin.setIconSize(QtCore.QSize(32, 32))
         self.pushButton_begin.setObjectName("pushButton_begin")
         
         # 压缩前可视化组框
         self.groupBox_visu_before = QtWidgets.QGroupBox(SubCompress)
         self.groupBox_visu_before.setGeometry(QtCore.QRect(600, 70, 620, 821))
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(12)
-        self.groupBox_visu_before.setFont(font)
+        self.groupBox_visu_before.setFont(_font("等线 Light", 12))
         self.groupBox_visu_before.setStyleSheet("background-color: rgb(255, 255, 255);")
         self.groupBox_visu_before.setObjectName("groupBox_visu_before")
         
@@ -244,10 +253,7 @@ QPushButton:pressed
         # 压缩后可视化组框
         self.groupBox_visu_after = QtWidgets.QGroupBox(SubCompress)
         self.groupBox_visu_after.setGeometry(QtCore.QRect(1230, 70, 620, 821))
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(12)
-        self.groupBox_visu_after.setFont(font)
+        self.groupBox_visu_after.setFont(_font("等线 Light", 12))
         self.groupBox_visu_after.setStyleSheet("background-color: rgb(255, 255, 255);")
         self.groupBox_visu_after.setObjectName("groupBox_visu_after")
         
@@ -259,10 +265,7 @@ QPushButton:pressed
         # 可视化标签
         self.label_head_plot = QtWidgets.QLabel(SubCompress)
         self.label_head_plot.setGeometry(QtCore.QRect(590, 0, 1271, 51))
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(16)
-        self.label_head_plot.setFont(font)
+        self.label_head_plot.setFont(_font("等线 Light", 16))
         self.label_head_plot.setStyleSheet("background-color: rgb(240, 240, 240);")
         self.label_head_plot.setAlignment(QtCore.Qt.AlignCenter)
         self.label_head_plot.setObjectName("label_head_plot")
@@ -270,16 +273,9 @@ QPushButton:pressed
         # 退出按钮
         self.pushButton_exit = QtWidgets.QPushButton(SubCompress)
         self.pushButton_exit.setGeometry(QtCore.QRect(210, 840, 180, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(16)
-        font.setBold(True)
-        font.setWeight(75)
-        self.pushButton_exit.setFont(font)
+        self.pushButton_exit.setFont(_font("等线", 16, bold=True))
         self.pushButton_exit.setStyleSheet(button_style)
-        icon3 = QtGui.QIcon()
-        icon3.addPixmap(QtGui.QPixmap(":/mainwindow/image/Exit.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.pushButton_exit.setIcon(icon3)
+        self.pushButton_exit.setIcon(_icon(":/mainwindow/image/Exit.png"))
         self.pushButton_exit.setIconSize(QtCore.QSize(32, 32))
         self.pushButton_exit.setObjectName("pushButton_exit")
 
@@ -293,6 +289,10 @@ QPushButton:pressed
         self.pushButton_begin.clicked.connect(self.start_compression)
         self.comboBox_algorithm.currentTextChanged.connect(self.show_algorithm_info)
 
+        # 列表项均为单行文本：统一行高，新增条目时无需逐项测量尺寸
+        self.listWidget_datafile_path.setUniformItemSizes(True)
+        self.listWidget_algorithm_para.setUniformItemSizes(True)
+
         # 初始化绘图
         self.setup_plotting()
 
@@ -301,6 +301,7 @@ QPushButton:pressed
         # 压缩前绘图
         self.fig_before = plt.Figure()
         self.canvas_before = FC(self.fig_before)
+        self.ax_before = self.fig_before.add_subplot(111)
         layout_before = QtWidgets.QVBoxLayout()
         layout_before.addWidget(self.canvas_before)
         toolbar_before = NavigationToolbar(self.canvas_before, self)
@@ -310,6 +311,7 @@ QPushButton:pressed
         # 压缩后绘图
         self.fig_after = plt.Figure()
         self.canvas_after = FC(self.fig_after)
+        self.ax_after = self.fig_after.add_subplot(111)
         layout_after = QtWidgets.QVBoxLayout()
         layout_after.addWidget(self.canvas_after)
         toolbar_after = NavigationToolbar(self.canvas_after, self)
@@ -326,11 +328,20 @@ QPushButton:pressed
             self,
             "Select data files",
             default_path,
-            "All Files (*.*);;Text Files (*.txt);;Seismic Data Files (*.mseed *.sac)"
+            "All Files (*.*);;Text Files (*.txt);;Seismic Data Files (*.mseed *.sac);;FWT Coefficient Files (*.dfz *.npz *.pkl)"
         )
         if files:
-            self.listWidget_datafile_path.clear()
-            self.listWidget_datafile_path.addItems(files)
+            # 批量填充期间暂停重绘与信号，选择上千个文件时只做一次布局
+            lw = self.listWidget_datafile_path
+            lw.setUpdatesEnabled(False)
+            lw.blockSignals(True)
+            try:
+                lw.clear()
+                lw.addItems(files)
+            finally:
+                lw.blockSignals(False)
+                lw.setUpdatesEnabled(True)
+            lw.viewport().update()
 
     def plot_before(self):
         """绘制压缩前数据"""
@@ -339,37 +350,49 @@ QPushButton:pressed
             return
 
         try:
-            # 导入核心模块绘图函数
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-
             file_path = self.listWidget_datafile_path.item(0).text()
             data = dfspy_cores.read_txt_array(file_path)
-            
-            # 先清空图框
-            self.fig_before.clear()
-            ax = self.fig_before.add_subplot(111)
-            dfspy_cores.plot_array(data, "Data Before Compression", ax)
-            self.canvas_before.draw()
+
+            # 复用常驻坐标轴，只更新折线数据；采样轴为纵轴，按画布高度（像素）做包络抽稀
+            dfspy_cores.plot_array(data, "Data Before Compression", self.ax_before,
+                                   max_points=self.canvas_before.get_width_height()[1])
+            self.canvas_before.draw_idle()
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Plotting failed: {str(e)}")
 
+    def _log(self, *messages):
+        """追加消息到参数列表：先缓存，约 50 ms 内的消息合并为一次 addItems，大批文件完成时不逐条重排列表"""
+        if not self._log_buf:
+            QTimer.singleShot(50, self._flush_log)
+        self._log_buf.extend(messages)
+
+    def _flush_log(self):
+        """将缓存的消息一次性写入参数列表"""
+        if self._log_buf:
+            self.listWidget_algorithm_para.addItems(self._log_buf)
+            self._log_buf.clear()
+
     def show_algorithm_info(self):
         """显示算法信息"""
         algorithm = self.comboBox_algorithm.currentText()
+        self._log_buf.clear()
         self.listWidget_algorithm_para.clear()
         
         if algorithm == "FWT Compression":
-            self.listWidget_algorithm_para.addItem("FWT compression parameters: haar wavelet, zero padding, levels=2")
+            self._log("FWT compression parameters: haar wavelet, maximum decomposition level, symmetric extension",
+                      "Coefficients are stored as float32: lossless")
+            self.pushButton_begin.setText("Start Compression")
+        elif algorithm == "FWT Compression (int16, lossy)":
+            self._log("FWT compression parameters: haar wavelet, maximum decomposition level, symmetric extension",
+                      "Detail coefficients are int16-quantized (per trace): lossy, reconstruction is approximate")
             self.pushButton_begin.setText("Start Compression")
         elif algorithm == "FWT Reconstruction":
-            self.listWidget_algorithm_para.addItem("FWT reconstruction: rebuild original data from compressed file")
+            self._log("FWT reconstruction: rebuild original data from compressed file")
             self.pushButton_begin.setText("Start Reconstruction")
 
     def start_compression(self):
-        """开始压缩/解压"""
+        """开始压缩/解压（列表中的全部文件并行处理）"""
         if self.listWidget_datafile_path.count() == 0:
             QMessageBox.warning(self, "Warning", "Please select data files first!")
             return
@@ -379,77 +402,89 @@ QPushButton:pressed
             QMessageBox.warning(self, "Warning", "Please select a compression algorithm!")
             return
 
-        file_path = self.listWidget_datafile_path.item(0).text()
-        
-        if algorithm == "FWT Compression":
-            if not file_path.endswith('.txt'):
+        file_paths = [self.listWidget_datafile_path.item(i).text()
+                      for i in range(self.listWidget_datafile_path.count())]
+
+        if algorithm in ("FWT Compression", "FWT Compression (int16, lossy)"):
+            txt_paths = [p for p in file_paths if p.endswith('.txt')]
+            if not txt_paths:
                 QMessageBox.warning(self, "Warning", "FWT compression only supports txt files!")
                 return
-            self.start_fwt_compression(file_path)
+            self.start_fwt_compression(txt_paths, quantize=algorithm != "FWT Compression")
         elif algorithm == "FWT Reconstruction":
-            if not file_path.endswith('.pkl'):
-                QMessageBox.warning(self, "Warning", "FWT reconstruction requires selecting a pkl compressed file!")
+            coeff_paths = [p for p in file_paths if p.endswith(('.dfz', '.npz', '.pkl'))]
+            if not coeff_paths:
+                QMessageBox.warning(self, "Warning", "FWT reconstruction requires selecting a dfz/npz (or legacy pkl) compressed file!")
                 return
-            self.start_fwt_decompression(file_path)
+            self.start_fwt_decompression(coeff_paths)
+
+    def start_fwt_compression(self, file_paths, quantize=False):
+        """开始FWT压缩（quantize 为 True 时细节系数量化为 int16，有损）"""
+        self.compression_ratios = []
+        self.compression_mode = "int16-quantized, lossy" if quantize else "lossless"
+        self.worker = CompressWorker(file_paths, 'fwt', quantize)
+        self.worker.signals.finished.connect(self.on_compression_finished)
+        self.worker.signals.error.connect(self.on_operation_error)
+        self.worker.signals.all_done.connect(self.on_compression_all_done)
 
-    def start_fwt_compression(self, file_path):
-        """开始FWT压缩"""
-        self.worker = CompressWorker(file_path, 'fwt')
-        self.worker.finished.connect(self.on_compression_finished)
-        self.worker.error.connect(self.on_operation_error)
-        
         self.pushButton_begin.setEnabled(False)
         self.pushButton_begin.setText("Compressing...")
-        self.worker.start()
+        QThreadPool.globalInstance().start(self.worker)
 
-    def start_fwt_decompression(self, file_path):
+    def start_fwt_decompression(self, file_paths):
         """开始FWT解压"""
-        self.worker = DecompressWorker(file_path)
-        self.worker.finished.connect(self.on_decompression_finished)
-        self.worker.error.connect(self.on_operation_error)
-        
+        self.worker = DecompressWorker(file_paths)
+        self.worker.signals.finished.connect(self.on_decompression_finished)
+        self.worker.signals.preview.connect(self.on_decompression_preview)
+        self.worker.signals.error.connect(self.on_operation_error)
+        self.worker.signals.all_done.connect(self.on_decompression_all_done)
+
         self.pushButton_begin.setEnabled(False)
         self.pushButton_begin.setText("Decompressing...")
-        self.worker.start()
+        QThreadPool.globalInstance().start(self.worker)
 
     def on_compression_finished(self, output_path, compression_ratio):
-        """压缩完成回调"""
+        """单个文件压缩完成回调"""
+        self._log(f"Compression finished ({self.compression_mode})! Output file: {output_path}",
+                  f"Compression ratio: {compression_ratio:.2f}%")
+        if compression_ratio > 0:
+            size_after = os.path.getsize(output_path)
+            size_before = size_after * 100.0 / compression_ratio
+            self._log(f"Size: {size_before / 1024 ** 2:.2f} MB -> {size_after / 1024 ** 2:.2f} MB")
+        self.compression_ratios.append(compression_ratio)
+
+    def on_compression_all_done(self):
+        """全部文件压缩结束回调"""
+        if len(self.compression_ratios) > 1:
+            avg = sum(self.compression_ratios) / len(self.compression_ratios)
+            self._log(f"Average compression ratio: {avg:.2f}%")
+        self._flush_log()  # 弹窗前把结果全部显示出来
         self.pushButton_begin.setEnabled(True)
         self.pushButton_begin.setText("Start Compression")
-
-        self.listWidget_algorithm_para.addItem(f"Compression finished! Output file: {output_path}")
-        self.listWidget_algorithm_para.addItem(f"Compression ratio: {compression_ratio:.2f}%")
-
         QMessageBox.information(self, "Success", "Compression completed!")
 
     def on_decompression_finished(self, output_path):
-        """解压完成回调"""
-        self.pushButton_begin.setEnabled(True)
-        self.pushButton_begin.setText("Start Reconstruction")
+        """单个文件解压完成回调"""
+        self._log(f"Reconstruction finished! Output file: {output_path}")
 
-        self.listWidget_algorithm_para.addItem(f"Reconstruction finished! Output file: {output_path}")
-        
-        # 尝试绘制重构后的数据
+    def on_decompression_preview(self, output_path, data):
+        """绘制最后一个重构文件的数据"""
         try:
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-            
-            data = dfspy_cores.read_txt_array(output_path)
-            # 先清空图框
-            self.fig_after.clear()
-            ax = self.fig_after.add_subplot(111)
-            dfspy_cores.plot_array(data, "Data After Reconstruction", ax)
-            self.canvas_after.draw()
+            dfspy_cores.plot_array(data, "Data After Reconstruction", self.ax_after,
+                                   max_points=self.canvas_after.get_width_height()[1])
+            self.canvas_after.draw_idle()
         except Exception as e:
-            print(f"Failed to plot reconstructed data: {str(e)}")
-        
+            self._log(f"Failed to plot reconstructed data: {str(e)}")
+
+    def on_decompression_all_done(self):
+        """全部文件解压结束回调"""
+        self._flush_log()
+        self.pushButton_begin.setEnabled(True)
+        self.pushButton_begin.setText("Start Reconstruction")
         QMessageBox.information(self, "Success", "Reconstruction completed!")
 
     def on_operation_error(self, error_message):
-        """操作错误回调"""
-        self.pushButton_begin.setEnabled(True)
-        self.pushButton_begin.setText("Start Processing")
+        """操作错误回调（按钮状态由 all_done 回调恢复）"""
         QMessageBox.critical(self, "Error", error_message)
 
     def retranslateUi(self, SubCompress):
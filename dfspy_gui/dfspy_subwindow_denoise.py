@@ -8,9 +8,11 @@ DFSPy GUI 数据降噪子窗口模块
 """
 
 import os
+import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets
-from PyQt5.QtWidgets import QMainWindow, QMessageBox, QFileDialog, QInputDialog
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtWidgets import (QMainWindow, QMessageBox, QFileDialog, QDialog, QDialogButtonBox, QFormLayout,
+                             QSpinBox, QDoubleSpinBox, QLineEdit)
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 
 # 绘图需要
 import matplotlib.pyplot as plt
@@ -19,14 +21,31 @@ from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationTo
 
 plt.rcParams['font.sans-serif'] = ['Times New Roman']
 
+# 可选：安装 pyqtgraph 时波形区改用 PlotWidget（自带鼠标缩放/平移，重绘远快于 Agg），否则沿用 matplotlib
+try:
+    import pyqtgraph as pg
+except ImportError:
+    pg = None
 
-class DenoiseWorker(QThread):
-    """降噪工作线程"""
-    finished = pyqtSignal(str)  # 降噪完成信号
+# 核心模块：与其他子窗口同样经 dfspy_common 按文件路径加载一次
+from dfspy_common import load_cores
+
+dfspy_cores = load_cores()
+
+
+class DenoiseSignals(QObject):
+    """降噪任务信号（QRunnable 不是 QObject，信号由该对象承载，跨线程以队列连接送回 GUI 线程）"""
+    finished = pyqtSignal(str, str)  # 降噪完成信号 (input_path, output_path)
     error = pyqtSignal(str)  # 错误信号
+
+
+class DenoiseWorker(QRunnable):
+    """降噪任务（单个文件）：在全局 QThreadPool 的常驻线程上运行，免去每次点击新建/销毁线程"""
     
     def __init__(self, input_path, method, params):
         super().__init__()
+        self.setAutoDelete(False)  # 生命周期由窗口的 self.workers 引用管理，避免 Qt 删除后信号对象悬空
+        self.signals = DenoiseSignals()
         self.input_path = input_path
         self.method = method
         self.params = params
@@ -34,11 +53,6 @@ class DenoiseWorker(QThread):
     def run(self):
         """执行降噪"""
         try:
-            # 导入核心模块
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-            
             if self.method == 'bandpass':
                 output_path = dfspy_cores.bandpass_denoise(
                     self.input_path, 
@@ -60,26 +74,154 @@ class DenoiseWorker(QThread):
                     beta=self.params['beta'],
                     window=self.params['window'],
                     frame_length=self.params['frame_length'],
-                    hop_length=self.params['hop_length']
+                    hop_length=self.params['hop_length'],
+                    n_workers=1  # 各文件已在线程池中并行，单个文件内不再开线程
                 )
             elif self.method == 'wavelet':
                 output_path = dfspy_cores.advanced_denoise(
                     self.input_path,
                     method='wavelet',
                     wavelet=self.params['wavelet'],
-                    level=self.params['level']
+                    level=self.params['level'],
+                    n_workers=1  # 同上
                 )
             else:
                 raise ValueError(f"Unsupported denoise method: {self.method}")
             
-            self.finished.emit(output_path)
+            self.signals.finished.emit(self.input_path, output_path)
         except Exception as e:
-            self.error.emit(f"Denoising failed: {str(e)}")
+            self.signals.error.emit(f"Denoising failed ({os.path.basename(self.input_path)}): {str(e)}")
+
+
+class ReadSignals(QObject):
+    """读取任务信号：loaded(target, source) 中 source 为数组或 Stream"""
+    loaded = pyqtSignal(str, object)
+    error = pyqtSignal(str, str)  # (target, 错误信息)
+
+
+class ReadTask(QRunnable):
+    """在线程池中读取待绘图文件（txt 数组或 ObsPy 可读格式），解码期间不阻塞 GUI 线程"""
+
+    def __init__(self, file_path, target):
+        super().__init__()
+        self.setAutoDelete(False)  # 由窗口持有引用，读取期间对应绘图按钮禁用，不会被新任务替换
+        self.signals = ReadSignals()
+        self.file_path = file_path
+        self.target = target
+
+    def run(self):
+        try:
+            if self.file_path.endswith('.txt'):
+                source = dfspy_cores.read_txt_array(self.file_path)
+            else:
+                source = dfspy_cores.read_stream(self.file_path)
+            self.signals.loaded.emit(self.target, source)
+        except Exception as e:
+            self.signals.error.emit(self.target, str(e))
+
+
+class DenoiseParamsDialog(QDialog):
+    """
+    降噪参数表单：按字段说明一次列出全部参数（代替逐个弹出的 QInputDialog）。
+    fields 为 (key, 标签, 类型, 默认值, 最小值, 最大值, 小数位) 元组序列，类型为 'int' | 'double' | 'text'。
+    """
+
+    def __init__(self, title, fields, values=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        values = values or {}
+        self._editors = {}
+        form = QFormLayout(self)
+        for key, label, kind, default, low, high, decimals in fields:
+            value = values.get(key, default)
+            if kind == 'int':
+                editor = QSpinBox(self)
+                editor.setRange(low, high)
+                editor.setValue(value)
+            elif kind == 'double':
+                editor = QDoubleSpinBox(self)
+                editor.setDecimals(decimals)
+                editor.setRange(low, high)
+                editor.setValue(value)
+            else:
+                editor = QLineEdit(str(value), self)
+            form.addRow(label, editor)
+            self._editors[key] = (kind, editor)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        form.addRow(buttons)
+
+    def values(self):
+        """返回 {key: 值} 字典"""
+        return {key: (editor.text().strip() if kind == 'text' else editor.value())
+                for key, (kind, editor) in self._editors.items()}
+
+    def accept(self):
+        """带通上下限需满足 freqmax > freqmin（原逐个输入时由第二个对话框的下限保证）"""
+        values = self.values()
+        if 'freqmin' in values and 'freqmax' in values and values['freqmax'] <= values['freqmin']:
+            QMessageBox.warning(self, "Warning", "High cutoff frequency must be greater than low cutoff frequency!")
+            return
+        super().accept()
 
 
 class Ui_SubDenoise(QMainWindow):
     """数据降噪子窗口 UI 类"""
 
+    # 各降噪方法的参数表单字段：(key, 标签, 类型, 默认值, 最小值, 最大值, 小数位)
+    _PARAM_FIELDS = {
+        "Bandpass": (
+            ('freqmin', "Low cutoff frequency (Hz):", 'double', 20.0, 0.1, 1000.0, 1),
+            ('freqmax', "High cutoff frequency (Hz):", 'double', 200.0, 0.1, 10000.0, 1),
+        ),
+        "Wavelet Denoise": (
+            ('wavelet', "Wavelet type:", 'text', "db4", None, None, None),
+            ('level', "Decomposition levels:", 'int', 4, 1, 10, None),
+        ),
+        "Correlation Denoise": (
+            ('window_size', "Window length:", 'int', 1024, 100, 50000, None),
+            ('step_size', "Step size:", 'int', 512, 1, 1000, None),
+            ('corr_threshold', "Correlation threshold:", 'double', 0.5, 0.01, 1.0, 2),
+        ),
+        "Spectral Subtraction": (
+            ('noise_frames', "Number of noise frames:", 'int', 10, 1, 100, None),
+            ('alpha', "Alpha parameter:", 'double', 1.0, 0.1, 10.0, 1),
+            ('beta', "Beta parameter:", 'double', 0.02, 0.001, 1.0, 3),
+        ),
+    }
+    # 不在表单中出现的固定参数
+    _FIXED_PARAMS = {
+        "Spectral Subtraction": {'window': 'hann', 'frame_length': 1024, 'hop_length': 512},
+    }
+
+    # 各降噪方法的参数说明（静态文本，切换方法时整体填入 listWidget_params）
+    _METHOD_INFO = {
+        "Bandpass": (
+            "Bandpass parameters:",
+            "- Low cutoff frequency (Hz)",
+            "- High cutoff frequency (Hz)",
+            "- Filter order: 4",
+        ),
+        "Wavelet Denoise": (
+            "Wavelet denoise parameters:",
+            "- Wavelet type: db4",
+            "- Decomposition levels: 4",
+        ),
+        "Correlation Denoise": (
+            "Correlation denoise parameters:",
+            "- Window length (window_size)",
+            "- Step size (step_size)",
+            "- Correlation threshold (corr_threshold)",
+        ),
+        "Spectral Subtraction": (
+            "Spectral subtraction parameters:",
+            "- Noise frames",
+            "- Alpha parameter",
+            "- Beta parameter",
+        ),
+    }
+
     def __init__(self):
         super(Ui_SubDenoise, self).__init__()
         self.setupUi(self)
@@ -312,17 +454,35 @@ QPushButton:pressed
         self.pushButton_plot_before.clicked.connect(self.plot_before)
         self.pushButton_plot_after.clicked.connect(self.plot_after)
         self.pushButton_begin.clicked.connect(self.start_denoise)
-        self.comboBox_method.currentTextChanged.connect(self.show_method_info)
+        # 方法切换去抖：连续切换（如键盘滚动下拉框）只在停止 50 ms 后刷新一次参数说明
+        self._method_info_timer = QTimer(self)
+        self._method_info_timer.setSingleShot(True)
+        self._method_info_timer.setInterval(50)
+        self._method_info_timer.timeout.connect(self.show_method_info)
+        self.comboBox_method.currentTextChanged.connect(self._method_info_timer.start)
 
         # 初始化绘图
         self.setup_plotting()
         self.output_file_path = None  # 存储降噪后的文件路径
+        self._file_paths = []  # 已选数据文件路径（与 listWidget_datafile_path 内容一致）
+        self._read_tasks = {}  # 绘图读取任务引用（'before' / 'after'）
+        self._last_params = {}  # 各方法上次确认的参数，作为下次表单的默认值
+        self._result_cache = {}  # (输入路径, 输入时间戳, 方法, 参数) -> (输出路径, 输出时间戳)
+        self._job_keys = {}
 
     def setup_plotting(self):
         """设置绘图区域"""
+        if pg is not None:
+            self._pg_source = {}  # PlotWidget -> (原始数据, 各道归一化峰值)，缩放时对可见片段重新抽稀
+            self._pg_curve = {}
+            self.pw_before = self._make_plot_widget(self.widget_plot_before)
+            self.pw_after = self._make_plot_widget(self.widget_plot_after)
+            return
+
         # 降噪前绘图
         self.fig_before = plt.Figure()
         self.canvas_before = FC(self.fig_before)
+        self.ax_before = self.fig_before.add_subplot(111)
         layout_before = QtWidgets.QVBoxLayout()
         layout_before.addWidget(self.canvas_before)
         toolbar_before = NavigationToolbar(self.canvas_before, self)
@@ -332,12 +492,140 @@ QPushButton:pressed
         # 降噪后绘图
         self.fig_after = plt.Figure()
         self.canvas_after = FC(self.fig_after)
+        self.ax_after = self.fig_after.add_subplot(111)
         layout_after = QtWidgets.QVBoxLayout()
         layout_after.addWidget(self.canvas_after)
         toolbar_after = NavigationToolbar(self.canvas_after, self)
         layout_after.addWidget(toolbar_after)
         self.widget_plot_after.setLayout(layout_after)
 
+        # 折线集合设为 animated：整图重绘（含工具栏缩放/平移）时在 draw_event 中缓存无折线的背景再补画折线，
+        # 之后坐标范围不变的重绘只需恢复背景并 blit 折线，免去坐标轴、刻度与标签的重新渲染
+        self._blit_state = {}
+        # 抽稀前的原始数据与各道归一化峰值，缩放/平移改变样点轴范围时对可见片段重新抽稀
+        self._zoom_source = {}
+        self._zoom_registry = {}
+        self._plotting = False
+        for canvas, ax in ((self.canvas_before, self.ax_before), (self.canvas_after, self.ax_after)):
+            self._blit_state[canvas] = {'bg': None, 'key': None}
+            canvas.mpl_connect('draw_event', lambda event, c=canvas, a=ax: self._on_canvas_draw(event, c, a))
+
+    def _make_plot_widget(self, container):
+        """pyqtgraph 波形区：x 为道序，y 为样点并倒轴（与 matplotlib 版一致）"""
+        pw = pg.PlotWidget(container)
+        pw.setBackground('w')
+        pw.invertY(True)
+        pw.setLabel('bottom', 'Trace')
+        pw.setLabel('left', 'Samples')
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(pw)
+        container.setLayout(layout)
+        pw.getViewBox().sigYRangeChanged.connect(lambda *_, w=pw: self._on_pg_range_changed(w))
+        return pw
+
+    @staticmethod
+    def _flatten_segments(segments):
+        """折线段（三维数组或 (n_i, 2) 列表）展平为单条曲线的 x, y 与 connect（各道末点不与下一道相连）"""
+        lengths = [len(seg) for seg in segments]
+        xy = np.concatenate(list(segments)) if lengths else np.empty((0, 2))
+        connect = np.ones(len(xy), dtype=bool)
+        connect[np.cumsum(lengths) - 1] = False
+        return xy[:, 0], xy[:, 1], connect
+
+    def _plot_traces_pg(self, source, title, pw):
+        """pyqtgraph 绘图：全部道合为一条带断点的曲线，按控件高度做最小/最大包络抽稀"""
+        segments, denom = dfspy_cores.trace_segments(source, pw.height())
+        x, y, connect = self._flatten_segments(segments)
+        pw.clear()
+        pw.setTitle(title)
+        pw.getViewBox().enableAutoRange()
+        self._pg_curve[pw] = pw.plot(x, y, connect=connect, pen=pg.mkPen((31, 119, 180), width=1))
+        self._pg_source[pw] = (source, denom)
+
+    def _on_pg_range_changed(self, pw):
+        """样点轴范围变化（鼠标缩放/平移）：只对可见样点重新抽稀；自动范围（全图）时无需处理"""
+        source = self._pg_source.get(pw)
+        vb = pw.getViewBox()
+        if source is None or vb.autoRangeEnabled()[1]:
+            return
+        data, denom = source
+        lo, hi = sorted(vb.viewRange()[1])
+        segments, _ = dfspy_cores.trace_segments(data, pw.height(), start=max(0, int(lo)), stop=int(hi) + 2,
+                                                 scale=denom)
+        if max((len(seg) for seg in segments), default=0) < 2:
+            return
+        x, y, connect = self._flatten_segments(segments)
+        self._pg_curve[pw].setData(x, y, connect=connect)
+
+    @staticmethod
+    def _view_key(ax):
+        """决定背景能否复用的坐标轴状态：坐标范围、标题与像素区域"""
+        return (tuple(ax.get_xlim()), tuple(ax.get_ylim()), ax.get_title(), tuple(ax.bbox.bounds))
+
+    def _on_canvas_draw(self, event, canvas, ax):
+        """整图重绘后：缓存背景（仅画布自身渲染器），再把 animated 折线画到当前渲染器（保存图片时同样生效）"""
+        lc = dfspy_cores.trace_collection(ax)
+        if lc is None:
+            return
+        if event.renderer is canvas.get_renderer():
+            state = self._blit_state[canvas]
+            state['bg'] = canvas.copy_from_bbox(ax.bbox)
+            state['key'] = self._view_key(ax)
+        lc.draw(event.renderer)
+
+    def _plot_traces(self, source, title, canvas, ax):
+        """
+        绘制数组 (samples x traces) 或 Stream：按画布高度（样点轴像素数）做最小/最大包络抽稀，
+        并保留原始数据供缩放时重新抽稀（各道归一化峰值在首次缩放时求出后缓存）。
+        """
+        max_points = canvas.get_width_height()[1]
+        self._zoom_source.pop(ax, None)
+        self._plotting = True
+        try:
+            if isinstance(source, np.ndarray):
+                dfspy_cores.plot_array(source, title, ax, max_points=max_points)
+            else:
+                dfspy_cores.plot_stream(source, title, ax, max_points=max_points)
+            self._zoom_source[ax] = (source, None)
+        finally:
+            self._plotting = False
+        # 首次绘图会 cla() 重建 ax.callbacks，故在绘图后（注册表变化时）连接样点轴范围回调
+        if self._zoom_registry.get(ax) is not ax.callbacks:
+            ax.callbacks.connect('ylim_changed', self._on_sample_range_changed)
+            self._zoom_registry[ax] = ax.callbacks
+        self._refresh_canvas(canvas, ax)
+
+    def _on_sample_range_changed(self, ax):
+        """样点轴范围变化（工具栏缩放/平移/复位）：只对可见样点重新抽稀，保持全数据的归一化比例"""
+        source = self._zoom_source.get(ax)
+        lc = dfspy_cores.trace_collection(ax)
+        if self._plotting or source is None or lc is None:
+            return
+        data, denom = source
+        lo, hi = sorted(ax.get_ylim())
+        max_points = ax.figure.canvas.get_width_height()[1]
+        segments, denom = dfspy_cores.trace_segments(data, max_points, start=max(0, int(lo)), stop=int(hi) + 2,
+                                                     scale=denom)
+        self._zoom_source[ax] = (data, denom)
+        if max((len(seg) for seg in segments), default=0) < 2:
+            return
+        lc.set_segments(segments)
+
+    def _refresh_canvas(self, canvas, ax):
+        """重绘画布：坐标轴状态与缓存背景一致时只 blit 折线，否则 draw_idle 整图重绘"""
+        lc = dfspy_cores.trace_collection(ax)
+        if lc is None:
+            canvas.draw_idle()
+            return
+        lc.set_animated(True)
+        state = self._blit_state[canvas]
+        if state['bg'] is not None and state['key'] == self._view_key(ax):
+            canvas.restore_region(state['bg'])
+            ax.draw_artist(lc)
+            canvas.blit(ax.bbox)
+        else:
+            canvas.draw_idle()
+
     def select_data_files(self):
         """选择数据文件"""
         # 检查并设置默认路径
@@ -353,89 +641,82 @@ QPushButton:pressed
             "MSEED Files (*.mseed);;Seismic Data Files (*.mseed *.sac *.txt);;All Files (*.*)"
         )
         if files:
-            self.listWidget_datafile_path.clear()
-            self.listWidget_datafile_path.addItems(files)
+            # 路径列表同时缓存在 Python 侧，后续遍历不再逐项经 Qt 取文本；批量填充期间暂停重绘与信号
+            self._file_paths = list(files)
+            lw = self.listWidget_datafile_path
+            lw.setUpdatesEnabled(False)
+            lw.blockSignals(True)
+            try:
+                lw.clear()
+                lw.addItems(files)
+            finally:
+                lw.blockSignals(False)
+                lw.setUpdatesEnabled(True)
+            lw.viewport().update()
 
     def plot_before(self):
-        """绘制降噪前数据"""
-        if self.listWidget_datafile_path.count() == 0:
+        """绘制降噪前数据（文件在线程池中读取，完成后回到 GUI 线程绘图）"""
+        if not self._file_paths:
             QMessageBox.warning(self, "Warning", "Please select data files first!")
             return
-
-        try:
-            # 导入核心模块绘图函数
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-
-            file_path = self.listWidget_datafile_path.item(0).text()
-            
-            ax = self.fig_before.add_subplot(111)
-            ax.clear()
-            
-            if file_path.endswith('.txt'):
-                data = dfspy_cores.read_txt_array(file_path)
-                dfspy_cores.plot_array(data, "Data Before Denoising", ax)
-            else:
-                st = dfspy_cores.read_stream(file_path)
-                dfspy_cores.plot_stream(st, "Data Before Denoising", ax)
-            
-            self.canvas_before.draw()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Plotting failed: {str(e)}")
+        self._start_plot_read(self._file_paths[0], 'before')
 
     def plot_after(self):
         """绘制降噪后数据"""
         if not self.output_file_path:
             QMessageBox.warning(self, "Warning", "Please perform denoising first!")
             return
-
+        self._start_plot_read(self.output_file_path, 'after')
+
+    def _start_plot_read(self, file_path, target):
+        """提交读取任务；读取期间禁用对应绘图按钮"""
+        button = self.pushButton_plot_before if target == 'before' else self.pushButton_plot_after
+        button.setEnabled(False)
+        task = ReadTask(file_path, target)
+        task.signals.loaded.connect(self._on_plot_data_loaded)
+        task.signals.error.connect(self._on_plot_read_error)
+        self._read_tasks[target] = task
+        QThreadPool.globalInstance().start(task)
+
+    def _on_plot_data_loaded(self, target, source):
+        """读取完成：复用常驻坐标轴绘图（绘图函数原地更新折线集合），坐标范围不变时只 blit 折线"""
         try:
-            # 导入核心模块绘图函数
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-
-            ax = self.fig_after.add_subplot(111)
-            ax.clear()
-            
-            st = dfspy_cores.read_stream(self.output_file_path)
-            dfspy_cores.plot_stream(st, "Data After Denoising", ax)
-            
-            self.canvas_after.draw()
-            
+            if target == 'before':
+                self.pushButton_plot_before.setEnabled(True)
+                if pg is not None:
+                    self._plot_traces_pg(source, "Data Before Denoising", self.pw_before)
+                else:
+                    self._plot_traces(source, "Data Before Denoising", self.canvas_before, self.ax_before)
+            else:
+                self.pushButton_plot_after.setEnabled(True)
+                if pg is not None:
+                    self._plot_traces_pg(source, "Data After Denoising", self.pw_after)
+                else:
+                    self._plot_traces(source, "Data After Denoising", self.canvas_after, self.ax_after)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Plotting failed: {str(e)}")
 
+    def _on_plot_read_error(self, target, message):
+        """读取失败"""
+        button = self.pushButton_plot_before if target == 'before' else self.pushButton_plot_after
+        button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Plotting failed: {message}")
+
     def show_method_info(self):
         """显示降噪方法信息"""
-        method = self.comboBox_method.currentText()
-        self.listWidget_params.clear()
-        
-        if method == "Bandpass":
-            self.listWidget_params.addItem("Bandpass parameters:")
-            self.listWidget_params.addItem("- Low cutoff frequency (Hz)")
-            self.listWidget_params.addItem("- High cutoff frequency (Hz)")
-            self.listWidget_params.addItem("- Filter order: 4")
-        elif method == "Wavelet Denoise":
-            self.listWidget_params.addItem("Wavelet denoise parameters:")
-            self.listWidget_params.addItem("- Wavelet type: db4")
-            self.listWidget_params.addItem("- Decomposition levels: 4")
-        elif method == "Correlation Denoise":
-            self.listWidget_params.addItem("Correlation denoise parameters:")
-            self.listWidget_params.addItem("- Window length (window_size)")
-            self.listWidget_params.addItem("- Step size (step_size)")
-            self.listWidget_params.addItem("- Correlation threshold (corr_threshold)")
-        elif method == "Spectral Subtraction":
-            self.listWidget_params.addItem("Spectral subtraction parameters:")
-            self.listWidget_params.addItem("- Noise frames")
-            self.listWidget_params.addItem("- Alpha parameter")
-            self.listWidget_params.addItem("- Beta parameter")
+        lines = self._METHOD_INFO.get(self.comboBox_method.currentText(), ())
+        # 暂停重绘，清空后一次批量填充
+        lw = self.listWidget_params
+        lw.setUpdatesEnabled(False)
+        try:
+            lw.clear()
+            lw.addItems(lines)
+        finally:
+            lw.setUpdatesEnabled(True)
 
     def start_denoise(self):
         """开始降噪处理"""
-        if self.listWidget_datafile_path.count() == 0:
+        if not self._file_paths:
             QMessageBox.warning(self, "Warning", "Please select data files first!")
             return
 
@@ -444,133 +725,144 @@ QPushButton:pressed
             QMessageBox.warning(self, "Warning", "Please select a denoising method!")
             return
 
-        file_path = self.listWidget_datafile_path.item(0).text()
+        # 下拉框文本 -> 工作线程方法名；无对应项时直接提示，不再启动必然失败的线程
+        method_key = {
+            "Bandpass": "bandpass",
+            "Wavelet Denoise": "wavelet",
+            "Correlation Denoise": "correlation",
+            "Spectral Subtraction": "spectral_subtraction"
+        }.get(method)
+        if method_key is None:
+            QMessageBox.warning(self, "Warning", f"Unsupported denoising method: {method}")
+            return
+
+        file_paths = list(self._file_paths)
         
-        # 根据不同方法获取参数
+        # 根据不同方法获取参数（全部文件共用一组参数）
         params = self.get_method_parameters(method)
         if params is None:
             return  # 用户取消了参数输入
+
+        if method_key == 'correlation':
+            problems = self._check_correlation_inputs(file_paths, params['window_size'])
+            if problems:
+                QMessageBox.warning(self, "Warning", "Correlation denoising cannot run on:\n" + "\n".join(problems))
+                return
         
-        # 开始降噪处理
-        method_key = {
-            "带通滤波": "bandpass",
-            "小波降噪": "wavelet", 
-            "相关降噪": "correlation",
-            "谱减法降噪": "spectral_subtraction"
-        }.get(method)
-        
-        self.worker = DenoiseWorker(file_path, method_key, params)
-        self.worker.finished.connect(self.on_denoise_finished)
-        self.worker.error.connect(self.on_denoise_error)
+        # 开始降噪处理：每个文件一个任务，由线程池按核数并行执行；
+        # 输入文件、方法与参数均未变且上次输出文件未被改写时直接复用上次结果
+        self.output_file_path = None
+        self._first_input = file_paths[0]  # 降噪后绘图与降噪前一致，显示列表第一个文件
+        self._pending = len(file_paths)
+        self._errors = []
+        self._job_keys = {}
+        self.workers = []
+        cached = []
+        for file_path in file_paths:
+            key = self._result_key(file_path, method_key, params)
+            hit = self._result_cache.get(key) if key is not None else None
+            if hit is not None and self._file_stamp(hit[0]) == hit[1]:
+                cached.append((file_path, hit[0]))
+                continue
+            self._job_keys[file_path] = key
+            worker = DenoiseWorker(file_path, method_key, params)
+            worker.signals.finished.connect(self.on_denoise_finished)
+            worker.signals.error.connect(self.on_denoise_error)
+            self.workers.append(worker)
         
         self.pushButton_begin.setEnabled(False)
         self.pushButton_begin.setText("Processing...")
-        self.worker.start()
+        pool = QThreadPool.globalInstance()
+        for worker in self.workers:
+            pool.start(worker)
+        for file_path, output_path in cached:
+            self._finish_file(file_path, output_path, "Reused previous result! Output file: ")
+
+    @staticmethod
+    def _file_stamp(path):
+        """文件的 (修改时间 ns, 大小)，不存在时返回 None"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _result_key(self, file_path, method_key, params):
+        """结果缓存键：输入文件路径与时间戳、方法、参数；输入不可访问时返回 None（不缓存）"""
+        stamp = self._file_stamp(file_path)
+        if stamp is None:
+            return None
+        return file_path, stamp, method_key, tuple(sorted(params.items()))
+
+    @staticmethod
+    def _check_correlation_inputs(file_paths, window_size):
+        """
+        相关性降噪的输入预检：只读头信息（不解压样点），在派发任务前找出道数不足、
+        采样率/样点数不一致或窗口长于数据的文件；返回问题描述列表（txt 或无法读取的文件交由任务本身报错）
+        """
+        problems = []
+        for path in file_paths:
+            if path.endswith('.txt'):
+                continue
+            try:
+                st = dfspy_cores.read_stream_headers(path)
+            except Exception:
+                continue
+            name = os.path.basename(path)
+            npts = {int(tr.stats.npts) for tr in st}
+            if len(st) < 2:
+                problems.append(f"{name}: at least 2 traces are required")
+            elif len({float(tr.stats.sampling_rate) for tr in st}) > 1 or len(npts) > 1:
+                problems.append(f"{name}: traces differ in sampling rate or length")
+            elif window_size > npts.pop():
+                problems.append(f"{name}: window size exceeds the data length")
+        return problems
 
     def get_method_parameters(self, method):
-        """获取降噪方法参数"""
-        params = {}
-        
-        if method == "Bandpass":
-            freqmin, ok1 = QInputDialog.getDouble(
-                self, "Parameter Input", "Enter low cutoff frequency (Hz):", 20.0, 0.1, 1000.0, 1
-            )
-            if not ok1:
-                return None
-            
-            freqmax, ok2 = QInputDialog.getDouble(
-                self, "Parameter Input", "Enter high cutoff frequency (Hz):", 200.0, freqmin, 10000.0, 1
-            )
-            if not ok2:
-                return None
-                
-            params = {'freqmin': freqmin, 'freqmax': freqmax}
-            
-        elif method == "Wavelet Denoise":
-            wavelet, ok1 = QInputDialog.getText(
-                self, "Parameter Input", "Enter wavelet type:", text="db4"
-            )
-            if not ok1:
-                return None
-                
-            level, ok2 = QInputDialog.getInt(
-                self, "Parameter Input", "Enter decomposition levels:", 4, 1, 10
-            )
-            if not ok2:
-                return None
-                
-            params = {'wavelet': wavelet, 'level': level}
-            
-        elif method == "Correlation Denoise":
-            window_size, ok1 = QInputDialog.getInt(
-                self, "Parameter Input", "Enter window length:", 1024, 100, 50000
-            )
-            if not ok1:
-                return None
-                
-            step_size, ok2 = QInputDialog.getInt(
-                self, "Parameter Input", "Enter step size:", 512, 1, 1000
-            )
-            if not ok2:
-                return None
-                
-            corr_threshold, ok3 = QInputDialog.getDouble(
-                self, "Parameter Input", "Enter correlation threshold:", 0.5, 0.01, 1.0, 2
-            )
-            if not ok3:
-                return None
-                
-            params = {
-                'window_size': window_size,
-                'step_size': step_size,
-                'corr_threshold': corr_threshold
-            }
-            
-        elif method == "Spectral Subtraction":
-            noise_frames, ok1 = QInputDialog.getInt(
-                self, "Parameter Input", "Enter number of noise frames:", 10, 1, 100
-            )
-            if not ok1:
-                return None
-                
-            alpha, ok2 = QInputDialog.getDouble(
-                self, "Parameter Input", "Enter Alpha parameter:", 1.0, 0.1, 10.0, 1
-            )
-            if not ok2:
-                return None
-                
-            beta, ok3 = QInputDialog.getDouble(
-                self, "Parameter Input", "Enter Beta parameter:", 0.02, 0.001, 1.0, 3
-            )
-            if not ok3:
-                return None
-                
-            params = {
-                'noise_frames': noise_frames,
-                'alpha': alpha,
-                'beta': beta,
-                'window': 'hann',
-                'frame_length': 1024,
-                'hop_length': 512
-            }
-        
+        """获取降噪方法参数：一个模态表单一次填写全部参数，默认值为该方法上次确认的取值"""
+        fields = self._PARAM_FIELDS.get(method)
+        if fields is None:
+            return {}
+        dlg = DenoiseParamsDialog(f"{method} Parameters", fields, self._last_params.get(method, {}), self)
+        if dlg.exec_() != QDialog.Accepted:
+            return None  # 用户取消
+        params = dlg.values()
+        self._last_params[method] = dict(params)
+        params.update(self._FIXED_PARAMS.get(method, {}))
         return params
 
-    def on_denoise_finished(self, output_path):
-        """降噪完成回调"""
-        self.pushButton_begin.setEnabled(True)
-        self.pushButton_begin.setText("Start Denoising")
-        self.output_file_path = output_path
+    def on_denoise_finished(self, input_path, output_path):
+        """单个文件降噪完成回调：记录结果缓存（连同输出文件时间戳，输出被其他参数的运行覆盖后即失效）"""
+        key = self._job_keys.pop(input_path, None)
+        stamp = self._file_stamp(output_path)
+        if key is not None and stamp is not None:
+            self._result_cache[key] = (output_path, stamp)
+        self._finish_file(input_path, output_path, "Denoising finished! Output file: ")
 
-        self.listWidget_params.addItem(f"Denoising finished! Output file: {output_path}")
+    def _finish_file(self, input_path, output_path, message):
+        """单个文件完成（新计算或复用缓存）"""
+        if input_path == self._first_input:
+            self.output_file_path = output_path
 
-        QMessageBox.information(self, "Success", "Denoising completed!")
+        self.listWidget_params.addItem(f"{message}{output_path}")
+        self._on_task_done()
 
     def on_denoise_error(self, error_message):
-        """降噪错误回调"""
+        """单个文件降噪错误回调"""
+        self._errors.append(error_message)
+        self._on_task_done()
+
+    def _on_task_done(self):
+        """任务计数（槽函数均在 GUI 线程执行，无需加锁）；全部结束后恢复按钮并统一提示"""
+        self._pending -= 1
+        if self._pending > 0:
+            return
         self.pushButton_begin.setEnabled(True)
         self.pushButton_begin.setText("Start Denoising")
-        QMessageBox.critical(self, "Error", error_message)
+        if self._errors:
+            QMessageBox.critical(self, "Error", "\n".join(self._errors))
+        else:
+            QMessageBox.information(self, "Success", "Denoising completed!")
 
     def retranslateUi(self, SubDenoise):
         """设置 UI 文本"""
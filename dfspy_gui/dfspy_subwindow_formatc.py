@@ -8,40 +8,131 @@ DFSPy GUI 格式转换子窗口模块
 """
 
 import os
+from concurrent.futures import as_completed
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QMainWindow, QMessageBox, QFileDialog
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 
+# 子窗口公用的核心模块加载器与缓存图标/字体
+from dfspy_common import font as _font, icon as _icon, load_cores, process_pool
 
-class FormatConvertWorker(QThread):
-    """格式转换工作线程"""
+dfspy_cores = load_cores()
+
+
+# 按钮样式
+_BUTTON_STYLE = """QPushButton
+{
+border-radius: 10px;  
+border: 0.5px groove gray;
+border-style: outset;
+background-color: rgb(255, 255, 255);
+}
+QPushButton:pressed
+{
+    padding-left:4px;
+    padding-top:4px;
+    background-color:rgb(230, 240, 255);
+}"""
+
+
+def _styled_button(parent, rect, font, icon, icon_px, name):
+    """按统一样式创建按钮：rect 为 (x, y, w, h)，font/icon 为 _font/_icon 返回的共享对象，图标为 icon_px 见方"""
+    button = QtWidgets.QPushButton(parent)
+    button.setGeometry(QtCore.QRect(*rect))
+    button.setFont(font)
+    button.setStyleSheet(_BUTTON_STYLE)
+    button.setIcon(icon)
+    button.setIconSize(QtCore.QSize(icon_px, icon_px))
+    button.setObjectName(name)
+    return button
+
+
+# 文件对话框过滤器
+_DATA_FILTER = "Seismic Data Files (*.txt *.sac *.mseed *.segy);;All Files (*.*)"
+_HEAD_FILTER = "Header files (*.txt);;All Files (*.*)"
+
+# 仅凭文件头无法判定时按扩展名推断（键为小写扩展名，值与 comboBox_format_in 的选项一致）
+_EXT_FORMATS = {'.txt': 'txt', '.sac': 'SAC', '.segy': 'SEG-Y', '.sgy': 'SEG-Y',
+                '.mseed': 'MSEED', '.miniseed': 'MSEED', '.msd': 'MSEED'}
+_TXT_BYTES = frozenset(b'0123456789+-.eE \t\r\n,#')
+
+
+def _sniff_format(path):
+    """
+    只读取文件开头 4 KiB 判断数据格式（txt/SAC/SEG-Y/MSEED），无法判定时按扩展名推断，仍未知则返回 None。
+    - MSEED：固定头前 6 字节为序号（数字或空格），第 7 字节为质量标识 D/R/Q/M；或 miniSEED 3 的 b'MS\\x03'。
+      先于 SAC 判断：SAC 的判定偏移在 miniSEED 文件中落在样点数据内，可能碰巧命中
+    - SAC：头段第 76 个字（偏移 304）的 nvhdr 为 6 或 7（大/小端均可），且文件大小与头段 npts（偏移 316）
+      相符：632 字节头段加 npts 个（等间隔）或 2 * npts 个（不等间隔/谱文件）4 字节样点
+    - SEG-Y：3200 字节文本头之后的二进制头中，偏移 3224 的数据格式码为合法值
+    - txt：开头全部为数字、符号与空白
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(4096)
+            size = os.fstat(f.fileno()).st_size
+    except OSError:
+        return None
+    if head[:3] == b'MS\x03' or (len(head) >= 8 and head[6:7] in (b'D', b'R', b'Q', b'M')
+                                 and head[7:8] in (b' ', b'\x00')
+                                 and all(c in b'0123456789 ' for c in head[:6])):
+        return 'MSEED'
+    if len(head) >= 320:
+        for order in ('little', 'big'):
+            if int.from_bytes(head[304:308], order) in (6, 7):
+                npts = int.from_bytes(head[316:320], order, signed=True)
+                if npts >= 0 and size in (632 + 4 * npts, 632 + 8 * npts):
+                    return 'SAC'
+    if len(head) >= 3226 and int.from_bytes(head[3224:3226], 'big') in (1, 2, 3, 5, 8):
+        return 'SEG-Y'
+    if head and all(c in _TXT_BYTES for c in head):
+        return 'txt'
+    return _EXT_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+class FormatConvertSignals(QObject):
+    """格式转换任务信号（QRunnable 不是 QObject，信号由该对象承载，跨线程以队列连接送回 GUI 线程）"""
     finished = pyqtSignal(str)  # 转换完成信号
     error = pyqtSignal(str)  # 错误信号
-    
+    progress = pyqtSignal(int, int)  # 进度信号 (已完成, 总数)
+
+
+class FormatConvertWorker(QRunnable):
+    """格式转换任务：在全局 QThreadPool 的常驻线程上运行，将各文件提交到进程池，按完成顺序回报进度"""
+
     def __init__(self, input_files, output_format, headfile_path=None):
         super().__init__()
+        self.setAutoDelete(False)  # 生命周期由窗口的 self.worker 引用管理，避免 Qt 删除后信号对象悬空
+        self.signals = FormatConvertSignals()
         self.input_files = input_files
         self.output_format = output_format
         self.headfile_path = headfile_path
-    
+
     def run(self):
         """执行格式转换"""
         try:
-            # 导入核心模块
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-            
-            for file_path in self.input_files:
-                output_path = dfspy_cores.convert_format(
-                    file_path, 
-                    self.output_format, 
-                    self.headfile_path
-                )
-            
-            self.finished.emit("格式转换完成！")
+            # 各文件的格式转换相互独立（解析/编码为 CPU 密集），分发到与压缩窗口共用的进程池并行
+            pool = process_pool()
+            futures = {
+                pool.submit(dfspy_cores.convert_format, file_path, self.output_format, self.headfile_path): file_path
+                for file_path in self.input_files
+            }
+            # 单个文件失败不影响其余文件，结束后统一报告
+            errors = []
+            total = len(futures)
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(f"{os.path.basename(futures[future])}: {str(e)}")
+                self.signals.progress.emit(done, total)
+
+            if errors:
+                self.signals.error.emit("Format conversion failed:\n" + "\n".join(errors))
+            else:
+                self.signals.finished.emit("格式转换完成！")
         except Exception as e:
-            self.error.emit(f"Format conversion failed: {str(e)}")
+            self.signals.error.emit(f"Format conversion failed: {str(e)}")
 
 
 class Ui_SubFormatc(QMainWindow):
@@ -49,6 +140,11 @@ class Ui_SubFormatc(QMainWindow):
 
     def __init__(self):
         super(Ui_SubFormatc, self).__init__()
+        # 默认打开路径：exampledata 存在则使用，否则使用当前目录（会话内不变，只检查一次）
+        self._default_data_path = "../exampledata" if os.path.exists("../exampledata") else ""
+        # 已选择的数据文件与头文件（列表控件仅用于显示）
+        self._data_files = []
+        self._head_file = None
         self.setupUi(self)
 
     def setupUi(self, SubFormatc):
@@ -61,10 +157,7 @@ class Ui_SubFormatc(QMainWindow):
         # 操作标签
         self.label_head_oper = QtWidgets.QLabel(SubFormatc)
         self.label_head_oper.setGeometry(QtCore.QRect(0, 0, 611, 51))
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(16)
-        self.label_head_oper.setFont(font)
+        self.label_head_oper.setFont(_font("等线 Light", 16))
         self.label_head_oper.setStyleSheet("background-color: rgb(211, 211, 211);")
         self.label_head_oper.setAlignment(QtCore.Qt.AlignCenter)
         self.label_head_oper.setObjectName("label_head_oper")
@@ -73,105 +166,63 @@ class Ui_SubFormatc(QMainWindow):
         self.groupBox_open = QtWidgets.QGroupBox(SubFormatc)
         self.groupBox_open.setGeometry(QtCore.QRect(10, 70, 591, 451))
         self.groupBox_open.setStyleSheet("background-color: rgb(240, 240, 240);")
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(12)
-        self.groupBox_open.setFont(font)
+        self.groupBox_open.setFont(_font("等线 Light", 12))
         self.groupBox_open.setObjectName("groupBox_open")
         
-        # 按钮样式
-        button_style = """QPushButton
-{
-border-radius: 10px;  
-border: 0.5px groove gray;
-border-style: outset;
-background-color: rgb(255, 255, 255);
-}
-QPushButton:pressed
-{
-    padding-left:4px;
-    padding-top:4px;
-    background-color:rgb(230, 240, 255);
-}"""
-        
         # 数据文件导入按钮
-        self.pushButton_data_in = QtWidgets.QPushButton(self.groupBox_open)
-        self.pushButton_data_in.setGeometry(QtCore.QRect(20, 40, 211, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.pushButton_data_in.setFont(font)
-        self.pushButton_data_in.setStyleSheet(button_style)
-        icon = QtGui.QIcon()
-        icon.addPixmap(QtGui.QPixmap(":/mainwindow/image/open.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.pushButton_data_in.setIcon(icon)
-        self.pushButton_data_in.setIconSize(QtCore.QSize(32, 32))
-        self.pushButton_data_in.setObjectName("pushButton_data_in")
+        self.pushButton_data_in = _styled_button(self.groupBox_open, (20, 40, 211, 50), _font("等线", 14),
+                                                 _icon(":/mainwindow/image/open.png"), 32, "pushButton_data_in")
         
         # 数据文件路径列表
-        self.listWidget_datafile_path = QtWidgets.QListWidget(self.groupBox_open)
-        self.listWidget_datafile_path.setGeometry(QtCore.QRect(20, 100, 551, 151))
-        font = QtGui.QFont()
-        font.setPointSize(12)
-        self.listWidget_datafile_path.setFont(font)
-        self.listWidget_datafile_path.setStyleSheet(
+        # 列表仅用于显示路径：QListView + QStringListModel 一次 setStringList 批量装入，不逐项构造 QListWidgetItem
+        self._datafile_model = QtCore.QStringListModel(SubFormatc)
+        self.listView_datafile_path = QtWidgets.QListView(self.groupBox_open)
+        self.listView_datafile_path.setModel(self._datafile_model)
+        self.listView_datafile_path.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.listView_datafile_path.setGeometry(QtCore.QRect(20, 100, 551, 151))
+        self.listView_datafile_path.setFont(_font(None, 12))
+        self.listView_datafile_path.setStyleSheet(
             "background-color: rgb(255, 255, 255);"
             "border-radius: 5px;"
             "border: 0.5px rgb(220, 220, 220);"
         )
-        self.listWidget_datafile_path.setObjectName("listWidget_datafile_path")
+        self.listView_datafile_path.setObjectName("listView_datafile_path")
         
         # 头文件导入按钮
-        self.pushButton_headfile_in = QtWidgets.QPushButton(self.groupBox_open)
-        self.pushButton_headfile_in.setGeometry(QtCore.QRect(20, 260, 241, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.pushButton_headfile_in.setFont(font)
-        self.pushButton_headfile_in.setStyleSheet(button_style)
-        self.pushButton_headfile_in.setIcon(icon)
-        self.pushButton_headfile_in.setIconSize(QtCore.QSize(32, 32))
-        self.pushButton_headfile_in.setObjectName("pushButton_headfile_in")
+        self.pushButton_headfile_in = _styled_button(self.groupBox_open, (20, 260, 241, 50), _font("等线", 14),
+                                                     _icon(":/mainwindow/image/open.png"), 32, "pushButton_headfile_in")
         
         # 头文件路径列表
-        self.listWidget_headfile_path = QtWidgets.QListWidget(self.groupBox_open)
-        self.listWidget_headfile_path.setGeometry(QtCore.QRect(20, 320, 551, 111))
-        font = QtGui.QFont()
-        font.setPointSize(12)
-        self.listWidget_headfile_path.setFont(font)
-        self.listWidget_headfile_path.setStyleSheet(
+        self._headfile_model = QtCore.QStringListModel(SubFormatc)
+        self.listView_headfile_path = QtWidgets.QListView(self.groupBox_open)
+        self.listView_headfile_path.setModel(self._headfile_model)
+        self.listView_headfile_path.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.listView_headfile_path.setGeometry(QtCore.QRect(20, 320, 551, 111))
+        self.listView_headfile_path.setFont(_font(None, 12))
+        self.listView_headfile_path.setStyleSheet(
             "background-color: rgb(255, 255, 255);"
             "border-radius: 5px;"
             "border: 0.5px rgb(220, 220, 220);"
         )
-        self.listWidget_headfile_path.setObjectName("listWidget_headfile_path")
+        self.listView_headfile_path.setObjectName("listView_headfile_path")
         
         # 格式转换组框
         self.groupBox = QtWidgets.QGroupBox(SubFormatc)
         self.groupBox.setGeometry(QtCore.QRect(10, 540, 591, 231))
         self.groupBox.setStyleSheet("background-color: rgb(240, 240, 240);")
-        font = QtGui.QFont()
-        font.setFamily("等线 Light")
-        font.setPointSize(12)
-        self.groupBox.setFont(font)
+        self.groupBox.setFont(_font("等线 Light", 12))
         self.groupBox.setObjectName("groupBox")
         
         # 原始格式选择标签
         self.label_select_format0 = QtWidgets.QLabel(self.groupBox)
         self.label_select_format0.setGeometry(QtCore.QRect(20, 50, 311, 41))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.label_select_format0.setFont(font)
+        self.label_select_format0.setFont(_font("等线", 14))
         self.label_select_format0.setObjectName("label_select_format0")
         
         # 原始格式下拉框
         self.comboBox_format_in = QtWidgets.QComboBox(self.groupBox)
         self.comboBox_format_in.setGeometry(QtCore.QRect(370, 50, 171, 41))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.comboBox_format_in.setFont(font)
+        self.comboBox_format_in.setFont(_font("等线", 14))
         self.comboBox_format_in.setStyleSheet(
             "border: 0.5px groove gray;"
             "border-style: outset;"
@@ -186,19 +237,13 @@ QPushButton:pressed
         # 目标格式选择标签
         self.label_select_format1 = QtWidgets.QLabel(self.groupBox)
         self.label_select_format1.setGeometry(QtCore.QRect(20, 100, 321, 41))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.label_select_format1.setFont(font)
+        self.label_select_format1.setFont(_font("等线", 14))
         self.label_select_format1.setObjectName("label_select_format1")
         
         # 目标格式下拉框
         self.comboBox_format_out = QtWidgets.QComboBox(self.groupBox)
         self.comboBox_format_out.setGeometry(QtCore.QRect(370, 100, 171, 41))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.comboBox_format_out.setFont(font)
+        self.comboBox_format_out.setFont(_font("等线", 14))
         self.comboBox_format_out.setStyleSheet(
             "border: 0.5px groove gray;"
             "border-style: outset;"
@@ -211,34 +256,12 @@ QPushButton:pressed
         self.comboBox_format_out.setObjectName("comboBox_format_out")
         
         # 开始转换按钮
-        self.pushButton_begin = QtWidgets.QPushButton(self.groupBox)
-        self.pushButton_begin.setGeometry(QtCore.QRect(20, 160, 241, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(14)
-        self.pushButton_begin.setFont(font)
-        self.pushButton_begin.setStyleSheet(button_style)
-        icon1 = QtGui.QIcon()
-        icon1.addPixmap(QtGui.QPixmap(":/mainwindow/image/图片2.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.pushButton_begin.setIcon(icon1)
-        self.pushButton_begin.setIconSize(QtCore.QSize(35, 35))
-        self.pushButton_begin.setObjectName("pushButton_begin")
+        self.pushButton_begin = _styled_button(self.groupBox, (20, 160, 241, 50), _font("等线", 14),
+                                               _icon(":/mainwindow/image/图片2.png"), 35, "pushButton_begin")
         
         # 退出按钮
-        self.pushButton_exit = QtWidgets.QPushButton(SubFormatc)
-        self.pushButton_exit.setGeometry(QtCore.QRect(200, 850, 221, 50))
-        font = QtGui.QFont()
-        font.setFamily("等线")
-        font.setPointSize(16)
-        font.setBold(True)
-        font.setWeight(75)
-        self.pushButton_exit.setFont(font)
-        self.pushButton_exit.setStyleSheet(button_style)
-        icon2 = QtGui.QIcon()
-        icon2.addPixmap(QtGui.QPixmap(":/mainwindow/image/Exit.png"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        self.pushButton_exit.setIcon(icon2)
-        self.pushButton_exit.setIconSize(QtCore.QSize(32, 32))
-        self.pushButton_exit.setObjectName("pushButton_exit")
+        self.pushButton_exit = _styled_button(SubFormatc, (200, 850, 221, 50), _font("等线", 16, bold=True),
+                                              _icon(":/mainwindow/image/Exit.png"), 32, "pushButton_exit")
 
         self.retranslateUi(SubFormatc)
         self.pushButton_exit.clicked.connect(SubFormatc.close)
@@ -251,51 +274,39 @@ QPushButton:pressed
 
     def select_data_files(self):
         """选择数据文件"""
-        # 设置默认路径为exampledata，如果不存在则使用当前目录
-        import os
-        default_path = "../exampledata" if os.path.exists("../exampledata") else ""
-        
         files, _ = QFileDialog.getOpenFileNames(
             self,
             "Select data files",
-            default_path,
-            "Seismic Data Files (*.txt *.sac *.mseed *.segy);;All Files (*.*)"
+            self._default_data_path,
+            _DATA_FILTER
         )
         if files:
-            self.listWidget_datafile_path.clear()
-            self.listWidget_datafile_path.addItems(files)
+            self._data_files = list(files)
+            self._datafile_model.setStringList(self._data_files)
 
     def select_head_file(self):
         """选择头文件"""
-        # 设置默认路径为exampledata，如果不存在则使用当前目录
-        import os
-        default_path = "../exampledata" if os.path.exists("../exampledata") else ""
-        
         file, _ = QFileDialog.getOpenFileName(
             self,
             "Select head file",
-            default_path,
-            "Header files (*.txt);;All Files (*.*)"
+            self._default_data_path,
+            _HEAD_FILTER
         )
         if file:
-            self.listWidget_headfile_path.clear()
-            self.listWidget_headfile_path.addItem(file)
+            self._head_file = file
+            self._headfile_model.setStringList([file])
 
     def start_format_conversion(self):
         """开始格式转换"""
         # 获取输入文件列表
-        input_files = []
-        for i in range(self.listWidget_datafile_path.count()):
-            input_files.append(self.listWidget_datafile_path.item(i).text())
+        input_files = list(self._data_files)
         
         if not input_files:
             QMessageBox.warning(self, "Warning", "Please select files to convert first!")
             return
         
         # 获取头文件路径（如果有）
-        headfile_path = None
-        if self.listWidget_headfile_path.count() > 0:
-            headfile_path = self.listWidget_headfile_path.item(0).text()
+        headfile_path = self._head_file
         
         # 获取输出格式
         output_format = self.comboBox_format_out.currentText()
@@ -306,17 +317,33 @@ QPushButton:pressed
             QMessageBox.warning(self, "Warning", "Converting from txt to SAC or MSEED requires a head file!")
             return
         
-        # 创建工作线程
+        # 仅读取各文件头部核对格式，与所选输入格式不符时在完整解析前提示，由用户决定是否继续
+        mismatched = [os.path.basename(p) for p in input_files if _sniff_format(p) not in (None, input_format)]
+        if mismatched:
+            shown = "\n".join(mismatched[:10]) + ("\n..." if len(mismatched) > 10 else "")
+            reply = QMessageBox.question(self, "Warning",
+                                         f"The following files do not look like {input_format} files:\n{shown}\n\n"
+                                         "Convert them anyway?",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        
+        # 创建转换任务（在全局线程池的常驻线程上运行，不必每次新建线程）
         self.worker = FormatConvertWorker(input_files, output_format, headfile_path)
-        self.worker.finished.connect(self.on_conversion_finished)
-        self.worker.error.connect(self.on_conversion_error)
+        self.worker.signals.finished.connect(self.on_conversion_finished)
+        self.worker.signals.error.connect(self.on_conversion_error)
+        self.worker.signals.progress.connect(self.on_conversion_progress)
         
         # 禁用开始按钮，防止重复点击
         self.pushButton_begin.setEnabled(False)
         self.pushButton_begin.setText("Converting...")
         
         # 启动转换
-        self.worker.start()
+        QThreadPool.globalInstance().start(self.worker)
+
+    def on_conversion_progress(self, done, total):
+        """转换进度回调"""
+        self.pushButton_begin.setText(f"Converting {done}/{total}...")
 
     def on_conversion_finished(self, message):
         """转换完成回调"""
@@ -7,47 +7,98 @@ DFSPy GUI 参量转换子窗口模块
 使用 dfspy_cores.py 中的 strain_to_velocity 函数进行实际处理。
 """
 
+import functools
 import os
+
+import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QMainWindow, QMessageBox, QFileDialog, QInputDialog
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 
-# 绘图需要
-import matplotlib.pyplot as plt
+# 绘图需要（画布直接使用 Figure，无需在窗口打开时导入 pyplot；plot_stream 首次绘图时才按需导入）
+import matplotlib
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FC
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar
 
-plt.rcParams['font.sans-serif'] = ['Times New Roman']
+matplotlib.rcParams['font.sans-serif'] = ['Times New Roman']
+
+# 核心模块：与其他子窗口同样经 dfspy_common 按文件路径加载一次
+from dfspy_common import load_cores
+
+dfspy_cores = load_cores()
 
 
-class ParacWorker(QThread):
-    """参量转换工作线程"""
-    finished = pyqtSignal(str)  # 转换完成信号
+@functools.lru_cache(maxsize=None)
+def _translated(context, text):
+    """缓存 QCoreApplication.translate 的结果：重复打开子窗口时不再逐条查询翻译器；语言切换时清空"""
+    return QtCore.QCoreApplication.translate(context, text)
+
+
+class ParacSignals(QObject):
+    """参量转换任务信号（QRunnable 不是 QObject，信号由该对象承载，跨线程以队列连接送回 GUI 线程）"""
+    finished = pyqtSignal(str, str, object)  # 转换完成信号 (input_path, output_path, 换算后的 Stream)
     error = pyqtSignal(str)  # 错误信号
-    
+
+
+class ParacWorker(QRunnable):
+    """参量转换任务（单个文件）：在全局 QThreadPool 的常驻线程上运行，多个文件按线程池线程数并行"""
+
     def __init__(self, input_path, apparent_velocity, normalize_divisor):
         super().__init__()
+        self.setAutoDelete(False)  # 生命周期由窗口的 self.workers 引用管理，避免 Qt 删除后信号对象悬空
+        self.signals = ParacSignals()
         self.input_path = input_path
-        self.apparent_velocity = apparent_velocity
-        self.normalize_divisor = normalize_divisor
-    
+        # 合并比例系数：velocity = strain * scale，逐样点只需一次乘法
+        self.scale = apparent_velocity / normalize_divisor
+
     def run(self):
         """执行参量转换"""
         try:
-            # 导入核心模块
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-            
-            output_path = dfspy_cores.strain_to_velocity(
-                self.input_path,
-                self.apparent_velocity,
-                self.normalize_divisor
-            )
-            
-            self.finished.emit(output_path)
+            output_path, st_out = dfspy_cores.strain_to_velocity_scale(self.input_path, self.scale,
+                                                                       return_stream=True)
+            self.signals.finished.emit(self.input_path, output_path, st_out)
         except Exception as e:
-            self.error.emit(f"Conversion failed: {str(e)}")
+            self.signals.error.emit(f"Conversion failed ({os.path.basename(self.input_path)}): {str(e)}")
+
+
+class ReadSignals(QObject):
+    """读取任务信号"""
+    loaded = pyqtSignal(str, object, object)  # (target, 缓存键, Stream)
+    error = pyqtSignal(str, str)  # (target, 错误信息)
+
+
+class ReadTask(QRunnable):
+    """在线程池中读取待绘图的 ObsPy 可读文件（绘图只需 float32 精度），解码期间不阻塞 GUI 线程"""
+
+    def __init__(self, file_path, target, key=None):
+        super().__init__()
+        self.setAutoDelete(False)  # 由窗口持有引用，读取期间对应绘图按钮禁用，不会被新任务替换
+        self.signals = ReadSignals()
+        self.file_path = file_path
+        self.target = target
+        self.key = key
+
+    def run(self):
+        try:
+            st = dfspy_cores.read_stream(self.file_path, dtype=np.float32)
+            self.signals.loaded.emit(self.target, self.key, st)
+        except Exception as e:
+            self.signals.error.emit(self.target, str(e))
+
+
+class KernelWarmupTask(QRunnable):
+    """在线程池中以极小数组调用一次换算内核：提前完成 numba 导入与编译（或磁盘缓存加载），首次转换时无需等待"""
+
+    def __init__(self):
+        super().__init__()
+        self.setAutoDelete(False)  # 由窗口持有引用
+
+    def run(self):
+        try:
+            dfspy_cores._scale_inplace(np.zeros(1, dtype=np.float32), np.float32(1.0))
+        except Exception:
+            pass  # 预热失败不影响正常转换（届时再编译或回退到 NumPy）
 
 
 class Ui_SubParac(QMainWindow):
@@ -55,7 +106,13 @@ class Ui_SubParac(QMainWindow):
 
     def __init__(self):
         super(Ui_SubParac, self).__init__()
+        # 默认打开路径：仓库根目录下的 exampledata（按本文件位置解析，与启动时的工作目录无关；只检查一次）
+        example_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "exampledata")
+        self._default_data_path = example_dir if os.path.isdir(example_dir) else ""
         self.setupUi(self)
+        # 窗口显示后在后台预热换算内核
+        self._warmup_task = KernelWarmupTask()
+        QTimer.singleShot(0, lambda: QThreadPool.globalInstance().start(self._warmup_task))
 
     def setupUi(self, SubParac):
         """设置 UI"""
@@ -173,6 +230,7 @@ QPushButton:pressed
             "background-color: rgb(255, 255, 255);"
         )
         self.lineEdit_apparent_velocity.setObjectName("lineEdit_apparent_velocity")
+        self.lineEdit_apparent_velocity.setValidator(self._positive_validator(self.lineEdit_apparent_velocity))
         
         self.label_normalize_divisor = QtWidgets.QLabel(self.groupBox_parac)
         self.label_normalize_divisor.setGeometry(QtCore.QRect(20, 80, 200, 30))
@@ -196,26 +254,32 @@ QPushButton:pressed
             "background-color: rgb(255, 255, 255);"
         )
         self.lineEdit_normalize_divisor.setObjectName("lineEdit_normalize_divisor")
+        self.lineEdit_normalize_divisor.setValidator(self._positive_validator(self.lineEdit_normalize_divisor))
         
         # 参数说明列表
-        self.listWidget_params = QtWidgets.QListWidget(self.groupBox_parac)
-        self.listWidget_params.setGeometry(QtCore.QRect(20, 120, 551, 141))
+        # 参数说明与转换日志：只追加的纯文本区（appendPlainText），不逐条构造列表项
+        self.plainTextEdit_params = QtWidgets.QPlainTextEdit(self.groupBox_parac)
+        self.plainTextEdit_params.setReadOnly(True)
+        self.plainTextEdit_params.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.plainTextEdit_params.setMaximumBlockCount(1000)
+        self.plainTextEdit_params.setGeometry(QtCore.QRect(20, 120, 551, 141))
         font = QtGui.QFont()
         font.setFamily("Microsoft YaHei UI")
         font.setPointSize(9)
-        self.listWidget_params.setFont(font)
-        self.listWidget_params.setStyleSheet(
+        self.plainTextEdit_params.setFont(font)
+        self.plainTextEdit_params.setStyleSheet(
             "background-color: rgb(255, 255, 255);"
             "border-radius: 5px;"
             "border: 0.5px rgb(220, 220, 220);"
         )
-        self.listWidget_params.setObjectName("listWidget_params")
+        self.plainTextEdit_params.setObjectName("plainTextEdit_params")
         
         # Add parameter descriptions
-        self.listWidget_params.addItem("Strain-Velocity Conversion Parameters:")
-        self.listWidget_params.addItem("• Apparent velocity (m/s): seismic wave propagation speed on the surface, typically 3000-5000 m/s")
-        self.listWidget_params.addItem("• Normalization divisor: divisor for data normalization, default 5000.0")
-        self.listWidget_params.addItem("• Conversion formula: velocity = strain * apparent_velocity / normalize_divisor")
+        self.plainTextEdit_params.appendPlainText("Strain-Velocity Conversion Parameters:")
+        self.plainTextEdit_params.appendPlainText("• Apparent velocity (m/s): seismic wave propagation speed on the surface, typically 3000-5000 m/s")
+        self.plainTextEdit_params.appendPlainText("• Normalization divisor: divisor for data normalization, default 5000.0")
+        self.plainTextEdit_params.appendPlainText("• Conversion formula: velocity = strain * apparent_velocity / normalize_divisor")
+        self.plainTextEdit_params.appendPlainText("• Output precision: float32 (about 7 significant digits)")
         
         # 开始转换按钮
         self.pushButton_begin = QtWidgets.QPushButton(self.groupBox_parac)
@@ -313,12 +377,25 @@ QPushButton:pressed
         # 初始化绘图
         self.setup_plotting()
         self.output_file_path = None  # 存储转换后的文件路径
+        self.converted_stream = None  # 转换结果（内存中），绘图时无需再读回输出文件
+        self._before_cache = None  # ((路径, 修改时间, 大小), 转换前 Stream)
+        self._read_tasks = {}  # 绘图读取任务引用（'before' / 'after'）
+
+    @staticmethod
+    def _positive_validator(parent):
+        """参数输入框校验器：正数（0.0001 ~ 1e9，最多 6 位小数），固定 C 区域设置，保证文本可直接 float() 解析"""
+        validator = QtGui.QDoubleValidator(0.0001, 1e9, 6, parent)
+        validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
+        validator.setLocale(QtCore.QLocale.c())
+        return validator
 
     def setup_plotting(self):
         """设置绘图区域"""
         # 转换前绘图
-        self.fig_before = plt.Figure()
+        # 画布尺寸与绘图区（601x761 像素，dpi=100）一致，且不启用自动布局，重绘时不做布局求解
+        self.fig_before = Figure(figsize=(6.01, 7.61), dpi=100, tight_layout=False)
         self.canvas_before = FC(self.fig_before)
+        self.ax_before = self.fig_before.add_subplot(111)
         layout_before = QtWidgets.QVBoxLayout()
         layout_before.addWidget(self.canvas_before)
         toolbar_before = NavigationToolbar(self.canvas_before, self)
@@ -326,77 +403,138 @@ QPushButton:pressed
         self.widget_plot_before.setLayout(layout_before)
 
         # 转换后绘图
-        self.fig_after = plt.Figure()
+        self.fig_after = Figure(figsize=(6.01, 7.61), dpi=100, tight_layout=False)
         self.canvas_after = FC(self.fig_after)
+        self.ax_after = self.fig_after.add_subplot(111)
         layout_after = QtWidgets.QVBoxLayout()
         layout_after.addWidget(self.canvas_after)
         toolbar_after = NavigationToolbar(self.canvas_after, self)
         layout_after.addWidget(toolbar_after)
         self.widget_plot_after.setLayout(layout_after)
 
+        # 折线集合设为 animated：整图重绘（含工具栏缩放/平移）时在 draw_event 中缓存无折线的背景再补画折线，
+        # 之后坐标范围不变的重绘只需恢复背景并 blit 折线，免去坐标轴、刻度与标签的重新渲染
+        self._blit_state = {}
+        for canvas, ax in ((self.canvas_before, self.ax_before), (self.canvas_after, self.ax_after)):
+            self._blit_state[canvas] = {'bg': None, 'key': None}
+            canvas.mpl_connect('draw_event', lambda event, c=canvas, a=ax: self._on_canvas_draw(event, c, a))
+
+    @staticmethod
+    def _view_key(ax):
+        """决定背景能否复用的坐标轴状态：坐标范围、标题与像素区域"""
+        return (tuple(ax.get_xlim()), tuple(ax.get_ylim()), ax.get_title(), tuple(ax.bbox.bounds))
+
+    def _on_canvas_draw(self, event, canvas, ax):
+        """整图重绘后：缓存背景（仅画布自身渲染器），再把 animated 折线画到当前渲染器（保存图片时同样生效）"""
+        lc = dfspy_cores.trace_collection(ax)
+        if lc is None:
+            return
+        if event.renderer is canvas.get_renderer():
+            state = self._blit_state[canvas]
+            state['bg'] = canvas.copy_from_bbox(ax.bbox)
+            state['key'] = self._view_key(ax)
+        lc.draw(event.renderer)
+
+    def _refresh_canvas(self, canvas, ax):
+        """重绘画布：坐标轴状态与缓存背景一致时只 blit 折线，否则 draw_idle 整图重绘"""
+        lc = dfspy_cores.trace_collection(ax)
+        if lc is None:
+            canvas.draw_idle()
+            return
+        lc.set_animated(True)
+        state = self._blit_state[canvas]
+        if state['bg'] is not None and state['key'] == self._view_key(ax):
+            canvas.restore_region(state['bg'])
+            ax.draw_artist(lc)
+            canvas.blit(ax.bbox)
+        else:
+            canvas.draw_idle()
+
     def select_data_files(self):
         """选择数据文件"""
-        # 检查并设置默认路径
-        import os
-        default_path = ""
-        if os.path.exists("../exampledata"):
-            default_path = "../exampledata"
-        
         files, _ = QFileDialog.getOpenFileNames(
             self,
             "Select data files",
-            default_path,
+            self._default_data_path,
             "Seismic Data Files (*.mseed *.sac);;All Files (*.*)"
         )
         if files:
-            self.listWidget_datafile_path.clear()
-            self.listWidget_datafile_path.addItems(files)
+            # 批量填充期间暂停重绘与信号
+            lw = self.listWidget_datafile_path
+            lw.setUpdatesEnabled(False)
+            lw.blockSignals(True)
+            try:
+                lw.clear()
+                lw.addItems(files)
+            finally:
+                lw.blockSignals(False)
+                lw.setUpdatesEnabled(True)
+            lw.viewport().update()
 
     def plot_before(self):
-        """绘制转换前数据"""
+        """绘制转换前数据（文件在线程池中读取，完成后回到 GUI 线程绘图）"""
         if self.listWidget_datafile_path.count() == 0:
             QMessageBox.warning(self, "Warning", "Please select data files first!")
             return
 
+        file_path = self.listWidget_datafile_path.item(0).text()
         try:
-            # 导入核心模块绘图函数
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-
-            file_path = self.listWidget_datafile_path.item(0).text()
-            
-            ax = self.fig_before.add_subplot(111)
-            ax.clear()
-            
-            st = dfspy_cores.read_stream(file_path)
-            dfspy_cores.plot_stream(st, "Data Before Conversion (Strain)", ax)
-            
-            self.canvas_before.draw()
-            
-        except Exception as e:
+            stat = os.stat(file_path)
+        except OSError as e:
             QMessageBox.critical(self, "Error", f"Plotting failed: {str(e)}")
+            return
+        # 同一文件（修改时间与大小未变）重复绘图时复用已解码的 Stream
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+        if self._before_cache is not None and self._before_cache[0] == key:
+            self._draw_stream('before', self._before_cache[1])
+        else:
+            self._start_plot_read(file_path, 'before', key)
 
     def plot_after(self):
-        """绘制转换后数据"""
+        """绘制转换后数据（优先使用内存中的转换结果）"""
         if not self.output_file_path:
             QMessageBox.warning(self, "Warning", "Please perform the parameter conversion first!")
             return
 
+        if self.converted_stream is not None:
+            self._draw_stream('after', self.converted_stream)
+        else:
+            self._start_plot_read(self.output_file_path, 'after')
+
+    def _start_plot_read(self, file_path, target, key=None):
+        """提交读取任务；读取期间禁用对应绘图按钮"""
+        button = self.pushButton_plot_before if target == 'before' else self.pushButton_plot_after
+        button.setEnabled(False)
+        task = ReadTask(file_path, target, key)
+        task.signals.loaded.connect(self._on_plot_data_loaded)
+        task.signals.error.connect(self._on_plot_read_error)
+        self._read_tasks[target] = task
+        QThreadPool.globalInstance().start(task)
+
+    def _on_plot_data_loaded(self, target, key, st):
+        """读取完成：恢复按钮、缓存转换前数据并绘图"""
+        if target == 'before':
+            self.pushButton_plot_before.setEnabled(True)
+            self._before_cache = (key, st)
+        else:
+            self.pushButton_plot_after.setEnabled(True)
+        self._draw_stream(target, st)
+
+    def _on_plot_read_error(self, target, message):
+        """读取失败"""
+        button = self.pushButton_plot_before if target == 'before' else self.pushButton_plot_after
+        button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Plotting failed: {message}")
+
+    def _draw_stream(self, target, st):
+        """在常驻坐标轴上绘制 Stream：按画布高度（样点轴像素数）做最小/最大包络抽稀，坐标范围不变时只 blit 折线"""
+        if target == 'before':
+            canvas, ax, title = self.canvas_before, self.ax_before, "Data Before Conversion (Strain)"
+        else:
+            canvas, ax, title = self.canvas_after, self.ax_after, "Data After Conversion (Velocity)"
         try:
-            # 导入核心模块绘图函数
-            import sys
-            sys.path.append('..')
-            import dfspy_cores
-
-            ax = self.fig_after.add_subplot(111)
-            ax.clear()
-            
-            st = dfspy_cores.read_stream(self.output_file_path)
-            dfspy_cores.plot_stream(st, "Data After Conversion (Velocity)", ax)
-            
-            self.canvas_after.draw()
-            
+            dfspy_cores.plot_stream(st, title, ax, max_points=canvas.get_width_height()[1])
+            self._refresh_canvas(canvas, ax)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Plotting failed: {str(e)}")
 
@@ -406,48 +544,73 @@ QPushButton:pressed
             QMessageBox.warning(self, "Warning", "Please select data files first!")
             return
 
-        # 获取参数
-        try:
-            apparent_velocity = float(self.lineEdit_apparent_velocity.text())
-            normalize_divisor = float(self.lineEdit_normalize_divisor.text())
-        except ValueError:
-            QMessageBox.warning(self, "Warning", "Please enter valid numeric parameters!")
-            return
-
-        if apparent_velocity <= 0 or normalize_divisor <= 0:
-            QMessageBox.warning(self, "Warning", "Parameter values must be greater than 0!")
+        # 获取参数（输入框已由校验器限制为正数，此处只需确认输入完整）
+        if not (self.lineEdit_apparent_velocity.hasAcceptableInput()
+                and self.lineEdit_normalize_divisor.hasAcceptableInput()):
+            QMessageBox.warning(self, "Warning", "Please enter numeric parameters greater than 0!")
             return
-
-        file_path = self.listWidget_datafile_path.item(0).text()
-        
-        # 开始转换
-        self.worker = ParacWorker(file_path, apparent_velocity, normalize_divisor)
-        self.worker.finished.connect(self.on_conversion_finished)
-        self.worker.error.connect(self.on_conversion_error)
-        
+        apparent_velocity = float(self.lineEdit_apparent_velocity.text())
+        normalize_divisor = float(self.lineEdit_normalize_divisor.text())
+
+        lw = self.listWidget_datafile_path
+        file_paths = [lw.item(i).text() for i in range(lw.count())]
+
+        # 开始转换：每个文件一个任务，由线程池并行执行
+        self.output_file_path = None
+        self.converted_stream = None
+        self._first_input = file_paths[0]  # 转换后绘图与转换前一致，显示列表第一个文件
+        self._pending = len(file_paths)
+        self._errors = []
+        self.workers = []
+        for file_path in file_paths:
+            worker = ParacWorker(file_path, apparent_velocity, normalize_divisor)
+            worker.signals.finished.connect(self.on_conversion_finished)
+            worker.signals.error.connect(self.on_conversion_error)
+            self.workers.append(worker)
+
+        # 转换期间禁用开始按钮，防止重复提交
         self.pushButton_begin.setEnabled(False)
         self.pushButton_begin.setText("Converting...")
-        self.worker.start()
+        pool = QThreadPool.globalInstance()
+        for worker in self.workers:
+            pool.start(worker)
 
-    def on_conversion_finished(self, output_path):
-        """转换完成回调"""
-        self.pushButton_begin.setEnabled(True)
-        self.pushButton_begin.setText("Start Conversion")
-        self.output_file_path = output_path
+    def on_conversion_finished(self, input_path, output_path, st_out):
+        """单个文件转换完成回调：只保留第一个文件的结果供绘图"""
+        if input_path == self._first_input:
+            self.output_file_path = output_path
+            self.converted_stream = st_out
 
-        self.listWidget_params.addItem(f"Conversion finished! Output file: {output_path}")
-
-        QMessageBox.information(self, "Success", "Parameter conversion completed!")
+        self.plainTextEdit_params.appendPlainText(f"Conversion finished! Output file: {output_path}")
+        self._on_task_done()
 
     def on_conversion_error(self, error_message):
-        """转换错误回调"""
+        """单个文件转换错误回调"""
+        self._errors.append(error_message)
+        self._on_task_done()
+
+    def _on_task_done(self):
+        """任务计数（槽函数均在 GUI 线程执行，无需加锁）；全部结束后恢复按钮并统一提示"""
+        self._pending -= 1
+        if self._pending > 0:
+            return
         self.pushButton_begin.setEnabled(True)
         self.pushButton_begin.setText("Start Conversion")
-        QMessageBox.critical(self, "Error", error_message)
+        if self._errors:
+            QMessageBox.critical(self, "Error", "\n".join(self._errors))
+        else:
+            QMessageBox.information(self, "Success", "Parameter conversion completed!")
+
+    def changeEvent(self, event):
+        """安装/切换翻译器时清空文本缓存并重新设置 UI 文本"""
+        if event.type() == QtCore.QEvent.LanguageChange:
+            _translated.cache_clear()
+            self.retranslateUi(self)
+        super(Ui_SubParac, self).changeEvent(event)
 
     def retranslateUi(self, SubParac):
         """设置 UI 文本"""
-        _translate = QtCore.QCoreApplication.translate
+        _translate = _translated
         SubParac.setWindowTitle(_translate("SubParac", "Strain-Velocity Conversion"))
         self.label_head_oper.setText(_translate("SubParac", "Operations"))
         self.groupBox_open.setTitle(_translate("SubParac", "File Import"))
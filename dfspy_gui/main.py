@@ -21,15 +21,24 @@ Launch the DFSPy graphical user interface for distributed fiber-optic sensing da
 """
 
 import sys
-import os,matplotlib, obspy
-from PyQt5 import QtWidgets, QtGui
-from dfspy_mainwindow import Ui_MainWindow
-import requests #新增
-import matplotlib #新增
-matplotlib.use('QtAgg') #新增,需要安装PyQt5
+import os
+import multiprocessing
+# obspy、pyplot 等较重的依赖由各子窗口（打开时才导入）及 dfspy_cores 按需导入，不在启动时加载
+# Qt/matplotlib 也只在 __main__ 中导入：进程池以 spawn 启动子进程时会重新导入本模块，顶层须保持轻量
 
 if __name__ == '__main__':
+    # 打包为 exe 时，进程池子进程以本程序启动，须先交由 multiprocessing 处理，否则每个子进程都会再打开一个 GUI
+    multiprocessing.freeze_support()
+
+    import matplotlib
+    from PyQt5 import QtWidgets, QtGui
+    from dfspy_mainwindow import Ui_MainWindow
+    from dfspy_common import shutdown_process_pool
+    matplotlib.use('QtAgg') #新增,需要安装PyQt5
+
     app = QtWidgets.QApplication(sys.argv)
+    # 退出时关闭各子窗口共用的进程池，工作进程随 GUI 一起结束
+    app.aboutToQuit.connect(shutdown_process_pool)
     MainWindow = QtWidgets.QMainWindow()
     
     # 设置软件图标
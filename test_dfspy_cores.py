@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+dfspy_cores 读取函数测试（pytest）
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import dfspy_cores
+
+
+def test_read_txt_array_ragged_rows_raise(tmp_path):
+    """缺列的行不得被补成 NaN 静默读入，应与 np.loadtxt 一样报错"""
+    path = tmp_path / 'ragged.txt'
+    path.write_text("1.0 2.0 3.0\n4.0 5.0\n7.0 8.0 9.0\n")
+    with pytest.raises(ValueError):
+        dfspy_cores.read_txt_array(str(path), use_cache=False)
+
+
+def test_read_txt_array_single_row_is_single_trace(tmp_path):
+    """单行文件与 np.loadtxt 一致，返回 (n, 1)，不交换道与样点"""
+    path = tmp_path / 'one_row.txt'
+    path.write_text("1.0 2.0 3.0 4.0\n")
+    arr = dfspy_cores.read_txt_array(str(path), use_cache=False)
+    assert arr.shape == (4, 1)
+    np.testing.assert_array_equal(arr[:, 0], [1.0, 2.0, 3.0, 4.0])
+
+
+def test_read_txt_array_matches_loadtxt(tmp_path):
+    """常规矩阵与 np.loadtxt 结果一致，nan 字面量原样保留"""
+    path = tmp_path / 'matrix.txt'
+    data = np.random.default_rng(0).standard_normal((50, 3))
+    data[7, 1] = np.nan
+    np.savetxt(path, data)
+    arr = dfspy_cores.read_txt_array(str(path), use_cache=False)
+    np.testing.assert_array_equal(arr, np.loadtxt(path))
+
+
+def test_read_txt_array_cache_is_opt_in_and_tracks_source(tmp_path):
+    """缓存默认不写；启用时源文件被替换（保留修改时间）后不得返回旧缓存"""
+    path = tmp_path / 'data.txt'
+    np.savetxt(path, np.ones((20, 2)))
+    dfspy_cores.read_txt_array(str(path))
+    assert not (tmp_path / 'DFSPy_cache_outputs').exists()
+
+    np.testing.assert_array_equal(dfspy_cores.read_txt_array(str(path), use_cache=True), np.ones((20, 2)))
+    st = path.stat()
+    np.savetxt(path, np.full((30, 2), 2.0))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    np.testing.assert_array_equal(dfspy_cores.read_txt_array(str(path), use_cache=True), np.full((30, 2), 2.0))
+    assert len(list((tmp_path / 'DFSPy_cache_outputs').glob('*.npy'))) == 1